@@ -1,6 +1,7 @@
 from fastapi import  HTTPException
 import logging
 from abc import ABC, abstractmethod
+from datavisyn_project.app.helper.enum import IngestStatus
 
 
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +20,14 @@ class CSVFileService(ABC):
     def log_error(self, message: str):
         logger.error(f"{self.__class__.__name__}:{message}")
             
+    def require_ready(self, db_file: dict):
+        """Data of a file can only be read once its ingest job has finished."""
+        status = db_file.get("status")
+        if status not in (None, IngestStatus.READY.value):
+            self.log_warning(f"File ID {db_file.get('id')} is {status}")
+            raise HTTPException(status_code=409, detail=f"File is {status}, data is not available yet"
+                                if status != IngestStatus.FAILED.value else "File ingest failed")
+            
     async def CSV_file(self):
         try:
             return await self._run()   
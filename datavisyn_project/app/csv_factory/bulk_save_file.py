@@ -0,0 +1,121 @@
+import os
+import asyncio
+import logging
+from fastapi import HTTPException
+from .base import CSVFileService
+from datavisyn_project.app.helper.enum import IngestStatus, StorageRepositoryType
+from datavisyn_project.app.helper.archive import expand_uploads
+from datavisyn_project.app.helper.file_processor import adopt_stored_object, delete_orphaned_objects, store_upload
+from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+from datavisyn_project.app.repository_dp.factory import RepositoryFactory
+from datavisyn_project.app.decorators.response_cache import invalidate_responses
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Files streamed to storage at the same time
+BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "8"))
+# Files per multi-row INSERT
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "500"))
+
+
+class BulkSaveFileService(CSVFileService):
+    def __init__(self, input):
+        self.files = input["files"]
+        self.db_session = input["db_session"]
+        self.slots = asyncio.Semaphore(BULK_UPLOAD_CONCURRENCY)
+
+    async def _run(self):
+        """Store many CSV files, plain or zipped, and queue them for ingest batch by batch"""
+        sources, archives = await expand_uploads(self.files)
+        self.log_info(f"Bulk upload of {len(sources)} files")
+        repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, self.db_session)
+        results = []
+        try:
+            for start in range(0, len(sources), BULK_INSERT_BATCH_SIZE):
+                results += await self._save_batch(repository, sources[start:start + BULK_INSERT_BATCH_SIZE])
+        finally:
+            for archive in archives:
+                archive.close()
+
+        # Listings now include the new files
+        await invalidate_responses("files")
+
+        failed = sum(result["status"] == IngestStatus.FAILED.value for result in results)
+        self.log_info(f"Bulk upload done: {len(results) - failed} accepted, {failed} failed")
+        return {
+            "message": f"{len(results) - failed} of {len(results)} files accepted for ingestion",
+            "accepted": len(results) - failed,
+            "failed": failed,
+            "files": results
+        }
+
+    async def _save_batch(self, repository, sources: list) -> list:
+        stored = await asyncio.gather(*(self._store(source) for source in sources))
+        results = [None] * len(sources)
+        stored_files = []
+        for position, (source, file_info) in enumerate(zip(sources, stored)):
+            if isinstance(file_info, Exception):
+                results[position] = _failure(source.filename, file_info)
+            else:
+                stored_files.append((position, file_info))
+
+        # One lookup for the whole batch; later copies within the batch share the first one
+        duplicates = await repository.get_files_by_content_hashes(
+            [file_info.content_hash for _, file_info in stored_files])
+        firsts, repeats = [], []
+        seen = set()
+        for position, file_info in stored_files:
+            (repeats if file_info.content_hash in seen else firsts).append((position, file_info))
+            seen.add(file_info.content_hash)
+        adopted = {}
+        accepted = []
+        for group in (firsts, repeats):
+            infos = await asyncio.gather(*(
+                adopt_stored_object(file_info, duplicates.get(file_info.content_hash)
+                                    or adopted.get(file_info.content_hash))
+                for _, file_info in group), return_exceptions=True)
+            for (position, file_info), adopted_info in zip(group, infos):
+                if isinstance(adopted_info, Exception):
+                    results[position] = _failure(file_info.original_filename, adopted_info)
+                    continue
+                adopted.setdefault(adopted_info.content_hash, adopted_info)
+                accepted.append((position, adopted_info))
+
+        try:
+            await repository.create_file_metadata_batch([file_info for _, file_info in accepted])
+        except Exception as e:
+            await self.db_session.rollback()
+            self.log_error(f"Batch insert of {len(accepted)} files failed: {e!r}")
+            for position, file_info in accepted:
+                results[position] = _failure(file_info.original_filename, e)
+            # Objects first stored by this batch have no row now; reused ones still belong to theirs
+            created = [file_info for file_info in adopted.values() if file_info.content_hash not in duplicates]
+            await delete_orphaned_objects(repository, created)
+            return results
+
+        pool = get_ingest_pool()
+        for position, file_info in accepted:
+            if file_info.status != IngestStatus.READY.value:
+                # Never waits for room: files the queue cannot take stay pending for the sweeper
+                pool.offer(file_info.id)
+            results[position] = {
+                "filename": file_info.original_filename,
+                "file_id": file_info.id,
+                "status": file_info.status,
+                "deduplicated": file_info.status == IngestStatus.READY.value,
+            }
+        return results
+
+    async def _store(self, source):
+        async with self.slots:
+            try:
+                return await store_upload(source)
+            except Exception as e:
+                self.log_warning(f"Could not store {source.filename}: {e!r}")
+                return e
+
+
+def _failure(filename: str, error: Exception) -> dict:
+    detail = error.detail if isinstance(error, HTTPException) else str(error) or error.__class__.__name__
+    return {"filename": filename, "file_id": None, "status": IngestStatus.FAILED.value, "error": str(detail)}
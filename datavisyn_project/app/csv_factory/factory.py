@@ -1,8 +1,10 @@
 from ..helper.enum import ServiceMethod
 from .save_file import SaveFileService
+from .bulk_save_file import BulkSaveFileService
 from .get_file_list import GetListedFilesService
-from .get_metadata import GetFileMetadata
+from .get_metadata import GetFileMetadata, GetFilesMetadata
 from .get_file_detail import GetFileDetail
+from .export_file import ExportFileService
 from .base import CSVFileService
 
 class CSVFileFactory:
@@ -14,6 +16,10 @@ class CSVFileFactory:
             """save and upload csv file to storage and save metadata to database"""
             return SaveFileService(input)
         
+        elif method == ServiceMethod.BULK_SAVE_FILES:
+            """store many csv files or zip archives and save their metadata in batches"""
+            return BulkSaveFileService(input)
+        
         elif method == ServiceMethod.GET_LISTED_FILES:
             """Retrieve a paginated list of uploaded files."""
             return GetListedFilesService(input)
@@ -22,9 +28,17 @@ class CSVFileFactory:
             """Get metadata for a specific file."""
             return GetFileMetadata(input)
         
+        elif method == ServiceMethod.GET_FILES_METADATA:
+            """Get metadata for many files with one query."""
+            return GetFilesMetadata(input)
+        
         elif method == ServiceMethod.READ_CSV_DATA:
             """Read and paginate CSV file content."""
             return GetFileDetail(input)
         
+        elif method == ServiceMethod.EXPORT_FILE:
+            """Stream the whole file as CSV, NDJSON or Arrow."""
+            return ExportFileService(input)
+        
         else:
             raise ValueError("Invalid Factory method")
\ No newline at end of file
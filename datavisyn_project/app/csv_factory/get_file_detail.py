@@ -1,61 +1,111 @@
 
 import io
-import json
 from fastapi import HTTPException
+import numpy as np
 import pandas as pd
 from .base import CSVFileService
 from datavisyn_project.app.helper.enum import ServiceMethod
-from datavisyn_project.app.storage import get_storage_backend
+from datavisyn_project.app.helper.columnar import (
+    fetch_parquet_footer, fetch_parquet_row_groups, page_row_groups, parquet_metadata,
+    read_parquet_frame, read_parquet_row_groups, read_parquet_rows)
+from datavisyn_project.app.helper.data_query import DataQuery
+from datavisyn_project.app.helper.executor import run_in_process, run_in_thread
+from datavisyn_project.app.helper.frame_cache import frame_cache
+from datavisyn_project.app.helper.single_flight import file_loads
+from datavisyn_project.app.helper.row_index import load_row_index, locate_rows
+from datavisyn_project.app.storage import get_file_storage, get_storage_backend
 from pandas.errors import ParserError
 
 class GetFileDetail(CSVFileService):
     def __init__(self, input):
         self.file_id = input["file_id"]
-        self.page = input["page"]
-        self.page_size = input["page_size"]
+        self.page = input.get("page")
+        self.page_size = input.get("page_size")
+        # A row window (offset/limit) replaces page/page_size when given
+        self.offset = input.get("offset")
+        self.limit = input.get("limit")
         self.db_file = input["db_file"]
+        self.columns = input.get("columns")
+        self.filters = input.get("filters")
+        self.sort = input.get("sort")
 
     async def _run(self):
         """Retrieve and return the CSV data"""
         try:
-            self.log_info(f"Fetching data for file ID: {self.file_id} with page: {self.page}, page_size: {self.page_size}")
-            
-            
+            if self.offset is not None:
+                self.log_info(f"Fetching data for file ID: {self.file_id} with offset: {self.offset}, limit: {self.limit}")
+                start_idx = self.offset
+                end_idx = start_idx + self.limit
+            else:
+                self.log_info(f"Fetching data for file ID: {self.file_id} with page: {self.page}, page_size: {self.page_size}")
+                start_idx = (self.page - 1) * self.page_size
+                end_idx = start_idx + self.page_size
+
+            self.require_ready(self.db_file)
+
             # Read file from storage
-            
+
+            query = DataQuery.parse(self.columns, self.filters, self.sort)
             storage = get_storage_backend()
-            file_content = await storage.read(self.db_file.get("stored_filename"))
-            self.log_info(f"File content of size {len(file_content)} bytes read from storage")
-            # Parse CSV
-            csv_data = io.StringIO(file_content.decode('utf-8'))
-            df = pd.read_csv(csv_data, delimiter=self.db_file.get("delimiter"))
-            
+            row_index_filename = self.db_file.get("row_index_filename")
+            parquet_filename = self.db_file.get("parquet_filename")
+            cached_df = frame_cache.get(self.file_id)
+            if not query.is_empty():
+                # Filter, sort and project first; totals describe the filtered rows
+                df = await self._run_query(storage, query, cached_df)
+                paginated_df, total_rows = df.iloc[start_idx:end_idx], len(df)
+            elif cached_df is not None:
+                # Parsed earlier: slice the cached frame
+                paginated_df, total_rows = cached_df.iloc[start_idx:end_idx], len(cached_df)
+            elif frame_cache.accepts(self.db_file.get("file_size")):
+                # Small enough to keep whole: parse once, serve later pages from memory
+                df = await self._load_frame(storage)
+                paginated_df, total_rows = df.iloc[start_idx:end_idx], len(df)
+            elif row_index_filename:
+                # Row-offset index: fetch only the byte range holding the page
+                paginated_df, total_rows = await file_loads.do(
+                    ("rows", self.file_id, start_idx, end_idx),
+                    self._read_indexed_page, storage, row_index_filename, start_idx, end_idx)
+            elif parquet_filename:
+                # Columnar sidecar: decode only the row groups covering the page
+                paginated_df, total_rows = await file_loads.do(
+                    ("parquet_rows", self.file_id, start_idx, end_idx),
+                    self._read_parquet_page, storage, parquet_filename, start_idx, end_idx)
+            else:
+                # Legacy upload without sidecar: parse the whole CSV
+                df = await self._load_frame(storage)
+                paginated_df, total_rows = df.iloc[start_idx:end_idx], len(df)
+
+            if self.offset is not None:
+                self.log_info(f"Returning {len(paginated_df)} rows from offset {self.offset}")
+                return {
+                    "id": self.file_id,
+                    "filename": self.db_file.get("original_filename"),
+                    "data": paginated_df,
+                    "total_rows": total_rows,
+                    "offset": self.offset,
+                    "limit": self.limit
+                }
+
             # Apply pagination
-            total_rows = len(df)
             total_pages = (total_rows + self.page_size - 1) // self.page_size
-            
+
             if self.page > total_pages and total_rows > 0:
                 raise HTTPException(400, "Page out of range")
-            
-            start_idx = (self.page - 1) * self.page_size
-            end_idx = start_idx + self.page_size
-            
-            paginated_df = df.iloc[start_idx:end_idx]
-            paginated_data = json.loads(
-                paginated_df.to_json(orient="records", date_format="iso")
-            )
-            self.log_info(f"Returning {len(paginated_data)} rows for page {self.page} of {total_pages}")
+
+            # Rows stay a frame slice; the endpoint encodes them once into the response body
+            self.log_info(f"Returning {len(paginated_df)} rows for page {self.page} of {total_pages}")
             return {
                 "id": self.file_id,
                 "filename": self.db_file.get("original_filename"),
-                "data": paginated_data,
+                "data": paginated_df,
                 "total_rows": total_rows,
                 "page": self.page,
                 "page_size": self.page_size,
                 "total_pages": total_pages
             }
 
-        except ParserError as e:  
+        except ParserError as e:
             self.log_warning(f"CSV parsing failed: {e}")
             raise HTTPException(
                 status_code=400,
@@ -64,6 +114,144 @@ class GetFileDetail(CSVFileService):
                     "message": f"CSV file format is invalid: {str(e)}",
                     "suggestion": "Please check your CSV file for formatting issues"
                 }
-            )    
+            )
+
+    async def _run_query(self, storage, query: DataQuery, cached_df):
+        """Evaluate a query over the whole file, skipping sidecar row groups ruled out by zone maps."""
+        zone_maps = self.db_file.get("zone_maps")
+        parquet_filename = self.db_file.get("parquet_filename")
+        if cached_df is None and frame_cache.accepts(self.db_file.get("file_size")):
+            cached_df = await self._load_frame(storage)
+
+        if cached_df is not None:
+            df = cached_df
+        elif parquet_filename and zone_maps:
+            available = zone_maps["columns"]
+            query.validate(available)
+            dtypes = {column: stats["dtype"] for column, stats in (self.db_file.get("column_stats") or {}).items()}
+            row_groups = query.prune_row_groups(zone_maps, dtypes)
+            columns = query.required_columns(available)
+            if row_groups:
+                source = await self._parquet_source(storage, parquet_filename, lambda metadata: (row_groups, columns))
+                df = await run_in_thread(read_parquet_row_groups, source, row_groups, columns)
+            else:
+                # No row group can match: answer without touching storage
+                df = pd.DataFrame(columns=columns)
+        else:
+            df = await self._load_frame(storage)
+
+        query.validate(list(df.columns))
+        return await run_in_thread(query.apply, df)
+
+    async def _load_frame(self, storage):
+        """Whole file as a frame; concurrent requests for the file share one read and parse.
+
+        Frames small enough for the frame cache are put there before the
+        load is released, so later requests hit the cache instead.
+        """
+        async def load():
+            df = await self._read_frame(storage)
+            if frame_cache.accepts(self.db_file.get("file_size")):
+                frame_cache.put(self.file_id, df)
+            return df
+        return await file_loads.do(("frame", self.file_id), load)
+
+    async def _read_frame(self, storage):
+        """Load the whole file, from the Parquet sidecar when there is one."""
+        parquet_filename = self.db_file.get("parquet_filename")
+        if parquet_filename:
+            return await run_in_thread(read_parquet_frame, await storage.read_view(parquet_filename))
+
+        stored_filename = self.db_file.get("stored_filename")
+        csv_storage = self._csv_storage()
+        local_path = csv_storage.local_path(stored_filename)
+        if local_path is not None:
+            # The parse process maps the file itself, nothing is copied through this one
+            try:
+                return await run_in_process(parse_csv_file, str(local_path), self._csv_options())
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="File not found")
+
+        file_content = await csv_storage.read(stored_filename)
+        self.log_info(f"File content of size {len(file_content)} bytes read from storage")
+        # Parse CSV with the dialect sniffed at upload
+        return await run_in_process(parse_csv, file_content, self._csv_options())
+
+    async def _read_indexed_page(self, storage, row_index_filename: str, start_idx: int, end_idx: int):
+        """Parse only the header and the byte range covering the requested rows."""
+        index = load_row_index(await storage.read(row_index_filename))
+        total_rows = index["row_count"]
+        if start_idx >= total_rows:
+            return pd.DataFrame(), total_rows
+
+        stored_filename = self.db_file.get("stored_filename")
+        byte_start, byte_end, skip = locate_rows(index, start_idx, end_idx)
+        # Offsets are into the raw CSV; compressed files only decompress the frames they hit
+        csv_storage = self._csv_storage()
+        header = await csv_storage.read_range(stored_filename, 0, index["data_start"])
+        rows = await csv_storage.read_range(stored_filename, byte_start, byte_end)
+        self.log_info(f"Read {len(rows)} bytes at offset {byte_start} using row index")
+
+        nrows = skip + (end_idx - start_idx)
+        df = await run_in_process(parse_csv_rows, header + rows, self._csv_options(), nrows, index.get("dtypes"))
+        return df.iloc[skip:], total_rows
+
+    async def _read_parquet_page(self, storage, parquet_filename: str, start_idx: int, end_idx: int):
+        source = await self._parquet_source(
+            storage, parquet_filename, lambda metadata: (page_row_groups(metadata, start_idx, end_idx)[0], None))
+        return await run_in_thread(read_parquet_rows, source, start_idx, end_idx)
+
+    async def _parquet_source(self, storage, parquet_filename: str, select):
+        """Sidecar to decode some row groups from, without fetching the rest of it.
+
+        Local sidecars are mapped, so only the pages pyarrow touches are read.
+        Remote ones get their footer and then just the column chunks of the
+        row groups and columns `select(metadata)` returns.
+        """
+        if storage.local_path(parquet_filename) is not None:
+            return await storage.read_view(parquet_filename)
+        footer = await fetch_parquet_footer(storage, parquet_filename)
+        metadata = await run_in_thread(parquet_metadata, footer)
+        row_groups, columns = select(metadata)
+        return await fetch_parquet_row_groups(storage, parquet_filename, footer, metadata, row_groups, columns)
+
+    def _csv_storage(self):
+        """Sidecars are stored raw, the CSV itself with the codec recorded at upload."""
+        return get_file_storage(self.db_file.get("codec"))
+
+    def _csv_options(self) -> dict:
+        """read_csv options for the stored file; uploads from before sniffing are UTF-8 with double quotes."""
+        return {
+            "delimiter": self.db_file.get("delimiter"),
+            "encoding": self.db_file.get("encoding") or "utf-8",
+            "quotechar": self.db_file.get("quotechar") or '"',
+        }
+
+
+# Parsers run in the parse processes, so they are module-level and take plain data
+
+def parse_csv(content: bytes, options: dict) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(content), **options)
+
+
+def parse_csv_file(path: str, options: dict) -> pd.DataFrame:
+    return pd.read_csv(path, memory_map=True, **options)
+
 
-            
\ No newline at end of file
+def parse_csv_rows(content: bytes, options: dict, nrows: int, dtypes: dict = None) -> pd.DataFrame:
+    """Parse the first nrows of a header plus byte-range slice with the full-file dtypes."""
+    csv_data = io.BytesIO(content)
+    # Nullable booleans are object in the index; read as object they would stay strings
+    booleans = [column for column, dtype in (dtypes or {}).items() if dtype == "object"]
+    if booleans:
+        dtypes = {**dtypes, **{column: "boolean" for column in booleans}}
+    try:
+        df = pd.read_csv(csv_data, dtype=dtypes, nrows=nrows, **options)
+        for column in booleans:
+            # Same True/False/NaN objects as a whole-file parse
+            df[column] = df[column].astype(object).where(df[column].notna(), np.nan)
+        return df
+    except (ValueError, TypeError):
+        # Slice does not fit the full-file dtypes, let pandas infer them
+        csv_data.seek(0)
+        return pd.read_csv(csv_data, nrows=nrows, **options)
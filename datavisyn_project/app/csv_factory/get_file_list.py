@@ -1,6 +1,7 @@
 
 from .base import CSVFileService
-from datavisyn_project.app.helper.enum import StorageRepositoryType
+from datavisyn_project.app.helper.enum import StorageRepositoryType, TotalCountMode
+from datavisyn_project.app.helper.pagination import decode_cursor, encode_cursor
 from datavisyn_project.app.repository_dp.factory import RepositoryFactory
 from fastapi import HTTPException
 
@@ -10,22 +11,37 @@ class GetListedFilesService(CSVFileService):
         self.page = input["page"]
         self.page_size = input["page_size"]
         self.db_session = input["db_session"]
+        self.cursor = input.get("cursor")
+        # Keyset pages skip the full COUNT(*) unless the client asks for it
+        self.count = input.get("count") or (TotalCountMode.NONE if self.cursor else TotalCountMode.EXACT)
         
     async def _run(self): 
         """Retrieve and return a paginated list of file metadata from the database"""
-        # Calculate skip
-        skip = (self.page - 1) * self.page_size
         get_repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, self.db_session)
 
         # Count total
-        total_files = await get_repository.count_files()
+        total_files = None
+        if self.count == TotalCountMode.EXACT:
+            total_files = await get_repository.count_files()
+        elif self.count == TotalCountMode.ESTIMATE:
+            total_files = await get_repository.estimate_files()
         
-        if skip >= total_files and total_files > 0:
-            self.log_error("Page out of range")
-            raise HTTPException(400, "Page out of range")
-        
-        # Get files
-        get_listed_files = await get_repository.get_file_list(skip=skip, limit=self.page_size)
+        if self.cursor:
+            # Keyset page: constant cost however deep the cursor is
+            upload_timestamp, file_id = decode_cursor(self.cursor)
+            get_listed_files = await get_repository.get_file_list_after(
+                upload_timestamp, file_id, limit=self.page_size)
+            page = None
+        else:
+            # Calculate skip
+            skip = (self.page - 1) * self.page_size
+            if total_files is not None and skip >= total_files and total_files > 0:
+                self.log_error("Page out of range")
+                raise HTTPException(400, "Page out of range")
+            
+            # Get files
+            get_listed_files = await get_repository.get_file_list(skip=skip, limit=self.page_size)
+            page = self.page
         
         files_list = [
             {
@@ -36,17 +52,27 @@ class GetListedFilesService(CSVFileService):
                 "file_size": file.file_size,
                 "row_count": file.row_count,
                 "column_count": file.column_count,
-                "delimiter": file.delimiter
+                "delimiter": file.delimiter,
+                "encoding": file.encoding,
+                "quotechar": file.quotechar,
+                "has_bom": file.has_bom,
+                "status": file.status
 
             }
             for file in get_listed_files
             ]
         
+        next_cursor = None
+        if len(get_listed_files) == self.page_size:
+            last_file = get_listed_files[-1]
+            next_cursor = encode_cursor(last_file.upload_timestamp, last_file.id)
+        
         return {
             "files": files_list,
             "total": total_files,
-            "page": self.page,
+            "page": page,
             "page_size": self.page_size,
-            "total_pages": (total_files + self.page_size - 1) // self.page_size
+            "total_pages": (total_files + self.page_size - 1) // self.page_size if total_files is not None else None,
+            "next_cursor": next_cursor
         }
         
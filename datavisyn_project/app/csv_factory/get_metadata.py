@@ -4,6 +4,7 @@ from fastapi import HTTPException
 from .base import CSVFileService
 from datavisyn_project.app.helper.enum import StorageRepositoryType
 from datavisyn_project.app.repository_dp.factory import RepositoryFactory
+from datavisyn_project.app.repository_dp.file_repository import METADATA_BATCH_MAX_IDS
 
 
 class GetFileMetadata(CSVFileService):
@@ -20,13 +21,48 @@ class GetFileMetadata(CSVFileService):
         if not db_file:
             self.log_error("File not found in database")
             raise HTTPException(status_code=404, detail="File not found")
+        return file_metadata(db_file)
+
+
+class GetFilesMetadata(CSVFileService):
+    def __init__(self, input):
+        self.file_ids = input["file_ids"]
+        self.db_session = input["db_session"]
+        
+    async def _run(self):
+        """Retrieve the metadata of many files with one query, in request order"""
+        if len(self.file_ids) > METADATA_BATCH_MAX_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {METADATA_BATCH_MAX_IDS} file ids per request")
+        self.log_info(f"Fetching metadata for {len(self.file_ids)} files")
+        
+        get_repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, self.db_session)
+        db_files = await get_repository.get_files(self.file_ids)
+        file_ids = list(dict.fromkeys(self.file_ids))
         return {
-            "id": str(db_file.id),
-            "original_filename": db_file.original_filename,
-            "stored_filename": db_file.stored_filename,
-            "upload_timestamp": str(db_file.upload_timestamp.isoformat())if db_file.upload_timestamp else None,
-            "file_size": db_file.file_size,
-            "row_count": db_file.row_count,
-            "column_count": db_file.column_count,
-            "delimiter": db_file.delimiter
+            "files": [file_metadata(db_files[file_id]) for file_id in file_ids if file_id in db_files],
+            "missing": [file_id for file_id in file_ids if file_id not in db_files]
         }
+
+
+def file_metadata(db_file) -> dict:
+    return {
+        "id": str(db_file.id),
+        "original_filename": db_file.original_filename,
+        "stored_filename": db_file.stored_filename,
+        "upload_timestamp": str(db_file.upload_timestamp.isoformat())if db_file.upload_timestamp else None,
+        "file_size": db_file.file_size,
+        "row_count": db_file.row_count,
+        "column_count": db_file.column_count,
+        "column_stats": db_file.column_stats,
+        "delimiter": db_file.delimiter,
+        "encoding": db_file.encoding,
+        "quotechar": db_file.quotechar,
+        "has_bom": db_file.has_bom,
+        "parquet_filename": db_file.parquet_filename,
+        "zone_maps": db_file.zone_maps,
+        "row_index_filename": db_file.row_index_filename,
+        "codec": db_file.codec,
+        "content_hash": db_file.content_hash,
+        "status": db_file.status,
+        "error_message": db_file.error_message
+    }
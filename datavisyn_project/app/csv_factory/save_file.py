@@ -1,8 +1,10 @@
-from datavisyn_project.app.helper.enum import StorageRepositoryType
-from datavisyn_project.app.helper.file_processor import read_file_info
+from datavisyn_project.app.helper.enum import IngestStatus, StorageRepositoryType
+from datavisyn_project.app.helper.file_processor import adopt_stored_object, delete_orphaned_objects, store_upload
+from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
 from datavisyn_project.app.repository_dp.factory import RepositoryFactory
+from datavisyn_project.app.decorators.response_cache import invalidate_responses
 import logging
-import logging
+from fastapi import HTTPException
 from .base import CSVFileService
 
 logging.basicConfig(level=logging.INFO)
@@ -20,27 +22,55 @@ class SaveFileService(CSVFileService):
         try:   
             
             logger.info(f"Starting upload for file: {self.file.filename}")
-            file_info = await read_file_info(self.file)
+            get_ingest_pool().check_capacity()
+            file_info = await store_upload(self.file)
             logger.info(f"File info extracted: {file_info}")
             
-            #save file metadata to database
             get_repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA,
                                                               self.db_session)
-            print(f"Repository obtained: {get_repository}, file_info: {file_info}   ")
+            # Identical bytes are stored once; an ingested duplicate also lends its metadata
+            duplicate = await get_repository.get_file_by_content_hash(file_info.content_hash)
+            file_info = await adopt_stored_object(file_info, duplicate)
+            
+            #save file metadata to database, workers fill in the rest unless it was reused
             save_file = await get_repository.create_file_metadata(file_info)
-            logger.info(f"File {self.file.filename} uploaded successfully with ID {str(save_file.id)}")
+            deduplicated = save_file.status == IngestStatus.READY.value
+            if not deduplicated:
+                await self._submit(get_repository, save_file, created=file_info if duplicate is None else None)
+            logger.info(f"File {self.file.filename} stored with ID {str(save_file.id)}, status {save_file.status}")
+            
+            # Listings now include the new file
+            await invalidate_responses("files")
             
             return {
-                    "message": "File uploaded successfully",
+                    "message": "File already ingested, metadata reused" if deduplicated
+                               else "File accepted for ingestion",
+                    "job_id": save_file.id,
                     "file_id": save_file.id,
                     "filename": save_file.original_filename,
                     "file_size": save_file.file_size,
-                    "row_count": save_file.row_count,
-                    "column_count": save_file.column_count
+                    "status": save_file.status,
+                    "status_url": f"/api/file/{save_file.id}/status",
+                    "deduplicated": deduplicated
                     }
         except KeyError:
                 self.log_error("Missing 'file' in input")
                 raise ValueError("Missing 'file' in input")
         except AttributeError as e:
             self.log_error(f"Invalid file object: {e}")
-            raise ValueError(f"Invalid file object: {e}")
\ No newline at end of file
+            raise ValueError(f"Invalid file object: {e}")
+
+    async def _submit(self, repository, save_file, created):
+        """Queue the file for ingest; when the queue turns out full, undo the upload before answering 503.
+
+        `created` is the upload's metadata when its object was first stored
+        by it, None when it reuses the object of an earlier upload.
+        """
+        try:
+            get_ingest_pool().submit(save_file.id)
+        except HTTPException:
+            self.log_error(f"Ingest queue full, removing file ID {save_file.id} and its stored object")
+            await repository.delete_file(save_file.id)
+            if created is not None:
+                await delete_orphaned_objects(repository, [created])
+            raise
\ No newline at end of file
@@ -0,0 +1,57 @@
+import hashlib
+import logging
+import functools
+from typing import Awaitable, Callable, Optional
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pages of an ingested file never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Still changing: caches must revalidate every time
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored on both sides."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(validators: Callable[[dict], Awaitable[Optional[dict]]]):
+    """Send validator headers with an endpoint's responses and answer If-None-Match with 304.
+
+    `validators` receives the endpoint's keyword arguments and returns the
+    ETag, Cache-Control and any other headers for the response, or None
+    when the resource has none. It runs before the endpoint, so a matching
+    If-None-Match is answered without running the endpoint at all. The
+    endpoint must take a `request: Request` argument.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            headers = await validators(kwargs)
+            if headers and etag_matches(kwargs["request"].headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+
+            result = await func(*args, **kwargs)
+            if not headers:
+                return result
+            if not isinstance(result, Response):
+                result = JSONResponse(content=jsonable_encoder(result))
+            result.headers.update(headers)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,87 @@
+import os
+import json
+import logging
+import functools
+from collections import defaultdict
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "datavisyn-cache"
+
+# Listings are invalidated on upload, data pages never change
+FILES_CACHE_TTL = int(os.getenv("FILES_CACHE_TTL", "600"))
+FILE_DATA_CACHE_TTL = int(os.getenv("FILE_DATA_CACHE_TTL", "3600"))
+
+
+class ResponseCacheStats:
+    """Hit/miss counters per cache namespace."""
+
+    def __init__(self):
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def record(self, namespace: str, hit: bool):
+        self._counters[namespace]["hits" if hit else "misses"] += 1
+
+    def snapshot(self) -> dict:
+        report = {}
+        for namespace, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            report[namespace] = {
+                **counters,
+                "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            }
+        return report
+
+
+response_cache_stats = ResponseCacheStats()
+
+
+def build_cache_key(namespace: str, params: dict) -> str:
+    """Cache key made only of the semantic request parameters."""
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{FastAPICache.get_prefix()}:{namespace}:{query}"
+
+
+def cache_response(namespace: str, expire: int, key_params: tuple, format_param: str = None):
+    """Cache an endpoint's response body under a key built from `key_params` only.
+
+    Injected dependencies such as the DB session never take part in the key.
+    The lookup happens before the endpoint body runs, so a hit never issues a
+    query and the lazily connecting AsyncSession never checks out a connection.
+    When `format_param` names a negotiated ResponseFormat argument, it must be
+    one of `key_params`; hits are served with its media type instead of JSON.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = build_cache_key(namespace, {name: kwargs.get(name) for name in key_params})
+            backend = FastAPICache.get_backend()
+
+            cached = await backend.get(key)
+            response_cache_stats.record(namespace, hit=cached is not None)
+            if cached is not None:
+                media_type = kwargs[format_param].value if format_param else "application/json"
+                return Response(content=cached, media_type=media_type)
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                # Endpoint already encoded its body
+                await backend.set(key, result.body, expire)
+                return result
+            body = json.dumps(jsonable_encoder(result)).encode("utf-8")
+            await backend.set(key, body, expire)
+            return Response(content=body, media_type="application/json")
+        return wrapper
+    return decorator
+
+
+async def invalidate_responses(namespace: str) -> int:
+    """Drop every cached response of a namespace on all workers."""
+    count = await FastAPICache.clear(namespace=namespace)
+    logger.info(f"Invalidated {count} cached responses in namespace '{namespace}'")
+    return count
+
@@ -1,59 +1,127 @@
+import os
+import re
 import logging
-from datavisyn_project.app.helper.enum import ServiceMethod
+import unicodedata
+from urllib.parse import quote
+from datavisyn_project.app.helper.enum import ExportFormat, ResponseFormat, ServiceMethod, TotalCountMode
 from datavisyn_project.app.decorators.error_handeling import handle_endpoint_errors
+from datavisyn_project.app.decorators.conditional_request import conditional_response
 from datavisyn_project.models.schema import file_schemas
 from .csv_factory.factory import CSVFileFactory
 import uuid
-from fastapi import APIRouter, UploadFile, File, Query
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datavisyn_project.core.db_setup import get_async_session
 from fastapi import Depends
-from fastapi_cache.decorator import cache
+from datavisyn_project.app.decorators.response_cache import (
+    FILE_DATA_CACHE_TTL, FILES_CACHE_TTL, cache_response, response_cache_stats)
+from fastapi_cache import FastAPICache
+from datavisyn_project.app.helper.frame_cache import frame_cache
+from datavisyn_project.app.helper.metadata_cache import metadata_cache
+from datavisyn_project.app.helper.json_response import data_page_response
+from datavisyn_project.app.helper.arrow_response import arrow_page_response, negotiate_format
+from datavisyn_project.app.helper.executor import executor_stats, run_in_thread
+from datavisyn_project.app.helper.single_flight import file_loads
+from datavisyn_project.app.helper.http_validators import (
+    file_data_validators, file_metadata_validators, listing_validators)
+from datavisyn_project.app.repository_dp.file_repository import file_loader_stats
 
 router = APIRouter()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DATA_WINDOW_MAX_ROWS = int(os.getenv("DATA_WINDOW_MAX_ROWS", "100000"))
 
-@router.post("/upload_file/", response_model=file_schemas.UploadResponse, status_code=201)
+ARROW_RESPONSE = {"content": {ResponseFormat.ARROW.value: {}},
+                  "description": "Arrow IPC stream, sent for Accept: application/vnd.apache.arrow.stream"}
+
+
+@router.post("/upload_file/", response_model=file_schemas.UploadResponse, status_code=202)
 @handle_endpoint_errors
 async def upload_file(file: UploadFile = File(...), session: AsyncSession = Depends(get_async_session)):
-    """Upload a CSV file to the system."""
+    """Upload a CSV file; it is parsed in the background, poll its status until ready."""
     logger.info(f"Received upload request for file: {file.filename}")
     param = {"file": file, "db_session": session}
     uploading_file = await CSVFileFactory.get_service_method(ServiceMethod.SAVE_FILE, param).CSV_file()
     return file_schemas.UploadResponse.model_validate(uploading_file)
 
+@router.post("/upload_files/", response_model=file_schemas.BulkUploadResponse, status_code=202)
+@handle_endpoint_errors
+async def upload_files(files: List[UploadFile] = File(..., description="CSV files and/or zip archives of CSV files"),
+                       session: AsyncSession = Depends(get_async_session)):
+    """Upload many CSV files at once; the result of every file is reported separately."""
+    logger.info(f"Received bulk upload request with {len(files)} parts")
+    param = {"files": files, "db_session": session}
+    uploading_files = await CSVFileFactory.get_service_method(ServiceMethod.BULK_SAVE_FILES, param).CSV_file()
+    return file_schemas.BulkUploadResponse.model_validate(uploading_files)
+
 @router.get("/files", response_model=file_schemas.FileListResponse, status_code=200)
 @handle_endpoint_errors
-@cache(expire=60)
+@conditional_response(listing_validators(("page", "page_size", "cursor", "count")))
+@cache_response(namespace="files", expire=FILES_CACHE_TTL, key_params=("page", "page_size", "cursor", "count"))
 async def list_files(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous next_cursor; replaces page"),
+    count: Optional[TotalCountMode] = Query(None, description="How to compute total: exact, estimate or none; "
+                                                              "defaults to exact for pages and none with a cursor"),
     session: AsyncSession = Depends(get_async_session)
 ):
     """List all uploaded files with pagination"""
-    param = {"page": page, "page_size": page_size, "db_session": session}
+    param = {"page": page, "page_size": page_size, "cursor": cursor, "count": count, "db_session": session}
     listed_files = await CSVFileFactory.get_service_method(ServiceMethod.GET_LISTED_FILES, param).CSV_file()
     return file_schemas.FileListResponse.model_validate(listed_files)
 
+@router.get("/files/metadata", response_model=file_schemas.FileMetadataBatchResponse, status_code=200)
+@handle_endpoint_errors
+async def files_metadata(
+    file_id: List[uuid.UUID] = Query(..., description="Repeatable file id"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Get metadata for many files in one request; unknown ids are listed under missing"""
+    param = {"file_ids": file_id, "db_session": session}
+    files_metadata = await CSVFileFactory.get_service_method(
+        ServiceMethod.GET_FILES_METADATA, param).CSV_file()
+    return file_schemas.FileMetadataBatchResponse.model_validate(files_metadata)
+
 @router.get("/file/{file_id}/metadata", response_model=file_schemas.FileMetadataResponse, status_code=200)
 @handle_endpoint_errors
-async def file_metadata(file_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
+@conditional_response(file_metadata_validators)
+async def file_metadata(file_id: uuid.UUID, request: Request, session: AsyncSession = Depends(get_async_session)):
     """Get metadata for a specific file"""
     param = {"file_id": file_id, "db_session": session}
     file_metadata = await CSVFileFactory.get_service_method(
         ServiceMethod.GET_FILE_METADATA, param).CSV_file()
     return file_schemas.FileMetadataResponse.model_validate(file_metadata)
     
-@router.get("/file/{file_id}/data", response_model=file_schemas.FileDataResponse, status_code=200)
+@router.get("/file/{file_id}/status", response_model=file_schemas.IngestStatusResponse, status_code=200)
 @handle_endpoint_errors
-@cache(expire=120)
+async def file_status(file_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
+    """Ingest status of an uploaded file: pending, processing, ready or failed"""
+    param = {"file_id": file_id, "db_session": session}
+    file_metadata = await CSVFileFactory.get_service_method(
+        ServiceMethod.GET_FILE_METADATA, param).CSV_file()
+    return file_schemas.IngestStatusResponse.model_validate(file_metadata)
+
+@router.get("/file/{file_id}/data", response_model=file_schemas.FileDataResponse, status_code=200,
+            responses={200: ARROW_RESPONSE})
+@handle_endpoint_errors
+@conditional_response(file_data_validators(("page", "page_size", "columns", "filter", "sort", "response_format")))
+@cache_response(namespace="file_data", expire=FILE_DATA_CACHE_TTL, format_param="response_format",
+                key_params=("file_id", "page", "page_size", "columns", "filter", "sort", "response_format"))
 async def get_file_data(
     file_id: uuid.UUID,
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(100, ge=1, le=100, description="Rows per page"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    filter: Optional[List[str]] = Query(None, description="Repeatable column:op:value filter; op is eq, lt, gt, in (comma-separated values) or contains"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort columns, prefix with - for descending"),
+    response_format: ResponseFormat = Depends(negotiate_format),
     session: AsyncSession = Depends(get_async_session)
 ):
     logger.info(f"Retrieving data for file ID: {file_id}")
@@ -65,7 +133,96 @@ async def get_file_data(
         "file_id": file_id,
         "page": page,
         "page_size": page_size,
+        "columns": columns,
+        "filters": filter,
+        "sort": sort,
         "db_file": db_file
     }
     read_data =  await CSVFileFactory.get_service_method(ServiceMethod.READ_CSV_DATA, param).CSV_file()
-    return file_schemas.FileDataResponse.model_validate(read_data)
\ No newline at end of file
+    if response_format == ResponseFormat.ARROW:
+        return await run_in_thread(arrow_page_response, read_data)
+    # Encoded once from the frame slice; the documented schema stays FileDataResponse
+    return await run_in_thread(data_page_response, read_data)
+
+@router.get("/file/{file_id}/window", response_model=file_schemas.FileWindowResponse, status_code=200,
+            responses={200: ARROW_RESPONSE})
+@handle_endpoint_errors
+@conditional_response(file_data_validators(("offset", "limit", "columns", "filter", "sort", "response_format")))
+@cache_response(namespace="file_window", expire=FILE_DATA_CACHE_TTL, format_param="response_format",
+                key_params=("file_id", "offset", "limit", "columns", "filter", "sort", "response_format"))
+async def get_file_window(
+    file_id: uuid.UUID,
+    request: Request,
+    offset: int = Query(0, ge=0, description="First row of the window"),
+    limit: int = Query(10000, ge=1, le=DATA_WINDOW_MAX_ROWS, description="Rows in the window"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    filter: Optional[List[str]] = Query(None, description="Repeatable column:op:value filter; op is eq, lt, gt, in (comma-separated values) or contains"),
+    sort: Optional[str] = Query(None, description="Comma-separated sort columns, prefix with - for descending"),
+    response_format: ResponseFormat = Depends(negotiate_format),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Get a large row window of a file, for clients that fetch more than a page at a time"""
+    logger.info(f"Retrieving window of {limit} rows at {offset} for file ID: {file_id}")
+    param_db_file = {"file_id": file_id, "db_session": session}
+    db_file = await CSVFileFactory.get_service_method(
+                ServiceMethod.GET_FILE_METADATA,  param_db_file).CSV_file()
+    param = {
+        "file_id": file_id,
+        "offset": offset,
+        "limit": limit,
+        "columns": columns,
+        "filters": filter,
+        "sort": sort,
+        "db_file": db_file
+    }
+    read_data = await CSVFileFactory.get_service_method(ServiceMethod.READ_CSV_DATA, param).CSV_file()
+    if response_format == ResponseFormat.ARROW:
+        return await run_in_thread(arrow_page_response, read_data)
+    return await run_in_thread(data_page_response, read_data)
+
+@router.get("/file/{file_id}/export", status_code=200,
+            response_class=StreamingResponse, responses={200: {"content": {
+                "text/csv": {}, "application/x-ndjson": {}, ResponseFormat.ARROW.value: {}}}})
+@handle_endpoint_errors
+async def export_file(
+    file_id: uuid.UUID,
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv (stored bytes), ndjson or arrow"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Stream a whole file in chunks"""
+    logger.info(f"Exporting file ID: {file_id} as {format.value}")
+    param_db_file = {"file_id": file_id, "db_session": session}
+    db_file = await CSVFileFactory.get_service_method(
+                ServiceMethod.GET_FILE_METADATA,  param_db_file).CSV_file()
+    param = {"file_id": file_id, "format": format, "db_file": db_file}
+    export = await CSVFileFactory.get_service_method(ServiceMethod.EXPORT_FILE, param).CSV_file()
+    return StreamingResponse(
+        export["content"],
+        media_type=export["media_type"],
+        headers={"Content-Disposition": attachment_disposition(export["filename"])}
+    )
+
+
+def attachment_disposition(filename: str) -> str:
+    """Content-Disposition for a user-supplied filename (RFC 6266).
+
+    filename* carries the exact name percent-encoded as UTF-8; filename is
+    an ASCII fallback without quotes, backslashes or control characters.
+    """
+    ascii_name = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    ascii_name = re.sub(r'[^A-Za-z0-9._ ()-]', "_", ascii_name).strip() or "export"
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+@router.get("/cache/stats", response_model=file_schemas.CacheStatsResponse, status_code=200)
+@handle_endpoint_errors
+async def cache_stats():
+    """Hit ratios of the response, parsed-frame and metadata caches, executor load, and lookup and load coalescing"""
+    return file_schemas.CacheStatsResponse(
+        response_cache=response_cache_stats.snapshot(),
+        cache_backend=FastAPICache.get_backend().stats(),
+        frame_cache=frame_cache.stats(),
+        executors=executor_stats(),
+        metadata_loader=file_loader_stats(),
+        single_flight=file_loads.stats(),
+        metadata_cache=metadata_cache.stats()
+    )
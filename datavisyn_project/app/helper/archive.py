@@ -0,0 +1,100 @@
+import os
+import asyncio
+import logging
+import zipfile
+from pathlib import PurePosixPath
+from typing import List, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Members of one bulk request, across all archives
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "10000"))
+# Decompressed bytes of one archive member, and of all members of one request
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(1024 ** 3)))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", str(10 * 1024 ** 3)))
+
+
+class ArchiveMember:
+    """One file inside a zip archive, read like an UploadFile.
+
+    Members are decompressed lazily in worker threads, so several can
+    stream to storage at once without extracting the archive first. A
+    member rejected up front fails on its first read, and reading stops
+    as soon as a member inflates past its declared size or `max_bytes`,
+    since the size in the archive header can lie.
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo,
+                 max_bytes: int = ARCHIVE_MAX_MEMBER_BYTES, error: str = None):
+        # Folders inside the archive must not become folders in storage
+        self.filename = PurePosixPath(info.filename).name
+        self._archive = archive
+        self._info = info
+        self._handle = None
+        self._max_bytes = min(info.file_size, max_bytes)
+        self._read_bytes = 0
+        self._error = error
+
+    async def read(self, size: int = -1) -> bytes:
+        if self._error is not None:
+            raise ValueError(self._error)
+        if self._handle is None:
+            self._handle = await asyncio.to_thread(self._archive.open, self._info)
+        # One byte past the limit is enough to tell that it was exceeded
+        allowed = self._max_bytes - self._read_bytes + 1
+        chunk = await asyncio.to_thread(self._handle.read, allowed if size < 0 else min(size, allowed))
+        self._read_bytes += len(chunk)
+        if self._read_bytes > self._max_bytes:
+            raise ValueError(f"{self.filename} inflates past {self._max_bytes} bytes")
+        return chunk
+
+    async def close(self):
+        if self._handle is not None:
+            self._handle.close()
+
+
+def is_archive(file) -> bool:
+    return file.filename.lower().endswith(".zip")
+
+
+async def expand_uploads(files: list) -> Tuple[list, List[zipfile.ZipFile]]:
+    """Replace every uploaded zip archive by its members.
+
+    Returns the upload-like sources in request order and the opened
+    archives, which the caller closes once the members are stored.
+    Members declaring more than ARCHIVE_MAX_MEMBER_BYTES, or more than
+    what is left of ARCHIVE_MAX_TOTAL_BYTES, fail as single files.
+    """
+    sources, archives = [], []
+    remaining_bytes = ARCHIVE_MAX_TOTAL_BYTES
+    try:
+        for file in files:
+            if not is_archive(file):
+                sources.append(file)
+                continue
+            try:
+                archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+            except zipfile.BadZipFile:
+                raise ValueError(f"{file.filename} is not a valid zip archive")
+            archives.append(archive)
+            members = [info for info in archive.infolist()
+                       if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+            logger.info(f"Expanding {file.filename}: {len(members)} files")
+            for info in members:
+                error = None
+                if info.file_size > ARCHIVE_MAX_MEMBER_BYTES:
+                    error = f"Archive member is larger than {ARCHIVE_MAX_MEMBER_BYTES} bytes"
+                elif info.file_size > remaining_bytes:
+                    error = f"Archive members exceed {ARCHIVE_MAX_TOTAL_BYTES} bytes in total"
+                else:
+                    remaining_bytes -= info.file_size
+                sources.append(ArchiveMember(archive, info, error=error))
+
+        if len(sources) > BULK_MAX_FILES:
+            raise ValueError(f"Too many files in one request: {len(sources)}, at most {BULK_MAX_FILES}")
+    except Exception:
+        for archive in archives:
+            archive.close()
+        raise
+    return sources, archives
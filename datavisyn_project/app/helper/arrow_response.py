@@ -0,0 +1,39 @@
+import io
+import json
+from typing import Optional
+import pyarrow as pa
+from fastapi import Header, Response
+from datavisyn_project.app.helper.enum import ResponseFormat
+
+# Schema metadata key holding the page envelope (totals, page or window)
+ARROW_METADATA_KEY = b"datavisyn"
+
+
+def negotiate_format(accept: Optional[str] = Header(None)) -> ResponseFormat:
+    """Pick Arrow IPC when the Accept header asks for it; JSON stays the default."""
+    for media_range in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if media_type == ResponseFormat.ARROW.value and "q=0" not in params:
+            return ResponseFormat.ARROW
+    return ResponseFormat.JSON
+
+
+def encode_arrow_page(page: dict) -> bytes:
+    """Encode a data page or window as an Arrow IPC stream.
+
+    The envelope fields that JSON responses carry next to `data` are stored
+    as JSON in the schema metadata under ARROW_METADATA_KEY.
+    """
+    table = pa.Table.from_pandas(page["data"], preserve_index=False)
+    envelope = {field: value for field, value in page.items() if field != "data"}
+    envelope["id"] = str(envelope["id"])
+    table = table.replace_schema_metadata({ARROW_METADATA_KEY: json.dumps(envelope).encode("utf-8")})
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def arrow_page_response(page: dict) -> Response:
+    return Response(content=encode_arrow_page(page), media_type=ResponseFormat.ARROW.value)
@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi_cache.types import Backend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", "30"))
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "10000"))
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "datavisyn-cache:invalidate")
+
+
+class MemoryTier:
+    """Bounded in-process TTL cache used as L1."""
+
+    def __init__(self, max_entries: int = CACHE_L1_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._store = OrderedDict()
+
+    def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        entry = self._store.get(key)
+        if entry is None:
+            return 0, None
+        value, expires_at = entry
+        ttl = int(expires_at - time.monotonic())
+        if ttl <= 0:
+            del self._store[key]
+            return 0, None
+        self._store.move_to_end(key)
+        return ttl, value
+
+    def set(self, key: str, value: bytes, expire: int):
+        self._store[key] = (value, time.monotonic() + expire)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if key:
+            return 1 if self._store.pop(key, None) is not None else 0
+        keys = [k for k in self._store if not namespace or k.startswith(namespace)]
+        for k in keys:
+            del self._store[k]
+        return len(keys)
+
+
+class TieredCacheBackend(Backend):
+    """fastapi-cache backend with an in-process L1 in front of a shared Redis L2.
+
+    Without a Redis client it behaves as a plain in-process cache. Clearing a
+    namespace deletes it from Redis and publishes the namespace on
+    CACHE_INVALIDATION_CHANNEL so every worker drops it from its L1 as well.
+    """
+
+    def __init__(self, redis=None, l1_ttl: int = CACHE_L1_TTL,
+                 channel: str = CACHE_INVALIDATION_CHANNEL):
+        self.redis = redis
+        self.l1 = MemoryTier()
+        self.l1_ttl = l1_ttl
+        self.channel = channel
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self._listener = None
+
+    async def start(self):
+        """Subscribe to invalidations published by other workers."""
+        if self.redis is None:
+            return
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.redis is not None:
+            await self.redis.aclose()
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        ttl, value = self.l1.get_with_ttl(key)
+        if value is not None:
+            self.l1_hits += 1
+            return ttl, value
+        if self.redis is not None:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                ttl, value = await pipe.ttl(key).get(key).execute()
+            if value is not None:
+                self.l2_hits += 1
+                self.l1.set(key, value, min(ttl, self.l1_ttl) if ttl > 0 else self.l1_ttl)
+                return ttl, value
+        self.misses += 1
+        return 0, None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        if self.redis is not None:
+            await self.redis.set(key, value, ex=expire)
+            self.l1.set(key, value, min(expire or self.l1_ttl, self.l1_ttl))
+        else:
+            self.l1.set(key, value, expire or self.l1_ttl)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        count = self.l1.clear(namespace, key)
+        if self.redis is None:
+            return count
+        if key:
+            count = await self.redis.delete(key)
+        else:
+            count = 0
+            async for name in self.redis.scan_iter(match=f"{namespace}:*", count=500):
+                count += await self.redis.delete(name)
+        await self.redis.publish(self.channel, namespace or key)
+        return count
+
+    def stats(self) -> dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "shared": self.redis is not None,
+            "l1_entries": len(self.l1._store),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+        }
+
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                target = message["data"].decode("utf-8")
+                # A bare key or a namespace prefix, both are dropped from L1
+                self.l1.clear(namespace=target)
+                logger.info(f"Invalidated L1 cache entries for {target}")
+        finally:
+            await pubsub.aclose()
+
+
+def create_cache_backend() -> TieredCacheBackend:
+    """Build the response cache backend; shared through Redis when CACHE_REDIS_URL is set."""
+    if not CACHE_REDIS_URL:
+        logger.info("Using in-process response cache")
+        return TieredCacheBackend()
+
+    from redis.asyncio import Redis
+    logger.info("Using shared Redis response cache with in-process L1")
+    return TieredCacheBackend(Redis.from_url(CACHE_REDIS_URL))
@@ -0,0 +1,120 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STATS_SAMPLE_SIZE = int(os.getenv("STATS_SAMPLE_SIZE", "4096"))
+HLL_PRECISION = int(os.getenv("HLL_PRECISION", "12"))
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _leading_zeros(values: np.ndarray) -> np.ndarray:
+    """Count leading zero bits of every uint64 value."""
+    counts = np.zeros(len(values), dtype=np.uint8)
+    shifted = values.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        # Top `shift` bits are all zero
+        mask = shifted < (np.uint64(1) << np.uint64(64 - shift))
+        counts[mask] += shift
+        shifted[mask] <<= np.uint64(shift)
+    counts[values == 0] = 64
+    return counts
+
+
+class HyperLogLog:
+    """Approximate distinct counter over 64-bit hashes; about 1.6% error at precision 12."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        ranks = np.minimum(_leading_zeros(hashes << np.uint64(self.precision)) + 1, 64 - self.precision + 1)
+        np.maximum.at(self.registers, buckets, ranks.astype(np.uint8))
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small range correction: linear counting
+            raw = m * math.log(m / zeros)
+        return int(round(raw))
+
+
+class QuantileSample:
+    """Uniform fixed-size sample kept by random priority, used for approximate quantiles."""
+
+    def __init__(self, size: int = STATS_SAMPLE_SIZE, seed: int = 0):
+        self.size = size
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0)
+        self._values = np.empty(0)
+
+    def add(self, values: np.ndarray):
+        keys = np.concatenate((self._keys, self._rng.random(len(values))))
+        values = np.concatenate((self._values, values))
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, values = keys[keep], values[keep]
+        self._keys, self._values = keys, values
+
+    def quantiles(self, quantiles=QUANTILES):
+        if not len(self._values):
+            return None
+        return dict(zip((f"p{round(q * 100)}" for q in quantiles),
+                        (_finite(value) for value in np.quantile(self._values, quantiles))))
+
+
+class ColumnProfile:
+    """Running statistics of one column, updated batch by batch."""
+
+    def __init__(self):
+        self.count = 0
+        self.null_count = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0
+        self.distinct = HyperLogLog()
+        self.sample = QuantileSample()
+
+    def update(self, column: pa.ChunkedArray):
+        self.null_count += column.null_count
+        values = pc.drop_null(column)
+        if not len(values):
+            return
+        self.count += len(values)
+        array = values.to_numpy()
+        self.distinct.add_hashes(pd.util.hash_array(array))
+
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            numbers = array.astype(np.float64)
+            low, high = float(numbers.min()), float(numbers.max())
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+            self.total += float(numbers.sum())
+            self.sample.add(numbers)
+
+    def summary(self, dtype: str) -> dict:
+        numeric = self.minimum is not None
+        return {
+            "dtype": dtype,
+            "null_count": self.null_count,
+            "distinct_count": min(self.distinct.estimate(), self.count),
+            "min": _finite(self.minimum) if numeric else None,
+            "max": _finite(self.maximum) if numeric else None,
+            "mean": _finite(self.total / self.count) if numeric else None,
+            "quantiles": self.sample.quantiles() if numeric else None,
+        }
+
+
+def _finite(value):
+    """JSON has no NaN or infinity."""
+    return float(value) if value is not None and math.isfinite(value) else None
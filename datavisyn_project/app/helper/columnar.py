@@ -0,0 +1,185 @@
+import io
+import os
+import math
+import asyncio
+import logging
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "10000"))
+# Longer string bounds are left out of zone maps to keep the DB row small
+ZONE_MAP_MAX_STRING = int(os.getenv("ZONE_MAP_MAX_STRING", "64"))
+# Tail fetched first from remote sidecars; usually holds the whole footer
+PARQUET_FOOTER_PREFETCH = int(os.getenv("PARQUET_FOOTER_PREFETCH", str(64 * 1024)))
+# Column chunks closer than this are fetched with one range read
+PARQUET_RANGE_GAP = int(os.getenv("PARQUET_RANGE_GAP", str(1024 * 1024)))
+
+
+class SparseFile(io.RawIOBase):
+    """Read-only file of a known size backed by the byte ranges fetched so far.
+
+    Lets pyarrow decode a remote Parquet sidecar from its footer and the
+    column chunks of a few row groups; reading anywhere else is an error.
+    """
+
+    def __init__(self, size: int, ranges: dict):
+        self._size = size
+        self._ranges = sorted(ranges.items())
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = base + offset
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._size if size is None or size < 0 else min(self._position + size, self._size)
+        if end <= self._position:
+            return b""
+        for start, content in self._ranges:
+            if start <= self._position and end <= start + len(content):
+                chunk = content[self._position - start:end - start]
+                self._position = end
+                return bytes(chunk)
+        raise OSError(f"Bytes {self._position}-{end} of the sidecar were not fetched")
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+async def fetch_parquet_footer(storage, key: str) -> SparseFile:
+    """Fetch only the footer of a stored Parquet file, in one range read when it fits the prefetch."""
+    size = await storage.size(key)
+    start = max(size - PARQUET_FOOTER_PREFETCH, 0)
+    tail = await storage.read_range(key, start, size)
+    footer_start = size - 8 - int.from_bytes(tail[-8:-4], "little")
+    if footer_start < start:
+        tail = await storage.read_range(key, footer_start, start) + tail
+        start = footer_start
+    return SparseFile(size, {start: tail})
+
+
+async def fetch_parquet_row_groups(storage, key: str, footer: SparseFile, metadata,
+                                   row_groups: list, columns: list = None) -> SparseFile:
+    """Fetch the column chunks of some row groups, concurrently and with nearby chunks merged."""
+    ranges = []
+    for index in row_groups:
+        group = metadata.row_group(index)
+        for column in range(group.num_columns):
+            chunk = group.column(column)
+            if columns is not None and chunk.path_in_schema not in columns:
+                continue
+            start = chunk.dictionary_page_offset if chunk.has_dictionary_page else chunk.data_page_offset
+            ranges.append((start, start + chunk.total_compressed_size))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= PARQUET_RANGE_GAP:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    contents = await asyncio.gather(*(storage.read_range(key, start, end) for start, end in merged))
+    logger.info(f"Fetched {sum(map(len, contents))} bytes in {len(merged)} ranges for {len(row_groups)} row groups of {key}")
+    return SparseFile(footer._size, {**dict(footer._ranges), **{start: content for (start, _), content in zip(merged, contents)}})
+
+
+def parquet_metadata(source):
+    return pq.ParquetFile(_parquet_source(source)).metadata
+
+
+def page_row_groups(metadata, start: int, stop: int) -> tuple:
+    """Row groups covering rows [start, stop) and the first row of the first of them."""
+    row_groups = []
+    first_row = None
+    offset = 0
+    for index in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(index).num_rows
+        if offset + group_rows > start and offset < stop:
+            if first_row is None:
+                first_row = offset
+            row_groups.append(index)
+        offset += group_rows
+    return row_groups, first_row
+
+
+def _parquet_source(source):
+    # Whole sidecars come as buffers, remote ones as a SparseFile of the fetched ranges
+    return source if isinstance(source, SparseFile) else pa.BufferReader(source)
+
+
+def read_parquet_rows(source, start: int, stop: int):
+    """Read rows [start, stop) from a Parquet sidecar, decoding only the covering row groups.
+
+    Returns the page as a DataFrame together with the total row count of the file.
+    """
+    parquet_file = pq.ParquetFile(_parquet_source(source))
+    metadata = parquet_file.metadata
+    total_rows = metadata.num_rows
+    row_groups, first_row = page_row_groups(metadata, start, stop)
+
+    if not row_groups:
+        schema = parquet_file.schema_arrow
+        return schema.empty_table().to_pandas(), total_rows
+
+    table = parquet_file.read_row_groups(row_groups)
+    page = table.slice(start - first_row, stop - start)
+    logger.info(f"Decoded {len(row_groups)} of {metadata.num_row_groups} row groups for rows {start}-{stop}")
+    return page.to_pandas(), total_rows
+
+
+def read_parquet_frame(content: bytes):
+    """Decode a whole Parquet sidecar into a DataFrame."""
+    return pq.read_table(pa.BufferReader(content)).to_pandas()
+
+
+def read_parquet_row_groups(source, row_groups: list, columns: list):
+    """Decode only the given row groups and columns of a Parquet sidecar."""
+    parquet_file = pq.ParquetFile(_parquet_source(source))
+    if not row_groups:
+        return parquet_file.schema_arrow.empty_table().select(columns).to_pandas()
+    return parquet_file.read_row_groups(row_groups, columns=columns).to_pandas()
+
+
+def row_group_zone_maps(metadata) -> dict:
+    """Per row group [min, max, null_count] of every column, from the Parquet footer statistics."""
+    columns = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    row_groups = []
+    for index in range(metadata.num_row_groups):
+        group = metadata.row_group(index)
+        zones = []
+        for column in range(group.num_columns):
+            statistics = group.column(column).statistics
+            if statistics is None:
+                zones.append(None)
+                continue
+            low, high = (statistics.min, statistics.max) if statistics.has_min_max else (None, None)
+            if not all(_zone_bound(bound) for bound in (low, high)):
+                low, high = None, None
+            zones.append([low, high, statistics.null_count])
+        row_groups.append({"num_rows": group.num_rows, "zones": zones})
+    return {"columns": columns, "row_groups": row_groups}
+
+
+def _zone_bound(bound) -> bool:
+    """Whether a statistics bound can be stored as JSON in a zone map."""
+    if isinstance(bound, bytes):
+        return False
+    if isinstance(bound, str):
+        return len(bound) <= ZONE_MAP_MAX_STRING
+    if isinstance(bound, float):
+        return math.isfinite(bound)
+    return True
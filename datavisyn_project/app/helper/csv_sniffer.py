@@ -0,0 +1,110 @@
+import io
+import os
+import re
+import csv
+import codecs
+import logging
+from collections import Counter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNIFF_SAMPLE_BYTES = int(os.getenv("SNIFF_SAMPLE_BYTES", str(64 * 1024)))
+
+DELIMITERS = [',', ';', '\t', '|']
+QUOTECHARS = ['"', "'"]
+
+# Longest BOM first: the UTF-32 LE BOM starts with the UTF-16 LE one
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Encodings in which newline, quote and delimiter bytes are not single ASCII
+# bytes; uploads in these are transcoded to UTF-8 before they are stored
+WIDE_ENCODINGS = {"utf-16", "utf-32"}
+
+DEFAULT_DIALECT = {"encoding": "utf-8", "has_bom": False, "delimiter": ",", "quotechar": '"'}
+
+
+def sniff_csv(sample: bytes) -> dict:
+    """Detect encoding, BOM, delimiter and quote character from a bounded byte sample.
+
+    The sample is decoded once; the delimiter is the candidate that splits the
+    most records into the same number of fields, quote-aware.
+    """
+    encoding, has_bom = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample)
+    # Only look at complete lines of the sample
+    if "\n" in text:
+        text = text[:text.rindex("\n") + 1]
+
+    quotechar = _detect_quotechar(text)
+    return {
+        "encoding": encoding,
+        "has_bom": has_bom,
+        "delimiter": _detect_delimiter(text, quotechar),
+        "quotechar": quotechar,
+    }
+
+
+def detect_encoding(sample: bytes):
+    """Return (encoding, has_bom); without a BOM try UTF-8, then cp1252, then latin-1."""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding, True
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            # Not final: the sample may end inside a multi-byte character
+            codecs.getincrementaldecoder(encoding)().decode(sample)
+            return encoding, False
+        except UnicodeDecodeError:
+            continue
+    return "latin-1", False
+
+
+def _detect_quotechar(text: str) -> str:
+    """Pick the quote character that most often opens a field."""
+    separators = re.escape("".join(DELIMITERS))
+    counts = {
+        quotechar: len(re.findall(rf"(?:^|[{separators}]){re.escape(quotechar)}", text, re.MULTILINE))
+        for quotechar in QUOTECHARS
+    }
+    best = max(QUOTECHARS, key=lambda quotechar: counts[quotechar])
+    return best if counts[best] else QUOTECHARS[0]
+
+
+def _detect_delimiter(text: str, quotechar: str) -> str:
+    best, best_score = DEFAULT_DIALECT["delimiter"], (0.0, 0)
+    for delimiter in DELIMITERS:
+        try:
+            field_counts = [len(row) for row in
+                            csv.reader(io.StringIO(text), delimiter=delimiter, quotechar=quotechar) if row]
+        except csv.Error:
+            continue
+        if not field_counts:
+            continue
+        fields, frequency = Counter(field_counts).most_common(1)[0]
+        if fields < 2:
+            continue
+        # Consistency across records first, then the wider split
+        score = (frequency / len(field_counts), fields)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+class UTF8Transcoder:
+    """Re-encode a chunked byte stream to UTF-8, carrying split characters across chunks."""
+
+    def __init__(self, encoding: str):
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def feed(self, chunk: bytes) -> bytes:
+        return self._decoder.decode(chunk).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return self._decoder.decode(b"", final=True).encode("utf-8")
@@ -0,0 +1,271 @@
+import io
+import os
+import logging
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+from datavisyn_project.app.helper.columnar import PARQUET_ROW_GROUP_SIZE, row_group_zone_maps
+from datavisyn_project.app.helper.column_stats import ColumnProfile
+from datavisyn_project.app.helper.row_index import RowIndexBuilder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARSE_BATCH_BYTES = int(os.getenv("PARSE_BATCH_BYTES", str(8 * 1024 * 1024)))
+
+
+def widen_type(current: pa.DataType, other: pa.DataType) -> pa.DataType:
+    """Smallest column type able to hold values of both types."""
+    if current is None or pa.types.is_null(current):
+        return other
+    if pa.types.is_null(other) or current == other:
+        return current
+    if pa.types.is_integer(current) and pa.types.is_floating(other):
+        return other
+    if pa.types.is_floating(current) and pa.types.is_integer(other):
+        return current
+    return pa.string()
+
+
+def arrow_type(dtype: str) -> pa.DataType:
+    """Column type that reproduces a pandas_dtype result when parsing a CSV with Arrow."""
+    if dtype == "int64":
+        return pa.int64()
+    if dtype == "float64":
+        return pa.float64()
+    if dtype in ("bool", "object"):
+        # pandas_dtype reports nullable booleans as object
+        return pa.bool_()
+    return pa.string()
+
+
+def pandas_dtype(arrow_type: pa.DataType, has_nulls: bool) -> str:
+    """dtype pandas would give this column when parsing the whole file."""
+    if pa.types.is_integer(arrow_type):
+        return "float64" if has_nulls else "int64"
+    if pa.types.is_floating(arrow_type) or pa.types.is_null(arrow_type):
+        return "float64"
+    if pa.types.is_boolean(arrow_type):
+        return "object" if has_nulls else "bool"
+    return "str"
+
+
+class CSVStreamParser:
+    """Parse a CSV fed in arbitrary byte chunks with bounded memory.
+
+    Complete records are parsed in batches of about PARSE_BATCH_BYTES and
+    appended to a Parquet sidecar spooled to a temporary file, while a
+    RowIndexBuilder tracks row boundaries and a ColumnProfile per column
+    collects statistics. When a later batch needs a wider
+    column type than the sidecar was started with, the sidecar is dropped
+    and `needs_rewrite` is set so the caller can run a second pass with
+    `column_types` fixed to the widened schema.
+    """
+
+    def __init__(self, delimiter: str, column_types: dict = None, encoding: str = "utf-8", quotechar: str = '"',
+                 batch_bytes: int = PARSE_BATCH_BYTES, row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.quotechar = quotechar
+        self.column_types = column_types
+        self.batch_bytes = batch_bytes
+        self.row_group_size = row_group_size
+        self.index = RowIndexBuilder(quotechar=quotechar)
+        self.columns = None
+        self.types = {}
+        self.nullable = set()
+        self.profiles = {}
+        self.row_count = 0
+        self.needs_rewrite = False
+        self._buffer = bytearray()
+        self._consumed = 0
+        self._sidecar = None
+        self._writer = None
+
+    def feed(self, chunk: bytes):
+        """Consume the next chunk of raw CSV bytes."""
+        self.index.feed(chunk)
+        self._buffer += chunk
+        if self.columns is None:
+            if self.index.data_start is None:
+                return
+            self._read_header(self.index.data_start - self._consumed)
+        complete = self.index.complete_offset - self._consumed
+        if complete >= self.batch_bytes:
+            self._parse_batch(complete)
+
+    def finish(self) -> dict:
+        """Parse the remaining bytes and summarize the file."""
+        index = self.index.finish()
+        if self.columns is None:
+            self._read_header(index["data_start"] - self._consumed)
+        if self._buffer:
+            self._parse_batch(len(self._buffer))
+        if self._writer is not None:
+            self._writer.close()
+
+        sidecar = None
+        zone_maps = None
+        if self._writer is not None and not self.needs_rewrite:
+            self._sidecar.seek(0)
+            zone_maps = row_group_zone_maps(pq.read_metadata(self._sidecar))
+            self._sidecar.seek(0)
+            sidecar = self._sidecar
+        elif self._sidecar is not None:
+            self._sidecar.close()
+
+        if index["row_count"] != self.row_count:
+            logger.warning(f"Row index counted {index['row_count']} rows, parser {self.row_count}; dropping index")
+            index = None
+        else:
+            index["dtypes"] = self.dtypes()
+
+        return {
+            "row_count": self.row_count,
+            "columns": self.columns,
+            "row_index": index,
+            "parquet": sidecar,
+            "zone_maps": zone_maps,
+            "column_stats": self.column_stats(),
+        }
+
+    def schema(self) -> dict:
+        """Widened column types seen so far, usable as `column_types` for a rewrite."""
+        return {column: self.types.get(column, pa.null()) for column in self.columns}
+
+    def dtypes(self) -> dict:
+        return {
+            column: pandas_dtype(self.types.get(column, pa.null()), column in self.nullable)
+            for column in self.columns
+        }
+
+    def column_stats(self) -> dict:
+        dtypes = self.dtypes()
+        return {column: self.profiles.get(column, ColumnProfile()).summary(dtypes[column])
+                for column in self.columns}
+
+    def _read_header(self, header_end: int):
+        header = bytes(self._buffer[:header_end])
+        try:
+            self.columns = [str(column) for column in
+                            pd.read_csv(io.BytesIO(header), nrows=0, **self._pandas_options()).columns]
+        except Exception as e:
+            raise HTTPException(400, f"Invalid CSV format: {str(e)}")
+        self._drop(header_end)
+
+    def _parse_batch(self, length: int):
+        data = bytes(self._buffer[:length])
+        self._drop(length)
+        if not data.strip():
+            return
+        table = self._read_table(data)
+        self.row_count += table.num_rows
+        for name, column in zip(self.columns, table.columns):
+            self.types[name] = widen_type(self.types.get(name), column.type)
+            if column.null_count:
+                self.nullable.add(name)
+            self.profiles.setdefault(name, ColumnProfile()).update(column)
+        self._append_to_sidecar(table)
+
+    def _read_table(self, data: bytes) -> pa.Table:
+        read_options = pa_csv.ReadOptions(column_names=self.columns, encoding=self.encoding)
+        parse_options = pa_csv.ParseOptions(delimiter=self.delimiter, quote_char=self.quotechar)
+        column_types = dict(self.column_types or {})
+        try:
+            table = pa_csv.read_csv(io.BytesIO(data), read_options=read_options, parse_options=parse_options,
+                                    convert_options=self._convert_options(column_types))
+            # pandas keeps dates and times as text, so do the same
+            temporal = {field.name: pa.string() for field in table.schema
+                        if pa.types.is_temporal(field.type) and field.name not in column_types}
+            if temporal:
+                column_types.update(temporal)
+                table = pa_csv.read_csv(io.BytesIO(data), read_options=read_options, parse_options=parse_options,
+                                        convert_options=self._convert_options(column_types))
+            return table
+        except pa.ArrowInvalid:
+            # Ragged rows etc.: fall back to the more lenient pandas parser
+            return self._read_table_with_pandas(data)
+
+    def _read_table_with_pandas(self, data: bytes) -> pa.Table:
+        try:
+            df = pd.read_csv(io.BytesIO(data), header=None, names=self.columns, index_col=False,
+                             **self._pandas_options())
+        except Exception as e:
+            raise HTTPException(400, f"Invalid CSV format: {str(e)}")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.column_types:
+            table = table.cast(pa.schema(self.column_types.items()))
+        return table
+
+    def _pandas_options(self) -> dict:
+        return {"delimiter": self.delimiter, "encoding": self.encoding, "quotechar": self.quotechar}
+
+    def _convert_options(self, column_types: dict) -> pa_csv.ConvertOptions:
+        return pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+
+    def _append_to_sidecar(self, table: pa.Table):
+        if self.needs_rewrite:
+            return
+        if self._writer is None:
+            self._sidecar = tempfile.TemporaryFile()
+            self._writer = pq.ParquetWriter(self._sidecar, table.schema)
+        schema = self._writer.schema
+        for field, column in zip(schema, table.columns):
+            if widen_type(field.type, column.type) != field.type:
+                logger.info(f"Column '{field.name}' widened to {column.type}; sidecar needs a rewrite")
+                self.needs_rewrite = True
+                return
+        self._writer.write_table(table.cast(schema), row_group_size=self.row_group_size)
+
+    def _drop(self, length: int):
+        del self._buffer[:length]
+        self._consumed += length
+
+
+class CSVBatchReader(CSVStreamParser):
+    """Parse a chunked CSV into Arrow tables returned as soon as they are complete.
+
+    Used for streaming exports: nothing is spooled or profiled, and every
+    table has the same schema because column types are fixed up front
+    (plain strings when none are given).
+    """
+
+    def __init__(self, delimiter: str, column_types: dict = None, encoding: str = "utf-8", quotechar: str = '"',
+                 batch_bytes: int = PARSE_BATCH_BYTES):
+        super().__init__(delimiter, column_types, encoding, quotechar, batch_bytes)
+        self._tables = []
+
+    def feed(self, chunk: bytes) -> list:
+        """Consume the next chunk; returns the tables completed by it."""
+        super().feed(chunk)
+        return self._drain()
+
+    def finish(self) -> list:
+        """Parse the remaining bytes; returns the last tables."""
+        index = self.index.finish()
+        if self.columns is None:
+            self._read_header(index["data_start"] - self._consumed)
+        if self._buffer:
+            self._parse_batch(len(self._buffer))
+        return self._drain()
+
+    def arrow_schema(self) -> pa.Schema:
+        return pa.schema([(column, self.column_types[column]) for column in self.columns])
+
+    def _read_header(self, header_end: int):
+        super()._read_header(header_end)
+        if self.column_types is None:
+            self.column_types = {column: pa.string() for column in self.columns}
+
+    def _parse_batch(self, length: int):
+        data = bytes(self._buffer[:length])
+        self._drop(length)
+        if data.strip():
+            self._tables.append(self._read_table(data))
+
+    def _drain(self) -> list:
+        tables, self._tables = self._tables, []
+        return tables
@@ -0,0 +1,146 @@
+import re
+import logging
+from typing import List, Optional
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FILTER_OPERATORS = ("eq", "lt", "gt", "in", "contains")
+FILTER_PATTERN = re.compile(rf"^(?P<column>.+?):(?P<op>{'|'.join(FILTER_OPERATORS)}):(?P<value>.*)$", re.DOTALL)
+LIST_SEPARATOR = ","
+
+
+def coerce_value(value: str, dtype: str):
+    """Convert a query string value to the type of the column it is compared with."""
+    if dtype in ("int64", "float64") or dtype.startswith(("int", "float", "uint")):
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a number")
+    if dtype in ("bool", "object"):
+        # pandas_dtype reports nullable booleans as object
+        if value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if dtype == "bool":
+            raise ValueError(f"'{value}' is not a boolean")
+    return value
+
+
+class Predicate:
+    """One `column:op:value` filter."""
+
+    def __init__(self, column: str, op: str, value: str):
+        self.column = column
+        self.op = op
+        self.raw_value = value
+
+    @classmethod
+    def parse(cls, expression: str) -> "Predicate":
+        match = FILTER_PATTERN.match(expression)
+        if not match:
+            raise ValueError(
+                f"Invalid filter '{expression}', expected column:op:value with op one of {', '.join(FILTER_OPERATORS)}")
+        return cls(match["column"], match["op"], match["value"])
+
+    def values(self, dtype: str) -> list:
+        raw = self.raw_value.split(LIST_SEPARATOR) if self.op == "in" else [self.raw_value]
+        return [coerce_value(value, dtype) for value in raw]
+
+    def mask(self, series: pd.Series) -> pd.Series:
+        if self.op == "contains":
+            return series.astype("str").str.contains(self.raw_value, regex=False, na=False)
+        values = self.values(str(series.dtype))
+        if self.op == "eq":
+            return series == values[0]
+        if self.op == "lt":
+            return series < values[0]
+        if self.op == "gt":
+            return series > values[0]
+        return series.isin(values)
+
+    def may_match(self, zone: Optional[list], num_rows: int, dtype: Optional[str]) -> bool:
+        """Whether a row group with this [min, max, null_count] zone can hold a matching row."""
+        if self.op == "contains" or dtype is None or zone is None:
+            return True
+        low, high, null_count = zone
+        if null_count == num_rows:
+            return False
+        if low is None or high is None:
+            return True
+        try:
+            values = self.values(dtype)
+            if self.op == "lt":
+                return low < values[0]
+            if self.op == "gt":
+                return high > values[0]
+            return any(low <= value <= high for value in values)
+        except TypeError:
+            # Zone and value are not comparable, keep the group
+            return True
+
+
+class DataQuery:
+    """Projection, filters and sort keys for a data page request."""
+
+    def __init__(self, columns: Optional[List[str]] = None, filters: Optional[List[Predicate]] = None,
+                 sort: Optional[List[tuple]] = None):
+        self.columns = columns or []
+        self.filters = filters or []
+        self.sort = sort or []
+
+    @classmethod
+    def parse(cls, columns: Optional[str] = None, filters: Optional[List[str]] = None,
+              sort: Optional[str] = None) -> "DataQuery":
+        projection = [column.strip() for column in columns.split(",") if column.strip()] if columns else []
+        predicates = [Predicate.parse(expression) for expression in filters or []]
+        sort_keys = []
+        for key in (sort or "").split(","):
+            key = key.strip()
+            if key:
+                # "-column" sorts descending; only that one dash is a direction
+                sort_keys.append((key[1:] if key.startswith("-") else key, not key.startswith("-")))
+        return cls(projection, predicates, sort_keys)
+
+    def is_empty(self) -> bool:
+        return not (self.columns or self.filters or self.sort)
+
+    def validate(self, available: List[str]):
+        referenced = self.columns + [p.column for p in self.filters] + [column for column, _ in self.sort]
+        unknown = [column for column in referenced if column not in available]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(dict.fromkeys(unknown))}")
+
+    def required_columns(self, available: List[str]) -> List[str]:
+        """Columns that must be decoded to filter, sort and project, in file order."""
+        if not self.columns:
+            return list(available)
+        needed = set(self.columns) | {p.column for p in self.filters} | {column for column, _ in self.sort}
+        return [column for column in available if column in needed]
+
+    def prune_row_groups(self, zone_maps: dict, dtypes: dict) -> List[int]:
+        """Indices of row groups whose zone maps do not rule out every filter."""
+        columns = zone_maps["columns"]
+        selected = []
+        for index, group in enumerate(zone_maps["row_groups"]):
+            zones = dict(zip(columns, group["zones"]))
+            if all(p.may_match(zones.get(p.column), group["num_rows"], dtypes.get(p.column))
+                   for p in self.filters):
+                selected.append(index)
+        logger.info(f"Zone maps kept {len(selected)} of {len(zone_maps['row_groups'])} row groups")
+        return selected
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Filter, sort and project a frame with vectorized operations."""
+        if self.filters:
+            mask = pd.Series(True, index=df.index)
+            for predicate in self.filters:
+                mask &= predicate.mask(df[predicate.column])
+            df = df[mask]
+        if self.sort:
+            df = df.sort_values(by=[column for column, _ in self.sort],
+                                ascending=[ascending for _, ascending in self.sort],
+                                kind="stable", na_position="last")
+        if self.columns:
+            df = df[self.columns]
+        return df.reset_index(drop=True)
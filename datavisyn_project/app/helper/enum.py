@@ -4,7 +4,30 @@ class ServiceMethod(str, Enum):
     SAVE_FILE = "save_file"
     GET_LISTED_FILES = "get_listed_files"
     GET_FILE_METADATA = "get_file_metadata"
+    GET_FILES_METADATA = "get_files_metadata"
     READ_CSV_DATA = "read_csv_data"
+    EXPORT_FILE = "export_file"
+    BULK_SAVE_FILES = "bulk_save_files"
 
 class StorageRepositoryType(str, Enum):
-    FILE_METADATA = "file_metadata"
\ No newline at end of file
+    FILE_METADATA = "file_metadata"
+
+class TotalCountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+class ResponseFormat(str, Enum):
+    JSON = "application/json"
+    ARROW = "application/vnd.apache.arrow.stream"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    ARROW = "arrow"
+
+class IngestStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
@@ -0,0 +1,118 @@
+import os
+import asyncio
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 0 parse processes runs parsing on the thread pool, e.g. where forking is not allowed
+PARSE_PROCESSES = int(os.getenv("PARSE_PROCESSES", str(min(4, os.cpu_count() or 1))))
+COMPUTE_THREADS = int(os.getenv("COMPUTE_THREADS", str(min(8, (os.cpu_count() or 1) * 2))))
+EXECUTOR_QUEUE_DEPTH = int(os.getenv("EXECUTOR_QUEUE_DEPTH", "32"))
+EXECUTOR_RETRY_AFTER = int(os.getenv("EXECUTOR_RETRY_AFTER", "1"))
+# Workers are started from a threaded server process, so fork is not safe
+PARSE_START_METHOD = os.getenv("PARSE_START_METHOD", "spawn")
+
+
+class BoundedExecutor:
+    """An executor that admits at most `workers + queue_depth` jobs at a time.
+
+    Request handlers are rejected with 503 and Retry-After when it is full,
+    instead of queueing without bound behind a slow parse. Background jobs
+    that have no client to retry pass `wait=True` and wait for a slot.
+    """
+
+    def __init__(self, name: str, executor: Executor, workers: int, queue_depth: int = EXECUTOR_QUEUE_DEPTH):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.capacity = workers + queue_depth
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._counters = {"completed": 0, "rejected": 0}
+        self._in_flight = 0
+
+    async def run(self, fn, *args, wait: bool = False, **kwargs):
+        """Run fn(*args, **kwargs) on the executor without blocking the event loop."""
+        if not wait and self._slots.locked():
+            self._counters["rejected"] += 1
+            logger.warning(f"{self.name} executor is full ({self.capacity} jobs), rejecting {fn.__name__}")
+            raise HTTPException(status_code=503, detail="Server is busy, try again later",
+                                headers={"Retry-After": str(EXECUTOR_RETRY_AFTER)})
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+            finally:
+                self._in_flight -= 1
+                self._counters["completed"] += 1
+
+    def stats(self) -> dict:
+        return {**self._counters, "in_flight": self._in_flight, "workers": self.workers, "capacity": self.capacity}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# One pair of executors per process, managed by the app lifespan
+_parse_executor = None
+_thread_executor = None
+
+def create_thread_executor() -> BoundedExecutor:
+    return BoundedExecutor("thread", ThreadPoolExecutor(COMPUTE_THREADS, thread_name_prefix="compute"),
+                           COMPUTE_THREADS)
+
+def create_parse_executor(thread_executor: BoundedExecutor) -> BoundedExecutor:
+    if PARSE_PROCESSES <= 0:
+        return thread_executor
+    context = multiprocessing.get_context(PARSE_START_METHOD)
+    return BoundedExecutor("parse", ProcessPoolExecutor(PARSE_PROCESSES, mp_context=context), PARSE_PROCESSES)
+
+def get_thread_executor() -> BoundedExecutor:
+    """Threads for work that releases the GIL: Arrow/Parquet decoding, numpy kernels, encoders"""
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = create_thread_executor()
+    return _thread_executor
+
+def get_parse_executor() -> BoundedExecutor:
+    """Processes for pure CPU work that holds the GIL, such as pandas CSV parsing"""
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = create_parse_executor(get_thread_executor())
+    return _parse_executor
+
+async def run_in_thread(fn, *args, wait: bool = False, **kwargs):
+    return await get_thread_executor().run(fn, *args, wait=wait, **kwargs)
+
+async def run_in_process(fn, *args, wait: bool = False, **kwargs):
+    """fn and its arguments must be picklable: module-level functions and plain data"""
+    return await get_parse_executor().run(fn, *args, wait=wait, **kwargs)
+
+def executor_stats() -> dict:
+    """Stats of the executors created so far; reading them never creates one"""
+    stats = {name: {"completed": 0, "rejected": 0, "in_flight": 0, "workers": 0, "capacity": None}
+             for name in ("thread", "parse" if PARSE_PROCESSES > 0 else "thread")}
+    for executor in (_thread_executor, _parse_executor):
+        if executor is not None:
+            stats[executor.name] = executor.stats()
+    return stats
+
+def init_executors():
+    """Create the executors at application startup; worker processes start on first use"""
+    global _parse_executor, _thread_executor
+    _thread_executor = create_thread_executor()
+    _parse_executor = create_parse_executor(_thread_executor)
+    logger.info(f"Executors ready: {PARSE_PROCESSES} parse processes, {COMPUTE_THREADS} threads")
+
+async def close_executors():
+    """Shut the executors down at application shutdown, dropping queued jobs"""
+    global _parse_executor, _thread_executor
+    executors = {executor for executor in (_parse_executor, _thread_executor) if executor is not None}
+    _parse_executor = _thread_executor = None
+    for executor in executors:
+        await asyncio.to_thread(executor.shutdown)
@@ -1,45 +1,163 @@
 import uuid
 import io
+import hashlib
+import os
 import logging
-import pandas as pd
-from fastapi import HTTPException, status
+from typing import Optional
+from fastapi import HTTPException
+from datavisyn_project.models.file_model import CSVFiles
 from datavisyn_project.models.schema import file_schemas
-from datavisyn_project.app.storage import get_storage_backend
+from datavisyn_project.app.helper.enum import IngestStatus
+from datavisyn_project.app.storage.base import StorageBackend
+from datavisyn_project.app.storage import get_file_storage, get_storage_backend, upload_codec
+from datavisyn_project.app.helper.csv_stream import CSVStreamParser
+from datavisyn_project.app.helper.csv_sniffer import SNIFF_SAMPLE_BYTES, WIDE_ENCODINGS, UTF8Transcoder, sniff_csv
+from datavisyn_project.app.helper.row_index import dump_row_index
+from datavisyn_project.app.helper.executor import run_in_thread
 
 logger = logging.getLogger(__name__)
 
-DELIMITERS = [',', ';', '\t', '|']
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
 
-async def read_file_info(file) -> file_schemas.FileMetadataCreate:
-    """Extract metadata from uploaded CSV file and save to storage."""
+# Metadata derived from the stored bytes, shared by every upload of the same content
+CONTENT_FIELDS = ("delimiter", "encoding", "quotechar", "row_count", "column_count", "columns",
+                  "column_stats", "parquet_filename", "zone_maps", "row_index_filename")
+
+
+async def store_upload(file) -> file_schemas.FileMetadataCreate:
+    """Stream an uploaded CSV file to a staging key in storage and return its pending metadata.
+
+    Parsing, profiling and sidecars are left to the ingest workers, so the
+    request only costs one pass of network-to-storage copying. The content
+    hash is taken on the way; adopt_stored_object moves the staged object
+    to its content-addressed key.
+    """
     await _validate_csv_file(file)
-    
-    content = await file.read()
+
     file_id = uuid.uuid4()
-    
+
     try:
-        # Parse CSV metadata
-        df, delimiter = await _parse_csv_metadata(content, file.filename)
-        
-        # Save to storage
-        stored_filename = await _save_to_storage(file_id, content, file.filename)
-        
-        # Create metadata
+        # Sniff the dialect once, on a bounded sample of the first chunk
+        first_chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        dialect = await run_in_thread(sniff_csv, first_chunk[:SNIFF_SAMPLE_BYTES])
+        logger.info(f"Detected {dialect} for {file.filename}")
+
+        # UTF-16/32 uploads are stored as UTF-8 so rows can be split on single bytes
+        transcoder = None
+        encoding = dialect["encoding"]
+        if encoding in WIDE_ENCODINGS:
+            transcoder = UTF8Transcoder(encoding)
+            encoding = "utf-8"
+
+        codec = upload_codec()
+        stored_filename, file_size, content_hash = await _stream_to_storage(
+            get_file_storage(codec), file_id, file, first_chunk, transcoder)
+
         return file_schemas.FileMetadataCreate(
             id=file_id,
             original_filename=file.filename,
             stored_filename=stored_filename,
-            file_size=len(content),
-            row_count=len(df),
-            column_count=len(df.columns),
-            columns=df.columns.tolist(),
-            delimiter=delimiter
+            file_size=file_size,
+            delimiter=dialect["delimiter"],
+            encoding=encoding,
+            quotechar=dialect["quotechar"],
+            has_bom=dialect["has_bom"],
+            content_hash=content_hash,
+            codec=codec,
+            status=IngestStatus.PENDING.value
         )
-        
+
     finally:
         await file.close()
 
 
+async def adopt_stored_object(file_info: file_schemas.FileMetadataCreate,
+                              duplicate: Optional[CSVFiles]) -> file_schemas.FileMetadataCreate:
+    """Point a staged upload at the content-addressed copy of its bytes.
+
+    The first upload of some content is moved to content_key(); later ones
+    drop their staged copy and share the stored object of `duplicate`,
+    together with its parsed metadata and sidecars once that is ingested.
+    """
+    storage = get_file_storage(file_info.codec)
+    if duplicate is None:
+        stored_filename = content_key(file_info.content_hash)
+        await storage.move(file_info.stored_filename, stored_filename)
+        return file_info.model_copy(update={"stored_filename": stored_filename})
+
+    await storage.delete(file_info.stored_filename)
+    # The shared object keeps the codec it was first stored with
+    update = {"stored_filename": duplicate.stored_filename, "codec": duplicate.codec}
+    if duplicate.status == IngestStatus.READY.value:
+        update.update({field: getattr(duplicate, field) for field in CONTENT_FIELDS})
+        update["status"] = IngestStatus.READY.value
+    logger.info(f"{file_info.original_filename} duplicates file ID {duplicate.id}, reusing {duplicate.stored_filename}")
+    return file_info.model_copy(update=update)
+
+
+async def delete_orphaned_objects(repository, created: list):
+    """Delete stored objects left without a row, unless another upload has recorded one since.
+
+    `created` holds the metadata of uploads whose object was first stored
+    by them; objects they merely reused belong to the earlier row.
+    """
+    try:
+        claimed = await repository.get_files_by_content_hashes([file_info.content_hash for file_info in created])
+    except Exception as e:
+        logger.error(f"Could not check {len(created)} orphaned objects, keeping them: {e!r}")
+        return
+    for file_info in created:
+        if file_info.content_hash in claimed:
+            continue
+        try:
+            await get_file_storage(file_info.codec).delete(file_info.stored_filename)
+        except Exception as e:
+            logger.error(f"Could not delete orphaned object {file_info.stored_filename}: {e!r}")
+
+
+def content_key(content_hash: str) -> str:
+    return f"sha256_{content_hash}.csv"
+
+
+async def ingest_stored_file(db_file: dict) -> dict:
+    """Parse a stored CSV file, save its sidecars and return the metadata to record."""
+    file_id = uuid.UUID(str(db_file["id"]))
+    filename = db_file["original_filename"]
+    stored_filename = db_file["stored_filename"]
+    storage = get_file_storage(db_file.get("codec"))
+
+    parser = CSVStreamParser(db_file["delimiter"], encoding=db_file.get("encoding") or "utf-8",
+                             quotechar=db_file.get("quotechar") or '"')
+    async for chunk in storage.read_stream(stored_filename, UPLOAD_CHUNK_SIZE):
+        await run_in_thread(parser.feed, chunk, wait=True)
+    summary = await run_in_thread(parser.finish, wait=True)
+
+    if summary["parquet"] is None and parser.needs_rewrite:
+        rewritten = await _rewrite_parquet_sidecar(storage, stored_filename, parser)
+        summary["parquet"] = rewritten["parquet"]
+        summary["zone_maps"] = rewritten["zone_maps"]
+        # Statistics of the first pass were taken with narrower column types
+        summary["column_stats"] = rewritten["column_stats"]
+
+    # Save columnar sidecar used for paging
+    parquet_filename = await _save_parquet_sidecar(file_id, summary["parquet"], filename)
+
+    # Save sparse row-offset index used for byte-range page reads
+    row_index_filename = await _save_row_index(file_id, summary["row_index"], filename)
+
+    logger.info(f"Parsed {filename}: {summary['row_count']} rows, {len(summary['columns'])} columns")
+
+    return {
+        "row_count": summary["row_count"],
+        "column_count": len(summary["columns"]),
+        "columns": summary["columns"],
+        "column_stats": summary["column_stats"],
+        "parquet_filename": parquet_filename,
+        "zone_maps": summary["zone_maps"] if parquet_filename else None,
+        "row_index_filename": row_index_filename
+    }
+
+
 async def _validate_csv_file(file):
     """Validate file is CSV type."""
     if not file.filename.endswith(".csv"):
@@ -49,47 +167,74 @@ async def _validate_csv_file(file):
         )
 
 
-async def _parse_csv_metadata(content: bytes, filename: str):
-    """Parse CSV content and detect delimiter."""
-    csv_data = io.StringIO(content.decode('utf-8'))
-    
-    # Detect delimiter
-    delimiter = _detect_delimiter(csv_data, filename)
-    
-    # Parse full CSV
-    csv_data.seek(0)
-    try:
-        df = pd.read_csv(csv_data, delimiter=delimiter)
-    except Exception as e:
-        raise HTTPException(400, f"Invalid CSV format: {str(e)}")
-    
-    logger.info(f"Parsed {filename}: {len(df)} rows, {len(df.columns)} columns")
-    return df, delimiter
+async def _stream_to_storage(storage: StorageBackend, file_id: uuid.UUID, file, first_chunk: bytes,
+                             transcoder: UTF8Transcoder = None) -> tuple:
+    """Write the upload to storage chunk by chunk; returns the stored name, raw size in bytes and SHA-256."""
+    file_size = 0
+    digest = hashlib.sha256()
 
+    async def counted_chunks():
+        nonlocal file_size
+        async for chunk in _upload_chunks(file, first_chunk, transcoder):
+            file_size += len(chunk)
+            digest.update(chunk)
+            yield chunk
 
-def _detect_delimiter(csv_data: io.StringIO, filename: str) -> str:
-    """Detect CSV delimiter from sample."""
-    for delimiter in DELIMITERS:
-        try:
-            csv_data.seek(0)
-            df = pd.read_csv(csv_data, nrows=5, delimiter=delimiter)
-            if len(df.columns) > 1:
-                logger.info(f"Detected delimiter '{delimiter}' for {filename}")
-                return delimiter
-        except:
-            continue
-    
-    logger.info(f"Using default delimiter ',' for {filename}")
-    return ','  # Default
+    await storage.save_stream(file_id, counted_chunks(), file.filename)
+
+    stored_filename = f"{file_id}_{file.filename}"
+    logger.info(f"Saved {file.filename} to storage as {stored_filename}")
+    return stored_filename, file_size, digest.hexdigest()
 
 
-async def _save_to_storage(file_id: uuid.UUID, content: bytes, filename: str) -> str:
-    """Save file to storage backend."""
+async def _upload_chunks(file, first_chunk: bytes, transcoder: UTF8Transcoder = None):
+    """Yield the upload in UPLOAD_CHUNK_SIZE chunks, re-encoded to UTF-8 when a transcoder is given."""
+    chunk = first_chunk
+    while chunk:
+        if transcoder is not None:
+            chunk = transcoder.feed(chunk)
+        if chunk:
+            yield chunk
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    if transcoder is not None and (tail := transcoder.finish()):
+        yield tail
+
+
+async def _rewrite_parquet_sidecar(storage: StorageBackend, stored_filename: str, parser: CSVStreamParser) -> dict:
+    """Second pass over the stored CSV with the widened column types fixed up front."""
+    rewrite = CSVStreamParser(parser.delimiter, column_types=parser.schema(),
+                              encoding=parser.encoding, quotechar=parser.quotechar)
+    size = parser.index.size
+    for start in range(0, size, UPLOAD_CHUNK_SIZE):
+        chunk = await storage.read_range(stored_filename, start, min(start + UPLOAD_CHUNK_SIZE, size))
+        await run_in_thread(rewrite.feed, chunk, wait=True)
+    return await run_in_thread(rewrite.finish, wait=True)
+
+
+async def _save_parquet_sidecar(file_id: uuid.UUID, parquet_file, filename: str):
+    """Save the spooled Parquet copy of the CSV; returns None when there is none."""
+    if parquet_file is None:
+        logger.warning(f"Skipping Parquet sidecar for {filename}")
+        return None
+
     storage = get_storage_backend()
-    file_stream = io.BytesIO(content)
-    
-    stored_filename = f"{file_id}_{filename}"
-    await storage.save(file_id, file_stream, filename)
-    
-    logger.info(f"Saved {filename} to storage as {stored_filename}")
-    return stored_filename
\ No newline at end of file
+    parquet_name = f"{filename}.parquet"
+    with parquet_file:
+        await storage.save(file_id, parquet_file, parquet_name)
+
+    logger.info(f"Saved Parquet sidecar for {filename}")
+    return f"{file_id}_{parquet_name}"
+
+
+async def _save_row_index(file_id: uuid.UUID, index: dict, filename: str):
+    """Save the row-offset index next to the CSV; returns None when it disagrees with the parser."""
+    if index is None:
+        logger.warning(f"Skipping row index for {filename}")
+        return None
+
+    storage = get_storage_backend()
+    index_name = f"{filename}.idx"
+    await storage.save(file_id, io.BytesIO(dump_row_index(index)), index_name)
+
+    logger.info(f"Saved row index for {filename} ({len(index['offsets'])} offsets)")
+    return f"{file_id}_{index_name}"
@@ -0,0 +1,90 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FRAME_CACHE_MAX_BYTES = int(os.getenv("FRAME_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Files larger than this on disk are paged from their sidecars instead of being loaded whole
+FRAME_CACHE_MAX_FILE_BYTES = int(os.getenv("FRAME_CACHE_MAX_FILE_BYTES", str(FRAME_CACHE_MAX_BYTES // 4)))
+
+
+class FrameCache:
+    """Process-local LRU cache of parsed DataFrames with a hard memory budget.
+
+    Sizes are measured with DataFrame.memory_usage(deep=True); least recently
+    used frames are evicted until a new frame fits.
+    """
+
+    def __init__(self, max_bytes: int = FRAME_CACHE_MAX_BYTES, max_file_bytes: int = FRAME_CACHE_MAX_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def accepts(self, file_size: Optional[int]) -> bool:
+        """Whether a file of this size on disk should be loaded whole and cached."""
+        return file_size is not None and file_size <= self.max_file_bytes
+
+    def get(self, file_id) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._frames.get(file_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(file_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, file_id, df: pd.DataFrame) -> bool:
+        """Cache a frame; returns False when it alone exceeds the budget."""
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            logger.info(f"Frame for {file_id} ({size} bytes) exceeds cache budget, not cached")
+            return False
+        with self._lock:
+            if file_id in self._frames:
+                self.current_bytes -= self._frames.pop(file_id)[1]
+            while self._frames and self.current_bytes + size > self.max_bytes:
+                evicted_id, (_, evicted_size) = self._frames.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+                logger.info(f"Evicted frame for {evicted_id} ({evicted_size} bytes)")
+            self._frames[file_id] = (df, size)
+            self.current_bytes += size
+        return True
+
+    def invalidate(self, file_id):
+        with self._lock:
+            entry = self._frames.pop(file_id, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._frames),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,76 @@
+import logging
+from typing import Optional
+from fastapi_cache import FastAPICache
+from datavisyn_project.app.helper.enum import IngestStatus, ServiceMethod, StorageRepositoryType
+from datavisyn_project.app.decorators.conditional_request import (
+    IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, make_etag)
+from datavisyn_project.app.decorators.response_cache import FILES_CACHE_TTL, build_cache_key
+from datavisyn_project.app.repository_dp.factory import RepositoryFactory
+from datavisyn_project.app.csv_factory.factory import CSVFileFactory
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Legacy uploads have no status and are ready
+FINISHED_STATUSES = (None, IngestStatus.READY.value, IngestStatus.FAILED.value)
+
+
+async def _file_metadata(kwargs: dict) -> dict:
+    param = {"file_id": kwargs["file_id"], "db_session": kwargs["session"]}
+    return await CSVFileFactory.get_service_method(ServiceMethod.GET_FILE_METADATA, param).CSV_file()
+
+
+def _content_key(db_file: dict) -> str:
+    # Legacy uploads have no content hash; their stored object is never rewritten
+    return db_file.get("content_hash") or db_file["stored_filename"]
+
+
+async def file_metadata_validators(kwargs: dict) -> dict:
+    """Strong ETag of a file's metadata; immutable once its ingest is finished."""
+    db_file = await _file_metadata(kwargs)
+    finished = db_file.get("status") in FINISHED_STATUSES
+    return {
+        "ETag": make_etag("metadata", db_file["id"], _content_key(db_file), db_file.get("status")),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if finished else REVALIDATE_CACHE_CONTROL,
+    }
+
+
+def file_data_validators(params: tuple):
+    """Strong ETag of a data page or window, from the file, its content and the `params` shaping the page."""
+    async def validators(kwargs: dict) -> Optional[dict]:
+        db_file = await _file_metadata(kwargs)
+        if db_file.get("status") not in (None, IngestStatus.READY.value):
+            # No data yet; the endpoint answers 409
+            return None
+        page = (f"{name}={kwargs.get(name)}" for name in params)
+        return {
+            "ETag": make_etag("data", db_file["id"], _content_key(db_file), *page),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            # The format is negotiated from the Accept header
+            "Vary": "Accept",
+        }
+    return validators
+
+
+def listing_validators(params: tuple):
+    """Weak ETag of a /files page, tied to the latest upload and the files per status."""
+    async def validators(kwargs: dict) -> dict:
+        version = await _listing_version(kwargs["session"])
+        return {
+            "ETag": make_etag("files", version, *(f"{name}={kwargs.get(name)}" for name in params), weak=True),
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+        }
+    return validators
+
+
+async def _listing_version(session) -> str:
+    """Kept with the cached listings, so it is dropped whenever they are invalidated."""
+    key = build_cache_key("files", {"listing_version": True})
+    backend = FastAPICache.get_backend()
+    version = await backend.get(key)
+    if version is not None:
+        return version.decode("utf-8")
+    repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, session)
+    version = await repository.get_listing_version()
+    await backend.set(key, version.encode("utf-8"), FILES_CACHE_TTL)
+    return version
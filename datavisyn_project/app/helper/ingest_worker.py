@@ -0,0 +1,206 @@
+import os
+import uuid
+import asyncio
+import logging
+from fastapi import HTTPException
+from datavisyn_project.core.db_setup import AsyncSessionLocal
+from datavisyn_project.app.helper.enum import IngestStatus, StorageRepositoryType
+from datavisyn_project.app.helper.file_processor import ingest_stored_file
+from datavisyn_project.app.repository_dp.factory import RepositoryFactory
+from datavisyn_project.app.decorators.response_cache import invalidate_responses
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_DEPTH = int(os.getenv("INGEST_QUEUE_DEPTH", "64"))
+INGEST_RETRY_AFTER = int(os.getenv("INGEST_RETRY_AFTER", "5"))
+# Seconds between looks for pending files that did not fit the queue
+INGEST_SWEEP_INTERVAL = float(os.getenv("INGEST_SWEEP_INTERVAL", "10"))
+
+# Workers open their own sessions, the request session is closed by the time they run
+session_factory = AsyncSessionLocal
+
+
+class IngestWorkerPool:
+    """Bounded queue of stored uploads waiting to be parsed, drained by a few workers.
+
+    Files that do not fit the queue stay pending in the database. A sweeper
+    queues them as slots free up, woken by `offer` or every
+    INGEST_SWEEP_INTERVAL seconds for rows left by other processes.
+    """
+
+    def __init__(self, workers: int = INGEST_WORKERS, queue_depth: int = INGEST_QUEUE_DEPTH):
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_depth)
+        self._tasks = []
+        self._counters = {"submitted": 0, "ready": 0, "failed": 0, "swept": 0}
+        # Queued or in progress here; the sweeper skips them
+        self._claimed = set()
+        self._backlog = asyncio.Event()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work(), name=f"ingest-worker-{n}")
+                       for n in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep_forever(), name="ingest-sweeper"))
+        logger.info(f"Started {self.workers} ingest workers")
+
+    def check_capacity(self):
+        """Reject an upload before it is stored when no job slot is free."""
+        if self.queue.full():
+            raise self._queue_full()
+
+    def submit(self, file_id: uuid.UUID):
+        """Queue a pending file; rejects with 503 instead of growing without bound."""
+        if not self.offer(file_id):
+            # Callers decide what becomes of the pending row
+            logger.warning(f"Ingest queue full, rejecting file ID: {file_id}")
+            raise self._queue_full()
+
+    def offer(self, file_id: uuid.UUID) -> bool:
+        """Queue a pending file if there is room, else leave it pending for the sweeper."""
+        if file_id in self._claimed:
+            return True
+        try:
+            self.queue.put_nowait(file_id)
+        except asyncio.QueueFull:
+            self._backlog.set()
+            return False
+        self._claimed.add(file_id)
+        self._counters["submitted"] += 1
+        return True
+
+    @staticmethod
+    def _queue_full() -> HTTPException:
+        return HTTPException(status_code=503, detail="Ingest queue is full, try again later",
+                             headers={"Retry-After": str(INGEST_RETRY_AFTER)})
+
+    async def recover(self):
+        """Requeue files left pending or half processed by a previous run."""
+        async with session_factory() as session:
+            repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, session)
+            reset = await repository.reset_file_status(IngestStatus.PROCESSING.value, IngestStatus.PENDING.value)
+        if reset:
+            logger.info(f"Reset {reset} half processed ingest jobs to pending")
+        await self.sweep()
+
+    async def sweep(self) -> int:
+        """Queue pending files that are not queued yet, as many as there is room for."""
+        self._backlog.clear()
+        room = self.queue.maxsize - self.queue.qsize()
+        if room <= 0:
+            self._backlog.set()
+            return 0
+        async with session_factory() as session:
+            repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, session)
+            file_ids = await repository.get_file_ids_by_status(
+                [IngestStatus.PENDING.value], exclude=self._claimed, limit=room + 1)
+        queued = sum(self.offer(file_id) for file_id in file_ids[:room])
+        if len(file_ids) > room:
+            # More are waiting; look again once workers free some slots
+            self._backlog.set()
+        if queued:
+            self._counters["swept"] += queued
+            logger.info(f"Queued {queued} pending ingest jobs")
+        return queued
+
+    async def join(self):
+        """Wait until every queued file, and every pending one waiting for room, has been ingested."""
+        await self.queue.join()
+        while await self.sweep():
+            await self.queue.join()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {**self._counters, "queued": self.queue.qsize(), "workers": self.workers if self._tasks else 0}
+
+    async def _work(self):
+        while True:
+            file_id = await self.queue.get()
+            try:
+                await self._ingest(file_id)
+            except Exception as e:
+                # Status could not be recorded; keep the worker alive for the next job
+                logger.error(f"Ingest bookkeeping failed for file ID {file_id}: {e!r}")
+            finally:
+                self._claimed.discard(file_id)
+                self.queue.task_done()
+
+    async def _sweep_forever(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._backlog.wait(), INGEST_SWEEP_INTERVAL)
+                # Let the workers free a few slots before looking again
+                await asyncio.sleep(0.1)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Could not queue pending ingest jobs: {e!r}")
+
+    async def _ingest(self, file_id: uuid.UUID):
+        async with session_factory() as session:
+            repository = RepositoryFactory.get_repository(StorageRepositoryType.FILE_METADATA, session)
+            db_file = await repository.get_file(file_id)
+            if db_file is None:
+                logger.warning(f"Skipping ingest of deleted file ID: {file_id}")
+                return
+            if not await repository.claim_file(file_id, IngestStatus.PENDING.value, IngestStatus.PROCESSING.value):
+                # Another process's pool got to it first
+                logger.info(f"Skipping ingest of file ID {file_id}, already {db_file.status}")
+                return
+            logger.info(f"Ingesting file ID: {file_id}")
+            try:
+                values = await ingest_stored_file({
+                    "id": db_file.id,
+                    "original_filename": db_file.original_filename,
+                    "stored_filename": db_file.stored_filename,
+                    "delimiter": db_file.delimiter,
+                    "encoding": db_file.encoding,
+                    "quotechar": db_file.quotechar,
+                    "codec": db_file.codec,
+                })
+            except Exception as e:
+                logger.error(f"Ingest failed for file ID {file_id}: {e!r}")
+                await repository.update_file(file_id, status=IngestStatus.FAILED.value,
+                                             error_message=str(e) or e.__class__.__name__)
+                self._counters["failed"] += 1
+            else:
+                await repository.update_file(file_id, status=IngestStatus.READY.value, **values)
+                self._counters["ready"] += 1
+                logger.info(f"File ID {file_id} is ready")
+        # Listings show the new status and row counts
+        await invalidate_responses("files")
+
+
+# One pool per process, managed by the app lifespan
+_ingest_pool = None
+
+def get_ingest_pool() -> IngestWorkerPool:
+    if _ingest_pool is None:
+        raise RuntimeError("Ingest workers are not running")
+    return _ingest_pool
+
+async def init_ingest_pool():
+    """Start the ingest workers at application startup and requeue unfinished jobs"""
+    global _ingest_pool
+    _ingest_pool = IngestWorkerPool()
+    _ingest_pool.start()
+    try:
+        await _ingest_pool.recover()
+    except Exception as e:
+        logger.error(f"Could not requeue unfinished ingest jobs: {e!r}")
+    return _ingest_pool
+
+async def close_ingest_pool():
+    """Stop the ingest workers at application shutdown; unfinished jobs are requeued on the next start"""
+    global _ingest_pool
+    if _ingest_pool is not None:
+        await _ingest_pool.close()
+        _ingest_pool = None
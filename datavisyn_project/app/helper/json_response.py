@@ -0,0 +1,19 @@
+import json
+from fastapi import Response
+
+
+def encode_data_page(page: dict) -> bytes:
+    """Encode a data page or window straight from its frame slice into response JSON.
+
+    The rows are written by pandas' C encoder in a single pass and spliced
+    into the small envelope, so they are never decoded back into Python
+    objects or validated row by row.
+    """
+    rows = page["data"].to_json(orient="records", date_format="iso")
+    head = json.dumps({"id": str(page["id"]), "filename": page["filename"]})
+    tail = json.dumps({field: value for field, value in page.items() if field not in ("id", "filename", "data")})
+    return f'{head[:-1]}, "data": {rows}, {tail[1:]}'.encode("utf-8")
+
+
+def data_page_response(page: dict) -> Response:
+    return Response(content=encode_data_page(page), media_type="application/json")
@@ -0,0 +1,71 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", "10000"))
+
+
+class MetadataCache:
+    """Process-local LRU cache of file metadata rows, bounded by entry count.
+
+    Entries have no TTL: only rows whose ingest is finished are cached, and
+    those never change afterwards. Anything that does change a row must
+    call `invalidate` for it.
+    """
+
+    def __init__(self, max_entries: int = METADATA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_id) -> Optional[Any]:
+        with self._lock:
+            row = self._rows.get(file_id)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(file_id)
+            self.hits += 1
+            return row
+
+    def put(self, file_id, row: Any):
+        with self._lock:
+            self._rows[file_id] = row
+            self._rows.move_to_end(file_id)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, file_id):
+        with self._lock:
+            if self._rows.pop(file_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._rows),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+metadata_cache = MetadataCache()
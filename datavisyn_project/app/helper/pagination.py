@@ -0,0 +1,19 @@
+import json
+import uuid
+import base64
+import datetime
+
+
+def encode_cursor(upload_timestamp: datetime.datetime, file_id: uuid.UUID) -> str:
+    """Opaque keyset cursor pointing just past a file in (upload_timestamp, id) order."""
+    payload = json.dumps([upload_timestamp.isoformat(), str(file_id)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors."""
+    try:
+        upload_timestamp, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.datetime.fromisoformat(upload_timestamp), uuid.UUID(file_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,124 @@
+import os
+import json
+import logging
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROW_INDEX_STRIDE = int(os.getenv("ROW_INDEX_STRIDE", "1000"))
+
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+
+
+class RowIndexBuilder:
+    """Incrementally record the byte offset of every Kth data row of a CSV.
+
+    Newlines inside quoted fields do not end a record and blank lines are
+    not counted, matching how pandas splits the file into rows.
+    """
+
+    def __init__(self, stride: int = ROW_INDEX_STRIDE, quotechar: str = '"'):
+        self.stride = stride
+        self.quote = ord(quotechar)
+        self.offsets = []
+        self.data_start = None
+        self.row_count = 0
+        self._header_seen = False
+        self.size = 0
+        self._in_quotes = 0
+        self._record_start = 0
+        self._last_byte = None
+
+    @property
+    def complete_offset(self) -> int:
+        """Offset just past the last complete record seen so far."""
+        return self._record_start
+
+    def feed(self, chunk: bytes):
+        """Consume the next chunk of raw CSV bytes."""
+        if not chunk:
+            return
+        base = self.size
+        data = np.frombuffer(chunk, dtype=np.uint8)
+
+        # Quote parity at every byte, carried over from the previous chunk
+        parity = (np.cumsum(data == self.quote) + self._in_quotes) & 1
+        newlines = np.flatnonzero(data == NEWLINE)
+        record_ends = newlines[parity[newlines] == 0] + base
+
+        if len(record_ends):
+            starts = np.concatenate(([self._record_start], record_ends[:-1] + 1))
+            lengths = record_ends - starts
+            # A record holding only "\r" is a blank CRLF line
+            last = record_ends - 1
+            last_bytes = np.where(
+                last >= base,
+                data[np.clip(last - base, 0, len(data) - 1)],
+                self._last_byte or 0,
+            )
+            blank = (lengths == 0) | ((lengths == 1) & (last_bytes == CARRIAGE_RETURN))
+            self._add_records(starts[~blank])
+            self._record_start = int(record_ends[-1]) + 1
+
+        self._in_quotes = int(parity[-1])
+        self._last_byte = int(data[-1])
+        self.size += len(chunk)
+
+    def finish(self) -> dict:
+        """Close the trailing record and return the serializable index."""
+        tail = self.size - self._record_start
+        if tail > 1 or (tail == 1 and self._last_byte != CARRIAGE_RETURN):
+            self._add_records(np.array([self._record_start]))
+        return {
+            "stride": self.stride,
+            "data_start": self.data_start if self.data_start is not None else self.size,
+            "size": self.size,
+            "row_count": self.row_count,
+            "offsets": self.offsets,
+        }
+
+    def _add_records(self, starts: np.ndarray):
+        if not self._header_seen and len(starts):
+            # First non-blank record is the header
+            self._header_seen = True
+            starts = starts[1:]
+        if not len(starts):
+            return
+        if self.data_start is None:
+            self.data_start = int(starts[0])
+        first = -self.row_count % self.stride
+        self.offsets.extend(int(start) for start in starts[first::self.stride])
+        self.row_count += len(starts)
+
+
+def build_row_index(content: bytes, stride: int = ROW_INDEX_STRIDE) -> dict:
+    """Build the sparse row index for an in-memory CSV."""
+    builder = RowIndexBuilder(stride)
+    builder.feed(content)
+    return builder.finish()
+
+
+def dump_row_index(index: dict) -> bytes:
+    return json.dumps(index).encode("utf-8")
+
+
+def load_row_index(content: bytes) -> dict:
+    return json.loads(content)
+
+
+def locate_rows(index: dict, start: int, stop: int):
+    """Translate a row window into the byte range holding it.
+
+    Returns (byte_start, byte_end, skip) where skip is the number of rows
+    between byte_start and the first requested row.
+    """
+    stride = index["stride"]
+    offsets = index["offsets"]
+    first_block = start // stride
+    last_block = -(-min(stop, index["row_count"]) // stride)
+
+    byte_start = offsets[first_block]
+    byte_end = offsets[last_block] if last_block < len(offsets) else index["size"]
+    return byte_start, byte_end, start - first_block * stride
@@ -0,0 +1,86 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """One in-flight load and the callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one load per key at a time; concurrent callers share its result.
+
+    The first caller starts the load as a task, later callers for the same
+    key await that task instead of starting their own. The key is released
+    once the load finishes, so nothing is cached here. A cancelled caller
+    does not cancel the load the others wait on.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._flights = {}
+        self.loads = 0
+        self.waiters = 0
+        self.max_waiters = 0
+        self.errors = 0
+        self.load_seconds = 0.0
+        self.wait_seconds = 0.0
+        # Load time the waiters would have spent repeating the load themselves
+        self.saved_seconds = 0.0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = Flight(asyncio.ensure_future(self._load(key, fn, *args, **kwargs)))
+            # Retrieve the error even when every caller was cancelled
+            flight.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self.loads += 1
+            return await asyncio.shield(flight.task)
+
+        flight.waiters += 1
+        self.waiters += 1
+        joined = time.perf_counter()
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            self.wait_seconds += time.perf_counter() - joined
+
+    async def _load(self, key: Hashable, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            flight = self._flights.pop(key)
+            self.load_seconds += elapsed
+            self.saved_seconds += elapsed * flight.waiters
+            self.max_waiters = max(self.max_waiters, flight.waiters)
+            if flight.waiters:
+                logger.info(f"{self.name}: {flight.waiters} callers shared the load of {key!r} ({elapsed:.3f}s)")
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "loads": self.loads,
+            "waiters": self.waiters,
+            "max_waiters": self.max_waiters,
+            "errors": self.errors,
+            "load_seconds": round(self.load_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+# Whole-file and page loads of GetFileDetail, shared by concurrent requests of the process
+file_loads = SingleFlight("file_loads")
@@ -1,9 +1,55 @@
+import os
 import uuid
+import weakref
+import datetime
 from datavisyn_project.models.schema import file_schemas 
 from datavisyn_project.models.file_model import CSVFiles
+from datavisyn_project.app.helper.enum import IngestStatus
+from datavisyn_project.app.helper.metadata_cache import metadata_cache
 from sqlalchemy import desc
 from typing import Optional, List
-from sqlalchemy import select
+from sqlalchemy import case, delete, insert, inspect, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .loader import BatchLoader
+
+# Below this many rows an exact COUNT(*) is cheap enough for estimated totals
+EXACT_COUNT_THRESHOLD = int(os.getenv("EXACT_COUNT_THRESHOLD", "100000"))
+# Ids per batch metadata request and per coalesced lookup
+METADATA_BATCH_MAX_IDS = int(os.getenv("METADATA_BATCH_MAX_IDS", "500"))
+
+# One get_file loader per engine, shared by every session and request on it
+_file_loaders = weakref.WeakKeyDictionary()
+
+
+def file_loader(engine) -> BatchLoader:
+    """Loader merging concurrent get_file lookups on `engine` into one IN query.
+
+    Each batch runs on its own short-lived session, so no request's session
+    is shared with another and a cancelled caller cannot fail the others.
+    The rows come back detached, with every column loaded.
+    """
+    loader = _file_loaders.get(engine)
+    if loader is None:
+        async def load_files(file_ids: List[uuid.UUID]) -> dict:
+            async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+                return await FileMetadataRepository(session).get_files(file_ids)
+        loader = _file_loaders[engine] = BatchLoader(load_files, name="file_metadata")
+    return loader
+
+
+def cache_file_metadata(db_file: CSVFiles):
+    """Cache a detached copy of a row once its ingest is finished; until then it still changes."""
+    if db_file.status in (IngestStatus.READY.value, IngestStatus.FAILED.value):
+        columns = {attribute.key: getattr(db_file, attribute.key) for attribute in inspect(CSVFiles).column_attrs}
+        metadata_cache.put(db_file.id, CSVFiles(**columns))
+
+
+def file_loader_stats() -> dict:
+    totals = {}
+    for loader in list(_file_loaders.values()):
+        for name, value in loader.stats().items():
+            totals[name] = totals.get(name, 0) + value
+    return totals
 
 
 class FileMetadataRepository:
@@ -16,20 +62,155 @@ class FileMetadataRepository:
         self.db.add(db_file)
         await self.db.commit()
         await self.db.refresh(db_file)
+        cache_file_metadata(db_file)
         return db_file
     
+    async def create_file_metadata_batch(self, files: List[file_schemas.FileMetadataCreate]):
+        """Insert many rows with one multi-row INSERT and a single commit."""
+        if files:
+            await self.db.execute(insert(CSVFiles), [file_metadata.model_dump() for file_metadata in files])
+            await self.db.commit()
+            # Deduplicated rows are already ready; cache them like create_file_metadata does,
+            # read back once for the server-side defaults
+            ready = [file_metadata.id for file_metadata in files if file_metadata.status == IngestStatus.READY.value]
+            if ready:
+                for db_file in (await self.get_files(ready)).values():
+                    cache_file_metadata(db_file)
+    
     async def get_file_list(self, skip: int = 0, limit: int = 100) -> List[CSVFiles]:
-        selecting_data = select(CSVFiles).order_by(desc(CSVFiles.upload_timestamp)).offset(skip).limit(limit)
+        selecting_data = (
+            select(CSVFiles)
+            .order_by(desc(CSVFiles.upload_timestamp), desc(CSVFiles.id))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(selecting_data)
+        return result.scalars().all()
+    
+    async def get_file_list_after(self, upload_timestamp: datetime.datetime, file_id: uuid.UUID,
+                                  limit: int = 100) -> List[CSVFiles]:
+        """Keyset page: files strictly older than the (upload_timestamp, id) cursor."""
+        selecting_data = (
+            select(CSVFiles)
+            .where(tuple_(CSVFiles.upload_timestamp, CSVFiles.id) < tuple_(upload_timestamp, file_id))
+            .order_by(desc(CSVFiles.upload_timestamp), desc(CSVFiles.id))
+            .limit(limit)
+        )
         result = await self.db.execute(selecting_data)
         return result.scalars().all()
     
     async def get_file(self, file_id: uuid.UUID) -> Optional[CSVFiles]:
-        selecting_data = select(CSVFiles).where(CSVFiles.id == file_id)
+        """One file, from the metadata cache or fetched together with concurrent lookups on the same database.
+
+        Cached rows and rows of a coalesced batch are detached and shared,
+        so callers must only read them.
+        """
+        db_file = metadata_cache.get(file_id)
+        if db_file is None:
+            db_file = await file_loader(self.db.bind).load(file_id)
+            if db_file is not None:
+                cache_file_metadata(db_file)
+        return db_file
+    
+    async def get_files(self, file_ids: List[uuid.UUID]) -> dict:
+        """Files by id with one IN query per METADATA_BATCH_MAX_IDS ids; unknown ids are left out."""
+        file_ids = list(dict.fromkeys(file_ids))
+        files = {}
+        for start in range(0, len(file_ids), METADATA_BATCH_MAX_IDS):
+            selecting_data = select(CSVFiles).where(CSVFiles.id.in_(file_ids[start:start + METADATA_BATCH_MAX_IDS]))
+            result = await self.db.execute(selecting_data)
+            files.update((db_file.id, db_file) for db_file in result.scalars())
+        return files
+    
+    async def get_file_by_content_hash(self, content_hash: str) -> Optional[CSVFiles]:
+        """An earlier upload of the same bytes, preferring one that is already ingested."""
+        selecting_data = (
+            select(CSVFiles)
+            .where(CSVFiles.content_hash == content_hash, CSVFiles.status != IngestStatus.FAILED.value)
+            .order_by(case((CSVFiles.status == IngestStatus.READY.value, 0), else_=1), CSVFiles.upload_timestamp)
+            .limit(1)
+        )
         result = await self.db.execute(selecting_data)
         return result.scalar_one_or_none()
     
+    async def get_files_by_content_hashes(self, content_hashes: List[str]) -> dict:
+        """Earlier upload per content hash, preferring ingested ones; one query for a whole batch."""
+        if not content_hashes:
+            return {}
+        selecting_data = (
+            select(CSVFiles)
+            .where(CSVFiles.content_hash.in_(set(content_hashes)), CSVFiles.status != IngestStatus.FAILED.value)
+            .order_by(case((CSVFiles.status == IngestStatus.READY.value, 0), else_=1), CSVFiles.upload_timestamp)
+        )
+        result = await self.db.execute(selecting_data)
+        duplicates = {}
+        for db_file in result.scalars():
+            duplicates.setdefault(db_file.content_hash, db_file)
+        return duplicates
+    
+    async def update_file(self, file_id: uuid.UUID, **values) -> None:
+        await self.db.execute(update(CSVFiles).where(CSVFiles.id == file_id).values(**values))
+        await self.db.commit()
+        metadata_cache.invalidate(file_id)
+    
+    async def delete_file(self, file_id: uuid.UUID) -> None:
+        await self.db.execute(delete(CSVFiles).where(CSVFiles.id == file_id))
+        await self.db.commit()
+        metadata_cache.invalidate(file_id)
+    
+    async def get_file_ids_by_status(self, statuses: List[str], exclude=(),
+                                     limit: Optional[int] = None) -> List[uuid.UUID]:
+        selecting_data = (
+            select(CSVFiles.id)
+            .where(CSVFiles.status.in_(statuses))
+            .order_by(CSVFiles.upload_timestamp)
+        )
+        if exclude:
+            selecting_data = selecting_data.where(CSVFiles.id.not_in(list(exclude)))
+        if limit is not None:
+            selecting_data = selecting_data.limit(limit)
+        result = await self.db.execute(selecting_data)
+        return result.scalars().all()
+    
+    async def claim_file(self, file_id: uuid.UUID, from_status: str, to_status: str) -> bool:
+        """Move a file from one status to another unless something else moved it first."""
+        result = await self.db.execute(
+            update(CSVFiles).where(CSVFiles.id == file_id, CSVFiles.status == from_status).values(status=to_status))
+        await self.db.commit()
+        metadata_cache.invalidate(file_id)
+        return result.rowcount == 1
+    
+    async def reset_file_status(self, from_status: str, to_status: str) -> int:
+        result = await self.db.execute(
+            update(CSVFiles).where(CSVFiles.status == from_status).values(status=to_status))
+        await self.db.commit()
+        return result.rowcount
+    
+    async def get_listing_version(self) -> str:
+        """Changes whenever a file is uploaded or changes status: latest upload and row count per status."""
+        from sqlalchemy import func
+        selecting_data = (
+            select(CSVFiles.status, func.count(), func.max(CSVFiles.upload_timestamp))
+            .group_by(CSVFiles.status)
+            .order_by(CSVFiles.status)
+        )
+        result = await self.db.execute(selecting_data)
+        return ";".join(f"{status}:{count}:{latest}" for status, count, latest in result.all())
+    
     async def count_files(self) -> int:
         from sqlalchemy import func, select
         selecting_data = select(func.count()).select_from(CSVFiles)
         result = await self.db.execute(selecting_data)
-        return result.scalar()
\ No newline at end of file
+        return result.scalar()
+    
+    async def estimate_files(self) -> int:
+        """Planner row estimate on PostgreSQL, exact count for small tables or other databases."""
+        if self.db.bind.dialect.name == "postgresql":
+            result = await self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'csv_files'::regclass")
+            )
+            estimate = result.scalar()
+            if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+                return estimate
+        return await self.count_files()
+
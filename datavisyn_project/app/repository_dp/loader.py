@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BatchLoader:
+    """Coalesce single-key lookups made in the same event-loop tick into one batch call.
+
+    Every `load(key)` joins the batch of the current tick; the batch is
+    dispatched once the callers have yielded to the loop, so concurrent
+    lookups share one query. `batch_fn` receives the distinct keys and
+    returns a dict; missing keys resolve to None. It runs as its own task,
+    owned by no caller. Nothing is cached between batches.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]], name: str = "loader"):
+        self.batch_fn = batch_fn
+        self.name = name
+        # Pending keys and their futures, per loop
+        self._batches: Dict[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]] = {}
+        self._counters = {"loads": 0, "batches": 0, "keys": 0}
+        # The loop only keeps weak references to tasks; running batches are held here until done
+        self._tasks = set()
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = {}
+            loop.call_soon(self._dispatch, loop)
+        future = batch.get(key)
+        if future is None:
+            future = batch[key] = loop.create_future()
+        self._counters["loads"] += 1
+        # Shielded so one cancelled caller does not cancel the lookup the others wait on
+        return await asyncio.shield(future)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        batch = self._batches.pop(loop)
+        self._counters["batches"] += 1
+        self._counters["keys"] += len(batch)
+        task = loop.create_task(self._resolve(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: Dict[Hashable, asyncio.Future]):
+        try:
+            values = await self.batch_fn(list(batch))
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} keys failed: {e!r}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def stats(self) -> dict:
+        # Lookups answered by a batch another caller already started
+        return {**self._counters, "coalesced": max(self._counters["loads"] - self._counters["keys"], 0)}
@@ -1,16 +1,60 @@
 import os
 from datavisyn_project.app.storage.local_storage import LocalStorage
 from datavisyn_project.app.storage.s3_storage import S3Storage
+from datavisyn_project.app.storage.compressed_storage import CompressedStorage
+from datavisyn_project.app.storage.base import StorageBackend
+from typing import Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_storage_backend():
-    """Factory function to get the appropriate storage backend"""
+# Codec for newly uploaded CSV files: zstd, gzip or none
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "none").lower()
+
+# One backend instance per process, managed by the app lifespan
+_storage_backend = None
+
+def create_storage_backend():
+    """Factory function to build the appropriate storage backend"""
     storage_type = os.getenv("STORAGE_TYPE", "local").lower()
     logger.info(f"Initializing storage backend: {storage_type}")
     if storage_type == "s3":
         return S3Storage()
     else:
-        return LocalStorage()
\ No newline at end of file
+        return LocalStorage()
+
+def get_storage_backend():
+    """Return the process-wide storage backend, creating it on first use"""
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_storage_backend()
+    return _storage_backend
+
+def upload_codec() -> Optional[str]:
+    """Codec new uploads are stored with, None for raw bytes"""
+    return None if STORAGE_COMPRESSION in ("", "none") else STORAGE_COMPRESSION
+
+def get_file_storage(codec: Optional[str]) -> StorageBackend:
+    """Backend view for a stored CSV written with `codec`; files stored raw, including
+    everything uploaded before compression existed, are read straight from the backend"""
+    backend = get_storage_backend()
+    return CompressedStorage(backend, codec) if codec else backend
+
+async def init_storage_backend():
+    """Create and initialize the storage backend at application startup"""
+    global _storage_backend
+    _storage_backend = create_storage_backend()
+    await _storage_backend.initialize()
+    if upload_codec():
+        # Fail at startup rather than on the first upload
+        get_file_storage(upload_codec())
+        logger.info(f"New uploads are stored compressed with {upload_codec()}")
+    return _storage_backend
+
+async def close_storage_backend():
+    """Close the storage backend at application shutdown"""
+    global _storage_backend
+    if _storage_backend is not None:
+        await _storage_backend.close()
+        _storage_backend = None
@@ -1,16 +1,63 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO
+from typing import BinaryIO, AsyncIterator
 import uuid
 from typing import Optional
+from pathlib import Path
 
 class StorageBackend(ABC):
     """Abstract base class for storage backends"""
     
+    async def initialize(self):
+        """One-time setup at application startup"""
+        pass
+    
+    async def close(self):
+        """Release resources at application shutdown"""
+        pass
+    
     @abstractmethod
     async def save(self, file_id: uuid.UUID, file_content: BinaryIO, filename: str) -> str:
         pass
     
+    @abstractmethod
+    async def save_stream(self, file_id: uuid.UUID, chunks: AsyncIterator[bytes], filename: str) -> str:
+        """Save an object fed as an async stream of byte chunks"""
+        pass
+    
     @abstractmethod
     async def read(self, file_name:str) -> bytes:
         pass
 
+    @abstractmethod
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """Rename a stored object, replacing dst_key if it exists"""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove a stored object; missing objects are ignored"""
+        pass
+
+    async def read_view(self, key: str) -> memoryview:
+        """Whole stored object as a read-only buffer; backends that can map it avoid the copy"""
+        return memoryview(await self.read(key))
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Path of the object on a local filesystem, if it lives on one"""
+        return None
+
+    async def size(self, key: str) -> int:
+        """Length in bytes of a stored object; backends override this to avoid reading it"""
+        return len(await self.read(key))
+
+    @abstractmethod
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes [start, end) of a stored object"""
+        pass
+
+    async def read_stream(self, key: str, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield a stored object in chunks of at most chunk_size bytes"""
+        start = 0
+        while chunk := await self.read_range(key, start, start + chunk_size):
+            yield chunk
+            start += len(chunk)
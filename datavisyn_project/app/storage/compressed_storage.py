@@ -0,0 +1,194 @@
+import io
+import os
+import json
+import uuid
+import bisect
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from typing import BinaryIO, AsyncIterator
+import pyarrow as pa
+from .base import StorageBackend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CODECS = ("zstd", "gzip")
+# Raw bytes per independently compressed frame; a range read decompresses whole frames
+COMPRESSION_FRAME_SIZE = int(os.getenv("COMPRESSION_FRAME_SIZE", str(1024 * 1024)))
+FRAME_TABLE_SUFFIX = ".frames"
+FRAME_TABLE_CACHE_SIZE = int(os.getenv("FRAME_TABLE_CACHE_SIZE", "256"))
+
+
+class FrameTable:
+    """Raw and compressed size of every frame of a compressed object."""
+
+    def __init__(self, codec: str, raw_sizes: list, sizes: list):
+        self.codec = codec
+        self.raw_sizes = raw_sizes
+        self.sizes = sizes
+        self.raw_offsets = [0, *accumulate(raw_sizes)]
+        self.offsets = [0, *accumulate(sizes)]
+
+    @property
+    def raw_size(self) -> int:
+        return self.raw_offsets[-1]
+
+    def covering(self, start: int, end: int) -> range:
+        """Indices of the frames holding raw bytes [start, end)."""
+        first = bisect.bisect_right(self.raw_offsets, start) - 1
+        last = bisect.bisect_left(self.raw_offsets, end)
+        return range(max(first, 0), min(last, len(self.sizes)))
+
+    def dump(self) -> bytes:
+        return json.dumps({"codec": self.codec, "raw_sizes": self.raw_sizes, "sizes": self.sizes}).encode("utf-8")
+
+    @classmethod
+    def load(cls, content: bytes) -> "FrameTable":
+        table = json.loads(content)
+        return cls(table["codec"], table["raw_sizes"], table["sizes"])
+
+
+class FrameTableCache:
+    """Frame tables of recently read objects; stored objects never change, so entries never go stale."""
+
+    def __init__(self, max_entries: int = FRAME_TABLE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+            return table
+
+    def put(self, key: str, table: FrameTable):
+        with self._lock:
+            self._tables[key] = table
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+
+    def pop(self, key: str):
+        with self._lock:
+            self._tables.pop(key, None)
+
+
+frame_tables = FrameTableCache()
+
+
+class CompressedStorage(StorageBackend):
+    """Compress objects of any backend at rest, in independent zstd or gzip frames.
+
+    The frames are concatenated into one standard .zst or .gz stream, and
+    the size of each frame is kept in a small `<key>.frames` object next to
+    it. Reads decompress in a stream, and range reads only fetch and
+    decompress the frames covering the range. The inner backend stays
+    owned by the app lifespan; this wrapper holds no resources.
+    """
+
+    def __init__(self, inner: StorageBackend, codec: str, frame_size: int = COMPRESSION_FRAME_SIZE):
+        if codec not in CODECS or not pa.Codec.is_available(codec):
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        self.inner = inner
+        self.codec = codec
+        self.frame_size = frame_size
+        self._codec = pa.Codec(codec)
+
+    async def save(self, file_id: uuid.UUID, file_content: BinaryIO, filename: str) -> str:
+        async def chunks():
+            while chunk := await asyncio.to_thread(file_content.read, self.frame_size):
+                yield chunk
+        return await self.save_stream(file_id, chunks(), filename)
+
+    async def save_stream(self, file_id: uuid.UUID, chunks: AsyncIterator[bytes], filename: str) -> str:
+        raw_sizes, sizes = [], []
+
+        async def frames():
+            buffer = bytearray()
+            async for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= self.frame_size:
+                    yield await self._compress_frame(bytes(buffer[:self.frame_size]), raw_sizes, sizes)
+                    del buffer[:self.frame_size]
+            if buffer:
+                yield await self._compress_frame(bytes(buffer), raw_sizes, sizes)
+
+        stored = await self.inner.save_stream(file_id, frames(), filename)
+        table = FrameTable(self.codec, raw_sizes, sizes)
+        await self.inner.save(file_id, io.BytesIO(table.dump()), f"{filename}{FRAME_TABLE_SUFFIX}")
+        logger.info(f"Stored {filename} with {self.codec}: {table.raw_size} bytes in {table.offsets[-1]}")
+        return stored
+
+    async def _compress_frame(self, raw: bytes, raw_sizes: list, sizes: list) -> bytes:
+        frame = await asyncio.to_thread(self._codec.compress, raw, asbytes=True)
+        raw_sizes.append(len(raw))
+        sizes.append(len(frame))
+        return frame
+
+    async def read(self, file_name: str) -> bytes:
+        table = await self._frame_table(file_name)
+        content = await self.inner.read(file_name)
+        return await asyncio.to_thread(self._decompress, table, memoryview(content), range(len(table.sizes)))
+
+    async def size(self, key: str) -> int:
+        # Ranges are into the raw bytes, so is the size
+        return (await self._frame_table(key)).raw_size
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        table = await self._frame_table(key)
+        frames = table.covering(start, end)
+        if end <= start or not frames:
+            return b""
+        content = await self.inner.read_range(key, table.offsets[frames.start], table.offsets[frames.stop])
+        raw = await asyncio.to_thread(self._decompress, table, memoryview(content), frames)
+        first = table.raw_offsets[frames.start]
+        return raw[start - first:end - first]
+
+    async def read_stream(self, key: str, chunk_size: int) -> AsyncIterator[bytes]:
+        table = await self._frame_table(key)
+        buffer = bytearray()
+        frame = 0
+        async for chunk in self.inner.read_stream(key, chunk_size):
+            buffer += chunk
+            while frame < len(table.sizes) and len(buffer) >= table.sizes[frame]:
+                size = table.sizes[frame]
+                raw = await asyncio.to_thread(self._codec.decompress, bytes(buffer[:size]),
+                                              decompressed_size=table.raw_sizes[frame], asbytes=True)
+                del buffer[:size]
+                frame += 1
+                for start in range(0, len(raw), chunk_size):
+                    yield raw[start:start + chunk_size]
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        await self.inner.move(f"{src_key}{FRAME_TABLE_SUFFIX}", f"{dst_key}{FRAME_TABLE_SUFFIX}")
+        frame_tables.pop(src_key)
+        frame_tables.pop(dst_key)
+        return await self.inner.move(src_key, dst_key)
+
+    async def delete(self, key: str):
+        await self.inner.delete(key)
+        await self.inner.delete(f"{key}{FRAME_TABLE_SUFFIX}")
+        frame_tables.pop(key)
+
+    async def _frame_table(self, key: str) -> FrameTable:
+        table = frame_tables.get(key)
+        if table is None:
+            table = FrameTable.load(await self.inner.read(f"{key}{FRAME_TABLE_SUFFIX}"))
+            frame_tables.put(key, table)
+        return table
+
+    def _decompress(self, table: FrameTable, content: memoryview, frames: range) -> bytes:
+        """Decompress consecutive frames starting at the beginning of `content`."""
+        raw = bytearray()
+        position = 0
+        for frame in frames:
+            size = table.sizes[frame]
+            raw += self._codec.decompress(content[position:position + size],
+                                          decompressed_size=table.raw_sizes[frame], asbytes=True)
+            position += size
+        return bytes(raw)
@@ -1,6 +1,9 @@
 import os
+import mmap
 import uuid
-from typing import BinaryIO
+import shutil
+import asyncio
+from typing import BinaryIO, AsyncIterator, Optional
 from pathlib import Path
 from .base import StorageBackend
 import logging
@@ -9,6 +12,8 @@ from fastapi import  HTTPException
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LOCAL_COPY_CHUNK_SIZE = 1024 * 1024
+
 class LocalStorage(StorageBackend):
     def __init__(self):
         self.upload_dir = Path(os.getenv("UPLOAD_DIR"))
@@ -20,12 +25,8 @@ class LocalStorage(StorageBackend):
             stored_filename = f"{file_id}_{filename}"
             file_path = self.upload_dir/stored_filename
             logger.info(f"Start saving file to local path: {file_path}")
-            # Write file content
-            with open(file_path, "wb") as f:
-                # Read in chunks for large files
-                chunk_size = 8192
-                while chunk := file_content.read(chunk_size):
-                    f.write(chunk)
+            # Copy in chunks off the event loop; the volume may be a slow network mount
+            await asyncio.to_thread(_copy_to_path, file_content, file_path)
             logger.info(f"File saved successfully at: {file_path}")
             return str(file_path)
         except Exception as e:
@@ -33,16 +34,32 @@ class LocalStorage(StorageBackend):
             raise
     
     
+    async def save_stream(self, file_id: uuid.UUID, chunks: AsyncIterator[bytes], filename: str) -> str:
+        """Save a stream of chunks to local filesystem, removing the partial file on failure"""
+        stored_filename = f"{file_id}_{filename}"
+        file_path = self.upload_dir/stored_filename
+        logger.info(f"Start streaming file to local path: {file_path}")
+        f = None
+        try:
+            f = await asyncio.to_thread(open, file_path, "wb")
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            logger.info(f"File saved successfully at: {file_path}")
+            return str(file_path)
+        except (Exception, asyncio.CancelledError) as e:
+            logger.error(f"Error streaming file {filename} to local storage: {e!r}")
+            if f is not None:
+                f.close()
+            file_path.unlink(missing_ok=True)
+            raise
+    
     async def read(self, file_name: str) -> bytes:
         """Read file from local filesystem"""
         try:
             # Find the file by UUID
             logger.info(f"Attempting to read file with ID: {file_name}")
-            file_path = self.upload_dir / file_name
-            if not file_path.exists():
-                raise FileNotFoundError(f"File not found: {file_name}")
-            with open(file_path, "rb") as f:
-                content = f.read()
+            content = await asyncio.to_thread((self.upload_dir / file_name).read_bytes)
             logger.info(f"Read {len(content)} bytes from {file_name}")
             return content
         except FileNotFoundError:
@@ -52,4 +69,86 @@ class LocalStorage(StorageBackend):
         except Exception as e:
             logger.error(f"Internal server error: Error reading file with ID {file_name}: {str(e)}")
             raise
-    
\ No newline at end of file
+
+    async def read_view(self, key: str) -> memoryview:
+        """Map a file from local filesystem read-only and return a zero-copy view of it"""
+        try:
+            view = await asyncio.to_thread(_map_file, self.upload_dir / key)
+            logger.info(f"Mapped {len(view)} bytes of {key}")
+            return view
+        except FileNotFoundError:
+            logger.error(f"File with ID {key} not found")
+            raise HTTPException(status_code=404, detail="File not found")
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """Rename a file within the upload directory, atomically replacing an existing one"""
+        await asyncio.to_thread(os.replace, self.upload_dir / src_key, self.upload_dir / dst_key)
+        logger.info(f"Moved {src_key} to {dst_key}")
+        return str(self.upload_dir / dst_key)
+
+    async def delete(self, key: str):
+        """Remove a file from local filesystem"""
+        await asyncio.to_thread((self.upload_dir / key).unlink, missing_ok=True)
+        logger.info(f"Deleted {key}")
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.upload_dir / key
+
+    async def size(self, key: str) -> int:
+        try:
+            return (await asyncio.to_thread((self.upload_dir / key).stat)).st_size
+        except FileNotFoundError:
+            logger.error(f"File with ID {key} not found")
+            raise HTTPException(status_code=404, detail="File not found")
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes [start, end) of a file from local filesystem"""
+        try:
+            content = await asyncio.to_thread(_read_range, self.upload_dir / key, start, end)
+            logger.info(f"Read {len(content)} bytes at offset {start} from {key}")
+            return content
+        except FileNotFoundError:
+            logger.error(f"File with ID {key} not found")
+            raise HTTPException(status_code=404, detail="File not found")
+
+        except Exception as e:
+            logger.error(f"Internal server error: Error reading range of file {key}: {str(e)}")
+            raise
+
+    async def read_stream(self, key: str, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield a file from local filesystem in chunks, keeping one handle open"""
+        file_path = self.upload_dir / key
+        try:
+            f = await asyncio.to_thread(open, file_path, "rb")
+        except FileNotFoundError:
+            logger.error(f"File with ID {key} not found")
+            raise HTTPException(status_code=404, detail="File not found")
+        logger.info(f"Streaming {key} in chunks of {chunk_size} bytes")
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+
+def _copy_to_path(file_content: BinaryIO, file_path: Path):
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(file_content, f, LOCAL_COPY_CHUNK_SIZE)
+
+
+def _read_range(file_path: Path, start: int, end: int) -> bytes:
+    with open(file_path, "rb") as f:
+        return os.pread(f.fileno(), max(end - start, 0), start)
+
+
+def _map_file(file_path: Path) -> memoryview:
+    """Read-only memory map of a whole file.
+
+    The map outlives the file handle and is unmapped once the last view of
+    it is garbage collected, so pages are only faulted in as they are read.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return memoryview(b"")
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
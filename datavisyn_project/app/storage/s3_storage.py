@@ -1,16 +1,21 @@
 import os
 import logging
 import uuid
-from typing import BinaryIO
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import BinaryIO, AsyncIterator
 from fastapi import  HTTPException
 
 import aioboto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from botocore.config import Config
 from .base import StorageBackend
 
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 class S3Storage(StorageBackend):
 
@@ -22,27 +27,72 @@ class S3Storage(StorageBackend):
         if not self.bucket_name:
             raise ValueError("AWS_S3_BUCKET environment variable is required")
 
+        # Multipart upload tuning
+        self.part_size = max(int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024))), S3_MIN_PART_SIZE)
+        self.max_concurrency = int(os.getenv("S3_MULTIPART_CONCURRENCY", "4"))
+        self.part_attempts = int(os.getenv("S3_MULTIPART_PART_ATTEMPTS", "3"))
+
         self.session = aioboto3.Session(
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=self.region,
         )
 
-        # Common client config (retries, signature version)
+        # Common client config (retries, signature version, connection pool)
         self.client_config = Config(
             signature_version='s3v4',
             retries={'max_attempts': 5, 'mode': 'standard'},
             connect_timeout=10,
             read_timeout=30,
+            max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50")),
         )
 
-    def _get_client(self):
-        """Factory for async context-managed S3 client"""
-        return self.session.client(
+        # Long-lived client opened by initialize() and shared by all requests
+        self._client = None
+        self._client_stack = None
+
+    @asynccontextmanager
+    async def _get_client(self):
+        """Yield the shared S3 client, or a short-lived one before initialize()"""
+        if self._client is not None:
+            yield self._client
+            return
+        async with self.session.client(
             "s3",
             endpoint_url=self.endpoint_url,
             config=self.client_config,
-        )
+        ) as s3:
+            yield s3
+
+    async def initialize(self):
+        """Open the pooled client and ensure the bucket exists. Called once at application startup."""
+        if self._client is None:
+            self._client_stack = AsyncExitStack()
+            self._client = await self._client_stack.enter_async_context(self.session.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                config=self.client_config,
+            ))
+            logger.info(f"Opened S3 client with pool size {self.client_config.max_pool_connections}")
+
+        async with self._get_client() as s3:
+            try:
+                await s3.head_bucket(Bucket=self.bucket_name)
+            except ClientError as e:
+                error_code = e.response["Error"]["Code"]
+                if error_code == "404":
+                    logger.info(f"Creating bucket {self.bucket_name}")
+                    await s3.create_bucket(Bucket=self.bucket_name)
+                elif error_code != "403":  # 403 might mean we have access but can't head
+                    raise
+
+    async def close(self):
+        """Close the pooled client at application shutdown."""
+        if self._client_stack is not None:
+            await self._client_stack.aclose()
+            self._client = None
+            self._client_stack = None
+            logger.info("Closed S3 client")
 
     async def save(
         self,
@@ -54,37 +104,80 @@ class S3Storage(StorageBackend):
         Save file to S3.
         Returns the S3 key that was used.
         """
+        file_content.seek(0)
+
+        async def file_chunks():
+            while chunk := file_content.read(self.part_size):
+                yield chunk
+
+        return await self.save_stream(file_id, file_chunks(), filename)
+
+    async def save_stream(
+        self,
+        file_id: uuid.UUID,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+    ) -> str:
+        """
+        Save a stream of chunks to S3.
+        Objects smaller than one part go up with a single PUT, larger ones as a
+        multipart upload with up to `max_concurrency` parts in flight. The
+        multipart upload is aborted if anything fails.
+        """
         s3_key = f"uploads/{file_id}_{filename.lstrip('/')}"
+        extra_args = {"ContentDisposition": f"attachment; filename=\"{filename}\""}
 
         logger.info(f"Uploading to s3://{self.bucket_name}/{s3_key}")
 
+        buffer = bytearray()
+        upload_id = None
+        part_tasks = []
+        slots = asyncio.Semaphore(self.max_concurrency)
+
         try:
             async with self._get_client() as s3:
-                # Optional: ensure bucket exists (better done once at startup or in infra)
                 try:
-                    await s3.head_bucket(Bucket=self.bucket_name)
-                except ClientError as e:
-                    error_code = e.response["Error"]["Code"]
-                    if error_code == "404":
-                        logger.info(f"Creating bucket {self.bucket_name}")
-                        await s3.create_bucket(Bucket=self.bucket_name)
-                    elif error_code != "403":  # 403 might mean we have access but can't head
-                        raise
+                    async for chunk in chunks:
+                        buffer += chunk
+                        while len(buffer) >= self.part_size:
+                            if upload_id is None:
+                                response = await s3.create_multipart_upload(
+                                    Bucket=self.bucket_name, Key=s3_key, **extra_args)
+                                upload_id = response["UploadId"]
+                            body = bytes(buffer[:self.part_size])
+                            del buffer[:self.part_size]
+                            # Bounds memory to max_concurrency parts
+                            await slots.acquire()
+                            part_tasks.append(asyncio.create_task(self._upload_part(
+                                s3, s3_key, upload_id, len(part_tasks) + 1, body, slots)))
 
-                file_content.seek(0)
-                await s3.upload_fileobj(
-                    Fileobj=file_content,
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    ExtraArgs={
-                        # Optional: useful metadata
-                        "ContentDisposition": f"attachment; filename=\"{filename}\"",
-                        # "ContentType": file_content.content_type,  # if available
-                    }
-                )
+                    if upload_id is None:
+                        await s3.put_object(Bucket=self.bucket_name, Key=s3_key, Body=bytes(buffer), **extra_args)
+                        logger.info(f"Upload successful: {s3_key}")
+                        return s3_key
 
-            logger.info(f"Upload successful: {s3_key}")
-            return s3_key
+                    if buffer:
+                        await slots.acquire()
+                        part_tasks.append(asyncio.create_task(self._upload_part(
+                            s3, s3_key, upload_id, len(part_tasks) + 1, bytes(buffer), slots)))
+                    parts = await asyncio.gather(*part_tasks)
+                    await s3.complete_multipart_upload(
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        UploadId=upload_id,
+                        MultipartUpload={"Parts": list(parts)},
+                    )
+                    logger.info(f"Multipart upload successful: {s3_key} ({len(parts)} parts)")
+                    return s3_key
+
+                except BaseException:
+                    for task in part_tasks:
+                        task.cancel()
+                    await asyncio.gather(*part_tasks, return_exceptions=True)
+                    if upload_id is not None:
+                        logger.warning(f"Aborting multipart upload {upload_id} for {s3_key}")
+                        await s3.abort_multipart_upload(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
+                    raise
 
         except ClientError as e:
             logger.error(f"S3 client error uploading {filename}: {e.response['Error']}")
@@ -93,6 +186,28 @@ class S3Storage(StorageBackend):
             logger.exception(f"Unexpected error uploading {filename}")
             raise
 
+    async def _upload_part(self, s3, s3_key: str, upload_id: str, part_number: int,
+                           body: bytes, slots: asyncio.Semaphore) -> dict:
+        """Upload one part, retrying failed attempts with exponential backoff."""
+        try:
+            for attempt in range(1, self.part_attempts + 1):
+                try:
+                    response = await s3.upload_part(
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=body,
+                    )
+                    return {"ETag": response["ETag"], "PartNumber": part_number}
+                except (ClientError, BotoCoreError, OSError) as e:
+                    if attempt == self.part_attempts:
+                        raise
+                    logger.warning(f"Part {part_number} of {s3_key} failed (attempt {attempt}): {e}")
+                    await asyncio.sleep(0.2 * 2 ** (attempt - 1))
+        finally:
+            slots.release()
+
     async def read(self, stored_key: str) -> bytes:
         """
         Read file content from S3 using the stored key.
@@ -120,4 +235,107 @@ class S3Storage(StorageBackend):
             raise
         except Exception as e:
             logger.exception(f"Unexpected error reading {s3_key}")
-            raise
\ No newline at end of file
+            raise
+
+    async def size(self, key: str) -> int:
+        """Object length from a HEAD request, without downloading it."""
+        s3_key = key if key.startswith("uploads/") else f"uploads/{key}"
+        try:
+            async with self._get_client() as s3:
+                response = await s3.head_object(Bucket=self.bucket_name, Key=s3_key)
+                return response["ContentLength"]
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                raise HTTPException(status_code=404, detail="Resource not found")
+            logger.error(f"S3 error reading size of {s3_key}: {e.response['Error']}")
+            raise
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """
+        Read bytes [start, end) of an S3 object with an HTTP Range GET.
+        """
+        s3_key = key if key.startswith("uploads/") else f"uploads/{key}"
+        if end <= start:
+            return b""
+
+        logger.info(f"Downloading bytes {start}-{end - 1} of s3://{self.bucket_name}/{s3_key}")
+
+        try:
+            async with self._get_client() as s3:
+                response = await s3.get_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Range=f"bytes={start}-{end - 1}"
+                )
+                body = await response["Body"].read()
+                logger.info(f"Downloaded {len(body)} bytes from {s3_key}")
+                return body
+
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code == "NoSuchKey":
+                raise HTTPException(status_code=404, detail="Resource not found")
+            if error_code == "InvalidRange":
+                return b""
+
+            logger.error(f"S3 error downloading range of {s3_key}: {e.response['Error']}")
+            raise
+        except Exception as e:
+            logger.exception(f"Unexpected error reading range of {s3_key}")
+            raise
+
+    async def move(self, src_key: str, dst_key: str) -> str:
+        """
+        Server-side copy to the new key, then delete the old one; the bytes never leave S3.
+        """
+        src = src_key if src_key.startswith("uploads/") else f"uploads/{src_key}"
+        dst = dst_key if dst_key.startswith("uploads/") else f"uploads/{dst_key}"
+        logger.info(f"Moving s3://{self.bucket_name}/{src} to {dst}")
+
+        try:
+            async with self._get_client() as s3:
+                # Managed copy switches to multipart copy above 5 GiB
+                await s3.copy({"Bucket": self.bucket_name, "Key": src}, self.bucket_name, dst)
+                await s3.delete_object(Bucket=self.bucket_name, Key=src)
+            return dst
+
+        except ClientError as e:
+            logger.error(f"S3 error moving {src} to {dst}: {e.response['Error']}")
+            raise
+
+    async def delete(self, key: str):
+        s3_key = key if key.startswith("uploads/") else f"uploads/{key}"
+        try:
+            async with self._get_client() as s3:
+                # S3 answers 204 for keys that do not exist
+                await s3.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            logger.info(f"Deleted s3://{self.bucket_name}/{s3_key}")
+
+        except ClientError as e:
+            logger.error(f"S3 error deleting {s3_key}: {e.response['Error']}")
+            raise
+
+    async def read_stream(self, key: str, chunk_size: int) -> AsyncIterator[bytes]:
+        """
+        Yield an S3 object in chunks from a single GET, without buffering the whole body.
+        """
+        s3_key = key if key.startswith("uploads/") else f"uploads/{key}"
+        logger.info(f"Streaming s3://{self.bucket_name}/{s3_key}")
+
+        try:
+            async with self._get_client() as s3:
+                response = await s3.get_object(Bucket=self.bucket_name, Key=s3_key)
+                body = response["Body"]
+                try:
+                    async for chunk in body.iter_chunks(chunk_size):
+                        yield chunk
+                finally:
+                    body.close()
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                raise HTTPException(status_code=404, detail="Resource not found")
+
+            logger.error(f"S3 error streaming {s3_key}: {e.response['Error']}")
+            raise
@@ -0,0 +1,63 @@
+"""Latency of encoding one /file/{id}/data page, before and after the single-pass encoder.
+
+Run from the repository root:
+
+    python -m datavisyn_project.benchmarks.data_page_json [--rows 100] [--columns 20] [--runs 2000]
+"""
+import json
+import time
+import uuid
+import argparse
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from datavisyn_project.app.helper.json_response import encode_data_page
+from datavisyn_project.models.schema.file_schemas import FileDataResponse
+
+
+def build_page(rows: int, columns: int) -> dict:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        f"col_{i}": rng.normal(size=rows) if i % 3 else rng.choice(["alpha", "beta", "gamma"], size=rows)
+        for i in range(columns)
+    })
+    return {"id": uuid.uuid4(), "filename": "bench.csv", "data": frame,
+            "total_rows": 5_000_000, "page": 7, "page_size": rows, "total_pages": 50_000}
+
+
+def encode_round_trip(page: dict) -> bytes:
+    """The previous path: to_json, json.loads, pydantic validation, jsonable_encoder, json.dumps."""
+    rows = json.loads(page["data"].to_json(orient="records", date_format="iso"))
+    response = FileDataResponse.model_validate({**page, "data": rows})
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def measure(encode, page: dict, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        encode(page)
+        timings.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return {"p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = build_page(args.rows, args.columns)
+    assert json.loads(encode_round_trip(page)) == json.loads(encode_data_page(page))
+
+    before = measure(encode_round_trip, page, args.runs)
+    after = measure(encode_data_page, page, args.runs)
+    print(f"page of {args.rows} rows x {args.columns} columns, {args.runs} runs")
+    print(f"round trip   p50 {before['p50_ms']:>8} ms   p99 {before['p99_ms']:>8} ms")
+    print(f"single pass  p50 {after['p50_ms']:>8} ms   p99 {after['p99_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,27 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from datavisyn_project.app import file_api
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
-app = FastAPI()
+from datavisyn_project.app.storage import init_storage_backend, close_storage_backend
+from datavisyn_project.app.decorators.response_cache import CACHE_PREFIX
+from datavisyn_project.app.helper.cache_backend import create_cache_backend
+from datavisyn_project.app.helper.ingest_worker import init_ingest_pool, close_ingest_pool
+from datavisyn_project.app.helper.executor import init_executors, close_executors
 
-@app.on_event("startup")
-async def startup():
-    FastAPICache.init(InMemoryBackend())
-    
-app.include_router(file_api.router, prefix="/api")
\ No newline at end of file
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cache_backend = create_cache_backend()
+    await cache_backend.start()
+    FastAPICache.reset()
+    FastAPICache.init(cache_backend, prefix=CACHE_PREFIX)
+    await init_storage_backend()
+    init_executors()
+    await init_ingest_pool()
+    yield
+    await close_ingest_pool()
+    await close_executors()
+    await close_storage_backend()
+    await cache_backend.close()
+
+app = FastAPI(lifespan=lifespan)
+
+app.include_router(file_api.router, prefix="/api")
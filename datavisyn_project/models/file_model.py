@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Text
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Boolean, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID, JSON
 import uuid
@@ -6,16 +6,33 @@ from datavisyn_project.core.db_setup import Base
 
 class CSVFiles(Base):
     __tablename__ = "csv_files"
+    __table_args__ = (
+        # Keyset pagination of /files walks this index
+        Index("ix_csv_files_upload_timestamp_id", "upload_timestamp", "id"),
+        Index("ix_csv_files_content_hash", "content_hash"),
+        Index("ix_csv_files_status", "status"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     original_filename = Column(String(255), nullable=False)
-    stored_filename = Column(String(255), nullable=False, unique=True)
+    stored_filename = Column(String(255), nullable=False)  # Shared by uploads with the same content_hash
     file_size = Column(BigInteger, nullable=False)
     upload_timestamp = Column(DateTime(timezone=True), server_default=func.now())
     row_count = Column(Integer)
     column_count = Column(Integer)
     columns = Column(JSON)  # Store column names
+    column_stats = Column(JSON)  # Per-column profile computed at ingest
     delimiter = Column(String(10))
+    encoding = Column(String(32))  # Encoding of the stored bytes, None for legacy uploads
+    quotechar = Column(String(1))
+    has_bom = Column(Boolean)  # Whether the upload started with a byte order mark
+    parquet_filename = Column(String(255))  # Columnar sidecar, None for legacy uploads
+    zone_maps = Column(JSON)  # Per row group min/max of the sidecar, for predicate pushdown
+    row_index_filename = Column(String(255))  # Sparse row-offset index for byte-range reads
+    codec = Column(String(16))  # Compression of stored_filename, NULL for raw bytes
+    content_hash = Column(String(64))  # SHA-256 of the stored bytes, shared by duplicate uploads
+    status = Column(String(16), nullable=False, default="ready", server_default="ready")  # IngestStatus
+    error_message = Column(Text)  # Why ingest failed
 
 
     
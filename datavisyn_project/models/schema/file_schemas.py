@@ -14,7 +14,17 @@ class FileMetadataCreate(FileMetadataBase):
     row_count: Optional[int] = None
     column_count: Optional[int] = None
     columns: Optional[List[str]] = None
+    column_stats: Optional[Dict[str, Dict[str, Any]]] = None
     delimiter: Optional[str] = None
+    encoding: Optional[str] = None
+    quotechar: Optional[str] = None
+    has_bom: Optional[bool] = None
+    parquet_filename: Optional[str] = None
+    zone_maps: Optional[Dict[str, Any]] = None
+    row_index_filename: Optional[str] = None
+    content_hash: Optional[str] = None
+    codec: Optional[str] = None
+    status: str = "ready"
     original_filename: str
     file_size: int
     
@@ -26,15 +36,27 @@ class FileMetadataResponse(FileMetadataBase):
     row_count: Optional[int]
     column_count: Optional[int]
     delimiter: Optional[str]
+    encoding: Optional[str] = None
+    quotechar: Optional[str] = None
+    has_bom: Optional[bool] = None
+    codec: Optional[str] = None
+    status: Optional[str] = None
+    error_message: Optional[str] = None
+    column_stats: Optional[Dict[str, Dict[str, Any]]] = None
     class Config:
         from_attributes = True
 
+class FileMetadataBatchResponse(BaseModel):
+    files: List[FileMetadataResponse]
+    missing: List[uuid.UUID] = []
+
 class FileListResponse(BaseModel):
     files: List[FileMetadataResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class FileDataResponse(BaseModel):
     id: uuid.UUID
@@ -45,10 +67,50 @@ class FileDataResponse(BaseModel):
     page_size: Optional[int] = None
     total_pages: Optional[int] = None
 
+class FileWindowResponse(BaseModel):
+    id: uuid.UUID
+    filename: str
+    data: List[Dict[str, Any]]
+    total_rows: int
+    offset: int
+    limit: int
+
 class UploadResponse(BaseModel):
     message: str
+    job_id: uuid.UUID
     file_id: uuid.UUID
     filename: str
     file_size: int
-    row_count: int
-    column_count: int
+    status: str
+    status_url: str
+    deduplicated: bool = False
+
+class BulkUploadItem(BaseModel):
+    filename: str
+    file_id: Optional[uuid.UUID] = None
+    status: str
+    deduplicated: bool = False
+    error: Optional[str] = None
+
+class BulkUploadResponse(BaseModel):
+    message: str
+    accepted: int
+    failed: int
+    files: List[BulkUploadItem]
+
+class IngestStatusResponse(BaseModel):
+    file_id: uuid.UUID = Field(validation_alias="id")
+    filename: str = Field(validation_alias="original_filename")
+    status: str
+    error_message: Optional[str] = None
+    row_count: Optional[int] = None
+    column_count: Optional[int] = None
+
+class CacheStatsResponse(BaseModel):
+    response_cache: Dict[str, Dict[str, Any]]
+    cache_backend: Dict[str, Any]
+    frame_cache: Dict[str, Any]
+    executors: Dict[str, Dict[str, Any]] = {}
+    metadata_loader: Dict[str, int] = {}
+    single_flight: Dict[str, Any] = {}
+    metadata_cache: Dict[str, Any] = {}
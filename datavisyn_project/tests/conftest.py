@@ -3,7 +3,6 @@ import asyncio
 from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import StaticPool
 import uuid
 import sys
 import os
@@ -14,9 +13,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datavisyn_project.core.db_setup import Base, get_async_session
 from datavisyn_project.core.base import app
+from fastapi_cache import FastAPICache
+from datavisyn_project.app.helper.metadata_cache import metadata_cache
 
 os.environ["STORAGE_TYPE"] = "local"
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -27,52 +27,80 @@ def event_loop():
     loop.close()
 
 @pytest.fixture(scope="function")
-async def test_db_session():
-    """Create test database session."""
+async def test_session_factory(tmp_path):
+    """Create test database and its session factory."""
+    # A file, not :memory:, so concurrent sessions (ingest workers) get their own connections
     engine = create_async_engine(
-        TEST_DATABASE_URL,
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    AsyncTestingSessionLocal = async_sessionmaker(
+    yield async_sessionmaker(
         engine, class_=AsyncSession, expire_on_commit=False
     )
     
-    async with AsyncTestingSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.rollback()
-    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     
     await engine.dispose()
 
+@pytest.fixture(scope="function")
+async def test_db_session(test_session_factory):
+    """Create test database session."""
+    async with test_session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
 @pytest.fixture
-def test_client(test_db_session):
+def test_client(test_session_factory, test_db_session, monkeypatch):
     """FastAPI test client with database dependency override."""
+    from datavisyn_project.app.helper import ingest_worker
     
     async def override_get_async_session():
-        yield test_db_session
+        # A session per request, like get_async_session, so rows updated by
+        # the ingest workers are never served from a stale identity map
+        async with test_session_factory() as session:
+            yield session
     
     # Store original overrides
     original_overrides = app.dependency_overrides.copy()
     
     # Apply test overrides
     app.dependency_overrides[get_async_session] = override_get_async_session
+    # Ingest workers open their sessions on the test database too
+    monkeypatch.setattr(ingest_worker, "session_factory", test_session_factory)
     
     with TestClient(app) as client:
+        # Responses cached by earlier tests must not leak into this one
+        client.portal.call(FastAPICache.clear)
+        metadata_cache.clear()
         yield client
     
     # Restore original overrides
     app.dependency_overrides.clear()
     app.dependency_overrides.update(original_overrides)
 
+@pytest.fixture
+def upload_csv(test_client):
+    """Upload a CSV file and wait until the ingest workers are done with it."""
+    from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+    
+    def _upload_csv(filename, content):
+        response = test_client.post(
+            "/api/upload_file/",
+            files={"file": (filename, content, "text/csv")}
+        )
+        assert response.status_code == 202
+        test_client.portal.call(get_ingest_pool().join)
+        return response
+    
+    return _upload_csv
+
 @pytest.fixture
 def mock_storage():
     """Mock storage backend."""
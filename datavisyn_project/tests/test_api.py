@@ -1,6 +1,9 @@
 from urllib import response
+import os
 import pytest
+import hashlib
 import uuid
+import asyncio
 from unittest.mock import patch
 
 
@@ -10,33 +13,79 @@ class TestAPIEndpoints:
     """End-to-end API tests for CSV file upload flow."""
     
     @pytest.mark.asyncio
-    async def test_upload_file_success(self, test_client, mock_storage):
+    async def test_upload_file_success(self, test_client, upload_csv):
         """Test successful file upload."""
-        with patch('datavisyn_project.app.storage.get_storage_backend', mock_storage):
-            with patch('uuid.uuid4') as mock_uuid:
-                
-                mock_uuid.return_value = test_uuid
-                
-                csv_content = b"id,name,value\n1,Test,100\n2,Another,200"
-                
-                response = test_client.post(
-                    "/api/upload_file/",
-                    files={"file": ("data.csv", csv_content, "text/csv")}
-                )
-                
-                assert response.status_code == 201
-                data = response.json()
-                assert data["file_id"] == str(test_uuid)
-                assert data["filename"] == "data.csv"
+        with patch('uuid.uuid4') as mock_uuid:
+            
+            mock_uuid.return_value = test_uuid
+            
+            csv_content = b"id,name,value\n1,Test,100\n2,Another,200"
+            
+            response = upload_csv("data.csv", csv_content)
+            
+            data = response.json()
+            assert data["file_id"] == str(test_uuid)
+            assert data["filename"] == "data.csv"
 
-                
-                #get_file_details
-                response = test_client.get(f"/api/file/{data["file_id"]}/data")
+            
+            #get_file_details
+            response = test_client.get(f"/api/file/{data["file_id"]}/data")
 
-                assert response.status_code == 200
-                data = response.json()
-                assert len(data["data"]) > 1
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["data"]) > 1
 
+    @pytest.mark.asyncio
+    async def test_upload_is_accepted_then_ingested_in_background(self, test_client):
+        """Upload answers 202 before parsing; data is refused until the file is ready, failures are recorded."""
+        from datavisyn_project.app.helper import ingest_worker
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        
+        pool = get_ingest_pool()
+        test_client.portal.call(pool.close)  # keep jobs queued while the pending state is checked
+        response = test_client.post(
+            "/api/upload_file/",
+            files={"file": ("queued.csv", b"id,name\n1,a\n2,b", "text/csv")}
+        )
+        assert response.status_code == 202
+        accepted = response.json()
+        assert accepted["status"] == "pending"
+        assert accepted["job_id"] == accepted["file_id"]
+        
+        status = test_client.get(accepted["status_url"]).json()
+        assert (status["status"], status["row_count"]) == ("pending", None)
+        response = test_client.get(f"/api/file/{accepted['file_id']}/data")
+        assert response.status_code == 409
+        
+        test_client.portal.call(pool.start)
+        test_client.portal.call(pool.join)
+        status = test_client.get(accepted["status_url"]).json()
+        assert (status["status"], status["row_count"], status["column_count"]) == ("ready", 2, 2)
+        assert test_client.get(f"/api/file/{accepted['file_id']}/data").status_code == 200
+        
+        async def broken_ingest(db_file):
+            raise ValueError("unreadable file")
+        with patch.object(ingest_worker, "ingest_stored_file", broken_ingest):
+            response = test_client.post(
+                "/api/upload_file/",
+                files={"file": ("broken.csv", b"id\n1", "text/csv")}
+            )
+            test_client.portal.call(pool.join)
+        status = test_client.get(response.json()["status_url"]).json()
+        assert (status["status"], status["error_message"]) == ("failed", "unreadable file")
+        assert test_client.get(f"/api/file/{status['file_id']}/export").status_code == 409
+        
+        with patch.object(pool.queue, "put_nowait", side_effect=asyncio.QueueFull):
+            response = test_client.post(
+                "/api/upload_file/",
+                files={"file": ("overflow.csv", b"id\n2", "text/csv")}
+            )
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(ingest_worker.INGEST_RETRY_AFTER)
+        # A rejected upload leaves neither a pending row nor its stored object behind
+        listed = test_client.get("/api/files").json()["files"]
+        assert "overflow.csv" not in [file["original_filename"] for file in listed]
+        assert f"sha256_{hashlib.sha256(b'id\n2').hexdigest()}.csv" not in os.listdir(os.environ["UPLOAD_DIR"])
     
     @pytest.mark.asyncio
     async def test_upload_file_invalid_type(self, test_client):
@@ -55,6 +104,99 @@ class TestAPIEndpoints:
         
         assert response.status_code == 200
     
+    @pytest.mark.asyncio
+    async def test_get_files_metadata_in_one_query(self, test_client, create_test_file_in_db):
+        """Batch metadata keeps request order and lists unknown ids"""
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        first = await create_test_file_in_db(original_filename="first.csv")
+        second = await create_test_file_in_db(original_filename="second.csv")
+        unknown = uuid.uuid4()
+        
+        with patch.object(FileMetadataRepository, "get_files", wraps=FileMetadataRepository.get_files,
+                          autospec=True) as get_files:
+            response = test_client.get("/api/files/metadata",
+                                       params={"file_id": [str(second), str(unknown), str(first), str(second)]})
+        assert response.status_code == 200
+        assert get_files.call_count == 1
+        data = response.json()
+        assert [file["original_filename"] for file in data["files"]] == ["second.csv", "first.csv"]
+        assert data["missing"] == [str(unknown)]
+        
+        with patch("datavisyn_project.app.csv_factory.get_metadata.METADATA_BATCH_MAX_IDS", 1):
+            response = test_client.get("/api/files/metadata", params={"file_id": [str(first), str(second)]})
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_metadata_of_ingested_file_is_served_from_cache(self, test_client):
+        """Once a file is ready, paging reads its metadata from the cache without touching the database"""
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        from datavisyn_project.app.helper.metadata_cache import metadata_cache
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        response = test_client.post("/api/upload_file/", files={"file": ("meta.csv", b"id\n1\n2", "text/csv")})
+        file_id = uuid.UUID(response.json()["file_id"])
+        assert metadata_cache.get(file_id) is None  # pending rows still change
+        test_client.portal.call(get_ingest_pool().join)
+        
+        assert test_client.get(f"/api/file/{file_id}/status").json()["status"] == "ready"
+        assert metadata_cache.get(file_id).status == "ready"
+        with patch.object(FileMetadataRepository, "get_files", wraps=FileMetadataRepository.get_files,
+                          autospec=True) as get_files:
+            for page in (1, 2):
+                response = test_client.get(f"/api/file/{file_id}/data?page={page}&page_size=1")
+                assert response.json()["data"] == [{"id": page}]
+            assert get_files.call_count == 0
+            
+            metadata_cache.invalidate(file_id)
+            assert test_client.get(f"/api/file/{file_id}/metadata").json()["row_count"] == 2
+            assert get_files.call_count == 1
+        assert test_client.get("/api/cache/stats").json()["metadata_cache"]["invalidations"] >= 1
+        
+        # A bulk duplicate is ready as soon as it is inserted, and cached like a single one
+        response = test_client.post("/api/upload_files/", files=[("files", ("meta_copy.csv", b"id\n1\n2", "text/csv"))])
+        copy_id = uuid.UUID(response.json()["files"][0]["file_id"])
+        cached = metadata_cache.get(copy_id)
+        assert (cached.status, cached.row_count) == ("ready", 2)
+        assert cached.upload_timestamp is not None
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_get_file_lookups_are_coalesced(self, test_session_factory, create_test_file_in_db):
+        """Lookups from separate sessions in the same tick share one IN query on a session of its own"""
+        from sqlalchemy import inspect as sa_inspect
+        from datavisyn_project.app.repository_dp.file_repository import (
+            FileMetadataRepository, file_loader, file_loader_stats)
+        file_ids = [await create_test_file_in_db(original_filename=f"file_{i}.csv") for i in range(3)]
+        before = file_loader_stats()
+        
+        with patch.object(FileMetadataRepository, "get_files", wraps=FileMetadataRepository.get_files,
+                          autospec=True) as get_files:
+            async with test_session_factory() as one, test_session_factory() as other:
+                first = asyncio.ensure_future(FileMetadataRepository(one).get_file(file_ids[1]))
+                files = asyncio.gather(
+                    FileMetadataRepository(one).get_file(file_ids[0]),
+                    FileMetadataRepository(other).get_file(file_ids[1]),
+                    FileMetadataRepository(other).get_file(file_ids[0]),
+                    FileMetadataRepository(one).get_file(uuid.uuid4()),
+                )
+                await asyncio.sleep(0)
+                first.cancel()  # the caller that started the batch gives up
+                loader = file_loader(one.bind)
+                for _ in range(10):
+                    if loader._tasks:
+                        break
+                    await asyncio.sleep(0)
+                assert len(loader._tasks) == 1  # the running batch is held until it finishes
+                files = await files
+                await asyncio.sleep(0)
+                assert not loader._tasks
+                assert not one.identity_map and not other.identity_map
+        assert get_files.call_count == 1
+        assert [file.id if file else None for file in files] == [file_ids[0], file_ids[1], file_ids[0], None]
+        assert sa_inspect(files[0]).detached
+        assert await FileMetadataRepository(one).get_file(file_ids[2]) is not None
+        stats = file_loader_stats()
+        assert stats["batches"] - before.get("batches", 0) == 2
+        assert stats["coalesced"] - before.get("coalesced", 0) == 2
+    
     @pytest.mark.asyncio
     async def test_list_files(self, test_client, create_test_file_in_db):
         """Test listing files with pagination."""
@@ -68,4 +210,598 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert len(data["files"]) == 5
-        
\ No newline at end of file
+        
+    @pytest.mark.asyncio
+    async def test_get_file_data_pages_from_row_index_and_parquet(self, test_client, upload_csv, test_db_session, monkeypatch):
+        """Byte-range and columnar page reads return the same rows."""
+        from datavisyn_project.models.file_model import CSVFiles
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        monkeypatch.setattr(frame_cache, "max_file_bytes", 0)
+        
+        csv_content = b"id,name\n1,a\n2,b\n3,c\n4,d\n5,e"
+        response = upload_csv("paged.csv", csv_content)
+        file_id = uuid.UUID(response.json()["file_id"])
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["data"] == [{"id": 3, "name": "c"}, {"id": 4, "name": "d"}]
+        assert data["total_rows"] == 5
+        assert data["total_pages"] == 3
+        
+        db_file = await test_db_session.get(CSVFiles, file_id)
+        db_file.row_index_filename = None
+        await test_db_session.commit()
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=3&page_size=2")
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"id": 5, "name": "e"}]
+    
+    @pytest.mark.asyncio
+    async def test_row_index_page_reads_nullable_bools_like_a_full_parse(self, test_client, upload_csv, test_db_session, monkeypatch):
+        """A bool column with empty cells is paged as booleans from byte ranges, not as the raw strings."""
+        from datavisyn_project.models.file_model import CSVFiles
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        monkeypatch.setattr(frame_cache, "max_file_bytes", 0)
+        
+        response = upload_csv("flags_paged.csv", b"id,flag\n1,true\n2,\n3,False\n4,TRUE\n5,false")
+        file_id = uuid.UUID(response.json()["file_id"])
+        expected = [{"id": 2, "flag": None}, {"id": 3, "flag": False}, {"id": 4, "flag": True}]
+        
+        db_file = await test_db_session.get(CSVFiles, file_id)
+        db_file.parquet_filename = None
+        await test_db_session.commit()
+        response = test_client.get(f"/api/file/{file_id}/window?offset=1&limit=3")
+        assert response.status_code == 200
+        assert response.json()["data"] == expected
+        
+        # Without the row index the whole file is parsed
+        db_file.row_index_filename = None
+        await test_db_session.commit()
+        response = test_client.get(f"/api/file/{file_id}/window?offset=1&limit=4")
+        assert response.json()["data"] == expected + [{"id": 5, "flag": False}]
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_legacy_upload_falls_back_to_csv(self, test_client, upload_csv, test_db_session, monkeypatch):
+        """Files uploaded without a sidecar are still paged from the raw CSV."""
+        from datavisyn_project.models.file_model import CSVFiles
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        monkeypatch.setattr(frame_cache, "max_file_bytes", 0)
+        
+        csv_content = b"id,name\n1,a\n2,b\n3,c"
+        response = upload_csv("legacy.csv", csv_content)
+        file_id = uuid.UUID(response.json()["file_id"])
+        
+        db_file = await test_db_session.get(CSVFiles, file_id)
+        db_file.parquet_filename = None
+        db_file.row_index_filename = None
+        await test_db_session.commit()
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=2")
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"id": 3, "name": "c"}]
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_upload_reuses_stored_object_and_metadata(self, test_client, upload_csv):
+        """Re-uploading the same bytes gets its own row but shares the stored object and ingest results."""
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        from datavisyn_project.app.storage import get_storage_backend
+        
+        csv_content = b"id,name\n1,a\n2,b\n3,c"
+        first = upload_csv("report.csv", csv_content).json()
+        submitted = get_ingest_pool().stats()["submitted"]
+        second = upload_csv("report (1).csv", csv_content).json()
+        
+        assert second["file_id"] != first["file_id"]
+        assert (second["status"], second["deduplicated"], first["deduplicated"]) == ("ready", True, False)
+        assert get_ingest_pool().stats()["submitted"] == submitted
+        
+        first_meta = test_client.get(f"/api/file/{first['file_id']}/metadata").json()
+        second_meta = test_client.get(f"/api/file/{second['file_id']}/metadata").json()
+        assert second_meta["original_filename"] == "report (1).csv"
+        assert second_meta["stored_filename"] == first_meta["stored_filename"]
+        assert second_meta["stored_filename"].startswith("sha256_")
+        assert (second_meta["row_count"], second_meta["column_stats"]) == (3, first_meta["column_stats"])
+        # The staged copy of the duplicate is gone
+        assert not get_storage_backend().local_path(f"{second['file_id']}_report (1).csv").exists()
+        
+        response = test_client.get(f"/api/file/{second['file_id']}/data?page=2&page_size=2")
+        assert response.json()["data"] == [{"id": 3, "name": "c"}]
+    
+    @pytest.mark.asyncio
+    async def test_compressed_upload_reads_like_a_raw_one(self, test_client, upload_csv, monkeypatch):
+        """With compression on, the codec is recorded and pages, windows and exports see the raw CSV."""
+        from datavisyn_project.app import storage
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        monkeypatch.setattr(frame_cache, "max_file_bytes", 0)
+        
+        rows = "\n".join(f"{i},name {i}" for i in range(3000))
+        csv_content = f"id,name\n{rows}\n".encode()
+        raw = upload_csv("raw.csv", b"id,name\n1,a\n2,b").json()
+        monkeypatch.setattr(storage, "STORAGE_COMPRESSION", "zstd")
+        packed = upload_csv("packed.csv", csv_content).json()
+        
+        metadata = test_client.get(f"/api/file/{packed['file_id']}/metadata").json()
+        assert (metadata["codec"], metadata["file_size"], metadata["row_count"]) == ("zstd", len(csv_content), 3000)
+        stored = storage.get_storage_backend().local_path(metadata["stored_filename"])
+        assert stored.stat().st_size < len(csv_content) / 3
+        assert test_client.get(f"/api/file/{raw['file_id']}/metadata").json()["codec"] is None
+        
+        data = test_client.get(f"/api/file/{packed['file_id']}/data?page=21&page_size=100").json()
+        assert data["data"][0] == {"id": 2000, "name": "name 2000"}
+        response = test_client.get(f"/api/file/{packed['file_id']}/export")
+        assert response.content == csv_content
+        # Files stored before compression was switched on are still read raw
+        response = test_client.get(f"/api/file/{raw['file_id']}/data")
+        assert response.json()["data"] == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    
+    @pytest.mark.asyncio
+    async def test_bulk_upload_files_and_zip_archive(self, test_client, monkeypatch):
+        """Plain files and zip members are stored concurrently, inserted per batch and reported per file."""
+        import io
+        import zipfile
+        from datavisyn_project.app.csv_factory import bulk_save_file
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        monkeypatch.setattr(bulk_save_file, "BULK_INSERT_BATCH_SIZE", 3)
+        
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("exports/north.csv", "id,region\n1,north\n2,north")
+            zf.writestr("exports/copy_of_a.csv", "id,v\n1,x")
+            zf.writestr("exports/readme.txt", "not a csv")
+            zf.writestr("exports/", "")
+        files = [
+            ("files", ("a.csv", b"id,v\n1,x", "text/csv")),
+            ("files", ("b.csv", b"id,v\n2,y", "text/csv")),
+            ("files", ("exports.zip", archive.getvalue(), "application/zip")),
+        ]
+        with patch.object(FileMetadataRepository, "create_file_metadata_batch",
+                          wraps=FileMetadataRepository.create_file_metadata_batch, autospec=True) as insert_batch:
+            response = test_client.post("/api/upload_files/", files=files)
+        assert response.status_code == 202
+        body = response.json()
+        assert insert_batch.call_count == 2
+        assert (body["accepted"], body["failed"]) == (4, 1)
+        results = {item["filename"]: item for item in body["files"]}
+        assert list(results) == ["a.csv", "b.csv", "north.csv", "copy_of_a.csv", "readme.txt"]
+        assert results["readme.txt"]["status"] == "failed"
+        assert "Only CSV files" in results["readme.txt"]["error"]
+        
+        test_client.portal.call(get_ingest_pool().join)
+        north = test_client.get(f"/api/file/{results['north.csv']['file_id']}/data").json()
+        assert north["data"] == [{"id": 1, "region": "north"}, {"id": 2, "region": "north"}]
+        first = test_client.get(f"/api/file/{results['a.csv']['file_id']}/metadata").json()
+        copy = test_client.get(f"/api/file/{results['copy_of_a.csv']['file_id']}/status").json()
+        assert copy["status"] == "ready"
+        assert test_client.get(f"/api/file/{copy['file_id']}/metadata").json()["stored_filename"] \
+            == first["stored_filename"]
+        assert test_client.get("/api/files").json()["total"] == 4
+        
+        response = test_client.post("/api/upload_files/",
+                                    files=[("files", ("broken.zip", b"PK not really", "application/zip"))])
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_bulk_upload_leaves_overflow_pending_for_the_sweeper(self, test_client, monkeypatch):
+        """A bulk upload answers without waiting for queue room; files left pending are queued later."""
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        
+        pool = get_ingest_pool()
+        test_client.portal.call(pool.close)  # nothing drains the queue while the upload runs
+        monkeypatch.setattr(pool, "queue", asyncio.Queue(maxsize=1))
+        submitted = pool.stats()["submitted"]
+        files = [("files", (f"part_{i}.csv", f"id,part\n1,{i}".encode(), "text/csv")) for i in range(4)]
+        response = test_client.post("/api/upload_files/", files=files)
+        assert response.status_code == 202
+        assert response.json()["accepted"] == 4
+        assert pool.stats()["submitted"] == submitted + 1
+        
+        test_client.portal.call(pool.start)
+        test_client.portal.call(pool.join)
+        for item in response.json()["files"]:
+            assert test_client.get(f"/api/file/{item['file_id']}/status").json()["status"] == "ready"
+        assert pool.stats()["swept"] >= 3
+    
+    @pytest.mark.asyncio
+    async def test_bulk_upload_failed_insert_deletes_only_new_objects(self, test_client, upload_csv):
+        """A batch whose INSERT fails removes the objects it stored and keeps the ones it reused"""
+        import hashlib
+        from datavisyn_project.app.helper.file_processor import content_key
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        from datavisyn_project.app.storage import get_file_storage
+        existing, new = b"id\n1\n2", b"id\n3\n4"
+        upload_csv("existing.csv", existing)
+        storage = get_file_storage(None)
+        existing_key, new_key = (content_key(hashlib.sha256(content).hexdigest()) for content in (existing, new))
+        
+        with patch.object(FileMetadataRepository, "create_file_metadata_batch", side_effect=RuntimeError("db down")):
+            response = test_client.post("/api/upload_files/", files=[
+                ("files", ("again.csv", existing, "text/csv")),
+                ("files", ("new.csv", new, "text/csv")),
+                ("files", ("new_copy.csv", new, "text/csv")),
+            ])
+        assert response.status_code == 202
+        assert response.json()["failed"] == 3
+        assert storage.local_path(existing_key).exists()
+        assert not storage.local_path(new_key).exists()
+        assert test_client.get("/api/files").json()["total"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_bulk_upload_rejects_archive_members_over_size_limits(self, test_client, monkeypatch):
+        """Members declaring too many bytes, or inflating past their limit, fail alone"""
+        import io
+        import zipfile
+        from datavisyn_project.app.helper import archive as archive_module
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        monkeypatch.setattr(archive_module, "ARCHIVE_MAX_MEMBER_BYTES", 64)
+        monkeypatch.setattr(archive_module, "ARCHIVE_MAX_TOTAL_BYTES", 100)
+        
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("small.csv", "id\n" + "1\n" * 20)
+            zf.writestr("bomb.csv", "id\n" + "0\n" * 10000)
+            zf.writestr("second.csv", "id\n" + "2\n" * 20)
+            zf.writestr("over_total.csv", "id\n" + "3\n" * 20)
+        response = test_client.post("/api/upload_files/",
+                                    files=[("files", ("bombs.zip", content.getvalue(), "application/zip"))])
+        assert response.status_code == 202
+        results = {item["filename"]: item for item in response.json()["files"]}
+        assert [results[name]["status"] for name in ("small.csv", "second.csv")] == ["pending", "pending"]
+        assert "larger than 64 bytes" in results["bomb.csv"]["error"]
+        assert "in total" in results["over_total.csv"]["error"]
+        test_client.portal.call(get_ingest_pool().join)
+        
+        # A header declaring fewer bytes than the member inflates to is caught while reading
+        with zipfile.ZipFile(io.BytesIO(content.getvalue())) as zf:
+            member = archive_module.ArchiveMember(zf, zf.getinfo("bomb.csv"), max_bytes=1000)
+            with pytest.raises(ValueError, match="inflates past 1000 bytes"):
+                while await member.read(256):
+                    pass
+            await member.close()
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_over_executor_capacity_is_rejected(self, test_client, upload_csv):
+        """Decoding runs off the event loop; a full executor answers 503 with Retry-After."""
+        from datavisyn_project.app.helper.executor import EXECUTOR_RETRY_AFTER, get_thread_executor
+        
+        file_id = upload_csv("busy.csv", b"id,name\n1,a\n2,b").json()["file_id"]
+        with patch.object(get_thread_executor()._slots, "locked", return_value=True):
+            response = test_client.get(f"/api/file/{file_id}/data")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(EXECUTOR_RETRY_AFTER)
+        
+        response = test_client.get(f"/api/file/{file_id}/data")
+        assert response.json()["data"] == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        executors = test_client.get("/api/cache/stats").json()["executors"]
+        assert executors["thread"]["rejected"] == 1
+        assert executors["thread"]["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_upload_latin1_semicolon_file_reuses_sniffed_dialect(self, test_client, upload_csv, monkeypatch):
+        """A cp1252 upload is sniffed once and its pages decode with the stored encoding."""
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        monkeypatch.setattr(frame_cache, "max_file_bytes", 0)
+        
+        csv_content = "id;city;price\n1;Zürich;1,5\n2;Besançon;2,5\n3;Málaga;3,5\n".encode("cp1252")
+        response = upload_csv("latin1.csv", csv_content)
+        file_id = response.json()["file_id"]
+        
+        metadata = test_client.get(f"/api/file/{file_id}/metadata").json()
+        assert metadata["column_count"] == 3
+        assert metadata["delimiter"] == ";"
+        assert metadata["encoding"] == "cp1252"
+        assert metadata["has_bom"] is False
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=1")
+        assert response.status_code == 200
+        assert response.json()["data"] == [{"id": 2, "city": "Besançon", "price": "2,5"}]
+    
+    @pytest.mark.asyncio
+    async def test_get_file_metadata_returns_column_profile(self, test_client, upload_csv):
+        """Column statistics computed at ingest come back with the metadata."""
+        csv_content = b"id,score,label\n1,10.5,a\n2,,b\n3,30.5,a\n4,20,c"
+        response = upload_csv("profiled.csv", csv_content)
+        file_id = response.json()["file_id"]
+        
+        metadata = test_client.get(f"/api/file/{file_id}/metadata").json()
+        stats = metadata["column_stats"]
+        assert list(stats) == ["id", "score", "label"]
+        assert stats["score"]["dtype"] == "float64"
+        assert stats["score"]["null_count"] == 1
+        assert (stats["score"]["min"], stats["score"]["max"]) == (10.5, 30.5)
+        assert stats["score"]["mean"] == pytest.approx(61 / 3)
+        assert stats["id"]["quantiles"]["p50"] == 2.5
+        assert stats["label"]["distinct_count"] == 3
+        assert stats["label"]["min"] is None
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_filters_nullable_bool_column(self, test_client, upload_csv, monkeypatch):
+        """A bool column with empty cells is compared with booleans, not with the literal string"""
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        
+        rows = "\n".join(f"{i},{('true', 'false', '')[i % 3]}" for i in range(300))
+        response = upload_csv("flags.csv", f"id,flag\n{rows}".encode())
+        file_id = response.json()["file_id"]
+        assert test_client.get(f"/api/file/{file_id}/metadata").json()["column_stats"]["flag"]["dtype"] == "object"
+        
+        for max_file_bytes in (0, frame_cache.max_file_bytes):
+            monkeypatch.setattr(frame_cache, "max_file_bytes", max_file_bytes)
+            for value, expected in (("true", 100), ("FALSE", 100)):
+                response = test_client.get(f"/api/file/{file_id}/data?filter=flag:eq:{value}&page_size=1")
+                assert response.status_code == 200
+                assert response.json()["total_rows"] == expected
+            response = test_client.get(f"/api/file/{file_id}/data?filter=flag:in:true,false")
+            assert response.json()["total_rows"] == 200
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_filter_sort_and_projection(self, test_client, upload_csv, monkeypatch):
+        """Filters, sort keys and projection apply before paging, through the sidecar and the frame cache."""
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        
+        csv_content = b"id,city,price\n1,Paris,12.5\n2,Berlin,8\n3,Paris,30\n4,Rome,15\n5,Paris,9.5"
+        response = upload_csv("query.csv", csv_content)
+        file_id = response.json()["file_id"]
+        query = "filter=city:in:Paris,Rome&filter=price:gt:10&sort=-price&columns=id,price&page_size=2"
+        
+        for max_file_bytes in (0, frame_cache.max_file_bytes):
+            monkeypatch.setattr(frame_cache, "max_file_bytes", max_file_bytes)
+            response = test_client.get(f"/api/file/{file_id}/data?{query}&page=1")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["data"] == [{"id": 3, "price": 30.0}, {"id": 4, "price": 15.0}]
+            assert (data["total_rows"], data["total_pages"]) == (3, 2)
+        
+        response = test_client.get(f"/api/file/{file_id}/data?filter=id:gt:100")
+        assert response.json()["total_rows"] == 0
+        
+        response = test_client.get(f"/api/file/{file_id}/data?filter=missing:eq:1")
+        assert response.status_code == 400
+        response = test_client.get(f"/api/file/{file_id}/data?sort=--price")
+        assert response.status_code == 400
+        assert "-price" in response.json()["detail"]
+        response = test_client.get(f"/api/file/{file_id}/data?filter=price:eq:cheap")
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_arrow_ipc_and_window(self, test_client, upload_csv):
+        """Accept: Arrow IPC returns the same page as columns; the window endpoint goes past page_size 100."""
+        import json
+        import pyarrow as pa
+        
+        rows = "\n".join(f"{i},{i * 0.5}" for i in range(250))
+        response = upload_csv("arrow.csv", f"id,value\n{rows}".encode())
+        file_id = response.json()["file_id"]
+        arrow_headers = {"Accept": "application/vnd.apache.arrow.stream"}
+        
+        for _ in range(2):  # second request is served from the response cache
+            response = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=3", headers=arrow_headers)
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+            table = pa.ipc.open_stream(response.content).read_all()
+            assert table.column("id").to_pylist() == [3, 4, 5]
+            envelope = json.loads(table.schema.metadata[b"datavisyn"])
+            assert (envelope["total_rows"], envelope["total_pages"]) == (250, 84)
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=3")
+        assert response.headers["content-type"] == "application/json"
+        assert [row["id"] for row in response.json()["data"]] == [3, 4, 5]
+        
+        response = test_client.get(f"/api/file/{file_id}/window?offset=10&limit=200")
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["offset"], data["limit"], data["total_rows"]) == (10, 200, 250)
+        assert len(data["data"]) == 200 and data["data"][0] == {"id": 10, "value": 5.0}
+        
+        response = test_client.get(f"/api/file/{file_id}/window?offset=200&limit=200&columns=value",
+                                   headers=arrow_headers)
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == ["value"] and table.num_rows == 50
+    
+    @pytest.mark.asyncio
+    async def test_export_streams_csv_ndjson_and_arrow(self, test_client, upload_csv, monkeypatch):
+        """Exports pass CSV bytes through and convert batch by batch to NDJSON and Arrow."""
+        import json
+        import pyarrow as pa
+        from datavisyn_project.app.csv_factory import export_file
+        from datavisyn_project.app.file_api import attachment_disposition
+        monkeypatch.setattr(export_file, "EXPORT_CHUNK_SIZE", 64)
+        
+        rows = "\n".join(f'{i},"name {i}",{i / 4}' for i in range(40))
+        csv_content = f"id,name,score\n{rows}\n".encode()
+        response = upload_csv("export.csv", csv_content)
+        file_id = response.json()["file_id"]
+        
+        response = test_client.get(f"/api/file/{file_id}/export")
+        assert response.status_code == 200
+        assert response.content == csv_content
+        assert response.headers["content-disposition"] == \
+            "attachment; filename=\"export.csv\"; filename*=UTF-8''export.csv"
+        
+        response = test_client.get(f"/api/file/{file_id}/export?format=ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 40
+        assert records[7] == {"id": 7, "name": "name 7", "score": 1.75}
+        
+        response = test_client.get(f"/api/file/{file_id}/export?format=arrow")
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == 40
+        assert table.column("score").to_pylist()[-1] == 9.75
+        
+        response = test_client.get(f"/api/file/{uuid.uuid4()}/export")
+        assert response.status_code == 404
+        
+        # Quotes and non-ASCII characters in the uploaded name cannot break the header
+        file_id = upload_csv("Größe;v2.csv", csv_content).json()["file_id"]
+        response = test_client.get(f"/api/file/{file_id}/export?format=ndjson")
+        assert response.headers["content-disposition"] == \
+            "attachment; filename=\"Groe_v2.ndjson\"; filename*=UTF-8''Gr%C3%B6%C3%9Fe%3Bv2.ndjson"
+        assert attachment_disposition('a "b"\\\r\nc.csv') == \
+            "attachment; filename=\"a _b____c.csv\"; filename*=UTF-8''a%20%22b%22%5C%0D%0Ac.csv"
+    
+    @pytest.mark.asyncio
+    async def test_get_file_data_sequential_pages_parse_once(self, test_client, upload_csv):
+        """Paging through a small file parses it once and then hits the frame cache."""
+        from datavisyn_project.app.helper.frame_cache import frame_cache
+        
+        csv_content = b"id,name\n1,a\n2,b\n3,c"
+        response = upload_csv("cached.csv", csv_content)
+        file_id = response.json()["file_id"]
+        
+        hits = frame_cache.hits
+        for page in (1, 2, 3):
+            response = test_client.get(f"/api/file/{file_id}/data?page={page}&page_size=1")
+            assert response.json()["data"][0]["id"] == page
+        assert frame_cache.hits == hits + 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_of_one_file_share_a_single_load(self, test_client, upload_csv):
+        """Requests arriving while a file is being loaded wait for that load instead of starting their own."""
+        from concurrent.futures import ThreadPoolExecutor
+        from datavisyn_project.app.csv_factory.get_file_detail import GetFileDetail
+        from datavisyn_project.app.helper.single_flight import file_loads
+        
+        response = upload_csv("shared.csv", b"id,name\n1,a\n2,b\n3,c")
+        file_id = response.json()["file_id"]
+        read_frame = GetFileDetail._read_frame
+        
+        async def slow_read_frame(self, storage):
+            await asyncio.sleep(0.2)
+            return await read_frame(self, storage)
+        
+        loads, waiters = file_loads.loads, file_loads.waiters
+        with patch.object(GetFileDetail, "_read_frame", autospec=True, side_effect=slow_read_frame) as reads, \
+                ThreadPoolExecutor(max_workers=5) as pool:
+            responses = list(pool.map(
+                lambda page: test_client.get(f"/api/file/{file_id}/data?page={page}&page_size=1"), [1, 2, 3, 1, 2]))
+        assert [response.json()["data"][0]["id"] for response in responses] == [1, 2, 3, 1, 2]
+        assert reads.call_count == 1
+        assert (file_loads.loads - loads, file_loads.waiters - waiters) == (1, 4)
+        assert file_loads.stats()["in_flight"] == 0
+        stats = test_client.get("/api/cache/stats").json()["single_flight"]
+        assert stats["saved_seconds"] >= 0.2 * 4 * 0.9
+
+    
+    @pytest.mark.asyncio
+    async def test_conditional_requests_answer_304_without_reading_storage(self, test_client, upload_csv):
+        """Data and metadata carry strong immutable ETags; a matching If-None-Match skips the read"""
+        from datavisyn_project.app.csv_factory.get_file_detail import GetFileDetail
+        from datavisyn_project.app.helper.ingest_worker import get_ingest_pool
+        response = upload_csv("etag.csv", b"id,name\n1,a\n2,b\n3,c")
+        file_id = response.json()["file_id"]
+        
+        response = test_client.get(f"/api/file/{file_id}/data?page=1&page_size=2")
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and "immutable" in response.headers["cache-control"]
+        assert response.headers["vary"] == "Accept"
+        other_page = test_client.get(f"/api/file/{file_id}/data?page=2&page_size=2").headers["etag"]
+        assert other_page != etag
+        
+        with patch.object(GetFileDetail, "_run", autospec=True) as run:
+            response = test_client.get(f"/api/file/{file_id}/data?page=1&page_size=2",
+                                       headers={"If-None-Match": f'"stale", {etag}'})
+            assert response.status_code == 304 and response.content == b""
+            assert response.headers["etag"] == etag
+            assert run.call_count == 0
+        response = test_client.get(f"/api/file/{file_id}/data?page=1&page_size=2", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200 and len(response.json()["data"]) == 2
+        
+        response = test_client.get(f"/api/file/{file_id}/metadata")
+        assert response.json()["row_count"] == 3
+        assert "immutable" in response.headers["cache-control"]
+        response = test_client.get(f"/api/file/{file_id}/metadata", headers={"If-None-Match": response.headers["etag"]})
+        assert response.status_code == 304
+        
+        pool = get_ingest_pool()
+        test_client.portal.call(pool.close)  # keep the next upload pending
+        pending = test_client.post("/api/upload_file/", files={"file": ("new.csv", b"id\n9", "text/csv")}).json()
+        response = test_client.get(f"/api/file/{pending['file_id']}/metadata")
+        assert response.headers["cache-control"] == "no-cache"
+        assert "etag" not in test_client.get(f"/api/file/{pending['file_id']}/data").headers
+        test_client.portal.call(pool.start)
+        test_client.portal.call(pool.join)
+        response = test_client.get(f"/api/file/{pending['file_id']}/metadata", headers={"If-None-Match": response.headers["etag"]})
+        assert response.status_code == 200 and "immutable" in response.headers["cache-control"]
+    
+    @pytest.mark.asyncio
+    async def test_list_files_weak_etag_follows_latest_upload(self, test_client, upload_csv):
+        """The listing ETag is weak and changes once another file is uploaded"""
+        upload_csv("first.csv", b"id\n1")
+        response = test_client.get("/api/files")
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"') and response.headers["cache-control"] == "no-cache"
+        assert test_client.get("/api/files", headers={"If-None-Match": etag}).status_code == 304
+        
+        upload_csv("second.csv", b"id\n2")
+        response = test_client.get("/api/files", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and len(response.json()["files"]) == 2
+        assert response.headers["etag"] != etag
+    
+    @pytest.mark.asyncio
+    async def test_list_files_cache_hit_skips_database(self, test_client, create_test_file_in_db):
+        """A repeated listing is answered from the cache without querying the DB."""
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        
+        await create_test_file_in_db()
+        with patch.object(FileMetadataRepository, "count_files", wraps=FileMetadataRepository.count_files,
+                          autospec=True) as count_files:
+            first = test_client.get("/api/files?page=1&page_size=10")
+            second = test_client.get("/api/files?page=1&page_size=10")
+        
+        assert first.json() == second.json()
+        assert count_files.call_count == 1
+        stats = test_client.get("/api/cache/stats").json()
+        assert stats["response_cache"]["files"]["hits"] >= 1
+    
+    @pytest.mark.asyncio
+    async def test_upload_invalidates_cached_listing(self, test_client, upload_csv):
+        """A cached /files page includes a file uploaded after it was cached."""
+        before = test_client.get("/api/files").json()
+        
+        upload_csv("fresh.csv", b"a,b\n1,2")
+        after = test_client.get("/api/files").json()
+        
+        assert after["total"] == before["total"] + 1
+        assert after["files"][0]["original_filename"] == "fresh.csv"
+
+    
+    @pytest.mark.asyncio
+    async def test_list_files_keyset_cursor_walks_all_files(self, test_client, create_test_file_in_db):
+        """Following next_cursor visits every file once, without totals."""
+        created = {str(await create_test_file_in_db(original_filename=f"file_{i}.csv")) for i in range(5)}
+        
+        seen = []
+        response = test_client.get("/api/files?page_size=2&count=none").json()
+        assert response["total"] is None
+        seen += [file["id"] for file in response["files"]]
+        while response["next_cursor"]:
+            response = test_client.get(f"/api/files?page_size=2&count=none&cursor={response['next_cursor']}").json()
+            assert response["page"] is None
+            seen += [file["id"] for file in response["files"]]
+        
+        assert len(seen) == len(set(seen)) == 5
+        assert set(seen) == created
+    
+    @pytest.mark.asyncio
+    async def test_list_files_cursor_pages_skip_exact_count_by_default(self, test_client, create_test_file_in_db):
+        """Keyset pages run no COUNT(*) unless count=exact is asked for."""
+        from datavisyn_project.app.repository_dp.file_repository import FileMetadataRepository
+        for i in range(3):
+            await create_test_file_in_db(original_filename=f"file_{i}.csv")
+        
+        first = test_client.get("/api/files?page_size=2").json()
+        assert first["total"] == 3
+        with patch.object(FileMetadataRepository, "count_files",
+                          wraps=FileMetadataRepository.count_files, autospec=True) as count_files:
+            response = test_client.get(f"/api/files?page_size=2&cursor={first['next_cursor']}").json()
+            assert response["total"] is None and len(response["files"]) == 1
+            assert count_files.call_count == 0
+            response = test_client.get(f"/api/files?page_size=2&count=exact&cursor={first['next_cursor']}").json()
+            assert response["total"] == 3
+            assert count_files.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_list_files_invalid_cursor(self, test_client):
+        """A malformed cursor is rejected."""
+        response = test_client.get("/api/files?cursor=not-a-cursor")
+        assert response.status_code == 400
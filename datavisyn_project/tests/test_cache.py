@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+import pandas as pd
+from datavisyn_project.app.helper.frame_cache import FrameCache
+from datavisyn_project.app.helper.single_flight import SingleFlight
+
+
+class TestFrameCache:
+    """Byte-budgeted LRU cache of parsed frames."""
+    
+    def test_evicts_least_recently_used_within_budget(self):
+        """Frames are evicted in LRU order once the byte budget is exceeded."""
+        frame = pd.DataFrame({"value": range(100)})
+        size = int(frame.memory_usage(deep=True).sum())
+        cache = FrameCache(max_bytes=size * 2)
+        
+        cache.put("a", frame)
+        cache.put("b", frame.copy())
+        assert cache.get("a") is frame
+        cache.put("c", frame.copy())
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is frame
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["bytes"] <= cache.max_bytes
+    
+    def test_rejects_frame_larger_than_budget(self):
+        """A frame bigger than the whole budget is not cached."""
+        cache = FrameCache(max_bytes=10)
+        assert not cache.put("big", pd.DataFrame({"value": range(100)}))
+        assert cache.get("big") is None
+
+
+class TestSingleFlight:
+    """One load per key for concurrent callers."""
+    
+    @pytest.mark.asyncio
+    async def test_waiters_share_result_error_and_survive_cancelled_leader(self):
+        """Callers share one load, its error, and the load outlives a cancelled caller."""
+        flight = SingleFlight()
+        calls = []
+        
+        async def load(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            if value is None:
+                raise ValueError("broken")
+            return value
+        
+        leader = asyncio.ensure_future(flight.do("a", load, 1))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(flight.do("a", load, 2)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await asyncio.gather(*waiters) == [1, 1, 1]
+        assert calls == [1]
+        
+        results = await asyncio.gather(flight.do("b", load, None), flight.do("b", load, None),
+                                       return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        stats = flight.stats()
+        assert (stats["loads"], stats["waiters"], stats["errors"], stats["in_flight"]) == (2, 4, 1, 0)
+        assert stats["max_waiters"] == 3 and stats["saved_seconds"] > 0
+
+
+class TestTieredCacheBackend:
+    """Shared Redis tier behind per-worker L1 caches, using fakeredis as the stand-in."""
+    
+    @pytest.mark.asyncio
+    async def test_workers_share_entries_and_invalidations(self):
+        """Entries set by one worker are visible to another until a namespace is cleared."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from datavisyn_project.app.helper.cache_backend import TieredCacheBackend
+        
+        server = fakeredis.FakeServer()
+        worker_a = TieredCacheBackend(fakeredis.FakeAsyncRedis(server=server))
+        worker_b = TieredCacheBackend(fakeredis.FakeAsyncRedis(server=server))
+        await worker_a.start()
+        await worker_b.start()
+        
+        await worker_a.set("prefix:files:page=1", b"listing", expire=600)
+        assert await worker_b.get("prefix:files:page=1") == b"listing"
+        assert worker_b.l2_hits == 1
+        assert await worker_b.get("prefix:files:page=1") == b"listing"
+        assert worker_b.l1_hits == 1
+        
+        await worker_a.clear(namespace="prefix:files")
+        for _ in range(50):
+            if not worker_b.l1._store:
+                break
+            await asyncio.sleep(0.01)
+        assert await worker_b.get("prefix:files:page=1") is None
+        
+        await worker_a.close()
+        await worker_b.close()
+
+
+class TestExecutorStats:
+    """Executor stats are read-only."""
+    
+    def test_stats_do_not_create_executors(self, monkeypatch):
+        """Executors not created yet report zeros instead of being started by the stats read."""
+        from datavisyn_project.app.helper import executor
+        monkeypatch.setattr(executor, "_thread_executor", None)
+        monkeypatch.setattr(executor, "_parse_executor", None)
+        monkeypatch.setattr(executor, "PARSE_PROCESSES", 2)
+        
+        stats = executor.executor_stats()
+        assert executor._thread_executor is None and executor._parse_executor is None
+        assert stats["parse"] == stats["thread"] == {
+            "completed": 0, "rejected": 0, "in_flight": 0, "workers": 0, "capacity": None}
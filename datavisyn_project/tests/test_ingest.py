@@ -0,0 +1,102 @@
+import io
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datavisyn_project.app.helper.csv_stream import CSVStreamParser
+from datavisyn_project.app.helper.csv_sniffer import UTF8Transcoder, sniff_csv
+from datavisyn_project.app.helper.column_stats import ColumnProfile
+from datavisyn_project.app.helper.data_query import DataQuery
+from datavisyn_project.app.helper.row_index import build_row_index, locate_rows
+
+
+def _feed(parser, content, chunk_size):
+    for start in range(0, len(content), chunk_size):
+        parser.feed(content[start:start + chunk_size])
+    return parser.finish()
+
+
+class TestStreamingIngest:
+    """Chunked ingest helpers agree with a full pandas parse."""
+
+    def test_row_index_locates_pages_with_quoted_newlines(self):
+        """Byte ranges from the row index hold exactly the requested rows."""
+        lines = ["id,note"]
+        for i in range(50):
+            lines.append(f'{i},"line one\nline two"' if i % 7 == 0 else f"{i},plain")
+        content = ("\n".join(lines) + "\n").encode()
+        df = pd.read_csv(io.BytesIO(content))
+
+        index = build_row_index(content, stride=4)
+        assert index["row_count"] == len(df)
+
+        byte_start, byte_end, skip = locate_rows(index, 21, 26)
+        page = content[:index["data_start"]] + content[byte_start:byte_end]
+        page_df = pd.read_csv(io.BytesIO(page)).iloc[skip:skip + 5]
+        assert page_df["id"].tolist() == list(range(21, 26))
+
+    def test_stream_parser_flags_type_drift_for_rewrite(self):
+        """A column widening mid-file drops the sidecar; the rewrite pass matches pandas."""
+        lines = ["id,value"] + [f"{i},{i}" for i in range(300)] + [f"{i},{i}.5" for i in range(300, 400)]
+        content = ("\n".join(lines) + "\n").encode()
+
+        parser = CSVStreamParser(",", batch_bytes=512)
+        summary = _feed(parser, content, 100)
+        assert summary["row_count"] == 400
+        assert summary["parquet"] is None
+        assert parser.needs_rewrite
+
+        rewrite = CSVStreamParser(",", column_types=parser.schema(), batch_bytes=512)
+        rewritten = _feed(rewrite, content, 100)
+        table = pq.read_table(rewritten["parquet"]).to_pandas()
+        expected = pd.read_csv(io.BytesIO(content))
+        assert table.to_json(orient="records") == expected.to_json(orient="records")
+
+    def test_sniffer_scores_delimiters_by_field_count_consistency(self):
+        """Decimal commas do not win over a consistent semicolon split; BOM and quotes are detected."""
+        content = "name;note;value\n'a;b';x;1,5\nc;'y, z';2,5\n".encode("utf-16")
+        dialect = sniff_csv(content)
+        assert dialect == {"encoding": "utf-16", "has_bom": True, "delimiter": ";", "quotechar": "'"}
+
+        transcoder = UTF8Transcoder(dialect["encoding"])
+        utf8 = b"".join(transcoder.feed(content[i:i + 7]) for i in range(0, len(content), 7)) + transcoder.finish()
+        parser = CSVStreamParser(";", quotechar="'")
+        summary = _feed(parser, utf8, 16)
+        assert summary["row_count"] == 2
+        assert pq.read_table(summary["parquet"]).column("name").to_pylist() == ["a;b", "c"]
+
+    def test_column_profile_sketches_track_exact_statistics(self):
+        """Batched distinct and quantile sketches stay close to the exact values."""
+        values = np.random.default_rng(7).integers(0, 50_000, size=200_000)
+        profile = ColumnProfile()
+        for batch in np.array_split(values, 20):
+            profile.update(pa.chunked_array([pa.array(batch)]))
+        profile.update(pa.chunked_array([pa.array([None, None], type=pa.int64())]))
+
+        stats = profile.summary("int64")
+        assert stats["null_count"] == 2
+        assert stats["min"] == values.min() and stats["max"] == values.max()
+        assert stats["mean"] == pytest.approx(values.mean())
+        assert stats["distinct_count"] == pytest.approx(len(np.unique(values)), rel=0.05)
+        assert stats["quantiles"]["p50"] == pytest.approx(np.median(values), rel=0.05)
+
+    def test_zone_maps_prune_row_groups_that_cannot_match(self):
+        """Only row groups whose min/max overlap the filters are kept."""
+        lines = ["id,group"] + [f"{i},{'even' if (i // 10) % 2 == 0 else 'odd'}" for i in range(100)]
+        content = ("\n".join(lines) + "\n").encode()
+        parser = CSVStreamParser(",", row_group_size=10)
+        summary = _feed(parser, content, 64)
+        zone_maps = summary["zone_maps"]
+        assert len(zone_maps["row_groups"]) == 10
+
+        dtypes = parser.dtypes()
+        query = DataQuery.parse(filters=["id:gt:55", "id:lt:72"])
+        assert query.prune_row_groups(zone_maps, dtypes) == [5, 6, 7]
+        query = DataQuery.parse(filters=["group:eq:odd", "id:in:3,15,42"])
+        assert query.prune_row_groups(zone_maps, dtypes) == [1]
+
+    def test_sort_keys_strip_a_single_direction_dash(self):
+        """A column whose name starts with a dash can still be sorted."""
+        query = DataQuery.parse(sort="-id,--delta,-delta,name")
+        assert query.sort == [("id", False), ("-delta", False), ("delta", False), ("name", True)]
@@ -0,0 +1,29 @@
+"""csv_files parquet sidecar zone maps
+
+Revision ID: 0b6d3f58e7a2
+Revises: e92b5d08a4f1
+Create Date: 2026-10-18 14:05:51.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d3f58e7a2'
+down_revision: Union[str, Sequence[str], None] = 'e92b5d08a4f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('csv_files', sa.Column('zone_maps', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('csv_files', 'zone_maps')
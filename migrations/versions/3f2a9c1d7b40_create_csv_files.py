@@ -0,0 +1,42 @@
+"""create csv_files
+
+Revision ID: 3f2a9c1d7b40
+Revises: 
+Create Date: 2026-10-18 09:12:04.318211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7b40'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'csv_files',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('original_filename', sa.String(length=255), nullable=False),
+        sa.Column('stored_filename', sa.String(length=255), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('upload_timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=True),
+        sa.Column('column_count', sa.Integer(), nullable=True),
+        sa.Column('columns', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('delimiter', sa.String(length=10), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stored_filename'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('csv_files')
@@ -0,0 +1,33 @@
+"""csv_files ingest job status
+
+Revision ID: 4c8e2a17d905
+Revises: 0b6d3f58e7a2
+Create Date: 2026-10-18 15:33:42.117864
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2a17d905'
+down_revision: Union[str, Sequence[str], None] = '0b6d3f58e7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows uploaded before background ingest were parsed synchronously
+    op.add_column('csv_files', sa.Column('status', sa.String(length=16), server_default='ready', nullable=False))
+    op.add_column('csv_files', sa.Column('error_message', sa.Text(), nullable=True))
+    op.create_index('ix_csv_files_status', 'csv_files', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_csv_files_status', table_name='csv_files')
+    op.drop_column('csv_files', 'error_message')
+    op.drop_column('csv_files', 'status')
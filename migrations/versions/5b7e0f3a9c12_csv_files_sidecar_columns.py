@@ -0,0 +1,30 @@
+"""csv_files parquet sidecar and row index columns
+
+Revision ID: 5b7e0f3a9c12
+Revises: 3f2a9c1d7b40
+Create Date: 2026-10-18 09:20:37.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e0f3a9c12'
+down_revision: Union[str, Sequence[str], None] = '3f2a9c1d7b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('csv_files', sa.Column('parquet_filename', sa.String(length=255), nullable=True))
+    op.add_column('csv_files', sa.Column('row_index_filename', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('csv_files', 'row_index_filename')
+    op.drop_column('csv_files', 'parquet_filename')
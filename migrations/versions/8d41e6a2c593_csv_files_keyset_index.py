@@ -0,0 +1,34 @@
+"""csv_files keyset index on (upload_timestamp, id)
+
+Revision ID: 8d41e6a2c593
+Revises: 5b7e0f3a9c12
+Create Date: 2026-10-18 09:27:51.904632
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6a2c593'
+down_revision: Union[str, Sequence[str], None] = '5b7e0f3a9c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_csv_files_upload_timestamp_id',
+        'csv_files',
+        ['upload_timestamp', 'id'],
+        unique=False,
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_csv_files_upload_timestamp_id', table_name='csv_files')
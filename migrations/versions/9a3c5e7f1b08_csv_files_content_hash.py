@@ -0,0 +1,33 @@
+"""csv_files content hash
+
+Revision ID: 9a3c5e7f1b08
+Revises: 4c8e2a17d905
+Create Date: 2026-10-18 16:12:05.482310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3c5e7f1b08'
+down_revision: Union[str, Sequence[str], None] = '4c8e2a17d905'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('csv_files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_csv_files_content_hash', 'csv_files', ['content_hash'], unique=False)
+    # Duplicate uploads point at the same stored object
+    op.drop_constraint('csv_files_stored_filename_key', 'csv_files', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('csv_files_stored_filename_key', 'csv_files', ['stored_filename'])
+    op.drop_index('ix_csv_files_content_hash', table_name='csv_files')
+    op.drop_column('csv_files', 'content_hash')
@@ -0,0 +1,32 @@
+"""csv_files sniffed dialect columns
+
+Revision ID: c7a1e4f93b26
+Revises: 8d41e6a2c593
+Create Date: 2026-10-18 11:02:14.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1e4f93b26'
+down_revision: Union[str, Sequence[str], None] = '8d41e6a2c593'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('csv_files', sa.Column('encoding', sa.String(length=32), nullable=True))
+    op.add_column('csv_files', sa.Column('quotechar', sa.String(length=1), nullable=True))
+    op.add_column('csv_files', sa.Column('has_bom', sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('csv_files', 'has_bom')
+    op.drop_column('csv_files', 'quotechar')
+    op.drop_column('csv_files', 'encoding')
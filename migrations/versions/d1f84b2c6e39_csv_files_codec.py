@@ -0,0 +1,29 @@
+"""csv_files storage codec
+
+Revision ID: d1f84b2c6e39
+Revises: 9a3c5e7f1b08
+Create Date: 2026-10-18 16:47:21.903554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f84b2c6e39'
+down_revision: Union[str, Sequence[str], None] = '9a3c5e7f1b08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL: stored raw, as every file uploaded before this revision
+    op.add_column('csv_files', sa.Column('codec', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('csv_files', 'codec')
@@ -0,0 +1,29 @@
+"""csv_files column statistics profile
+
+Revision ID: e92b5d08a4f1
+Revises: c7a1e4f93b26
+Create Date: 2026-10-18 12:41:09.870215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e92b5d08a4f1'
+down_revision: Union[str, Sequence[str], None] = 'c7a1e4f93b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('csv_files', sa.Column('column_stats', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('csv_files', 'column_stats')